@@ -14,6 +14,7 @@ from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
+import asyncio
 import json
 import os
 from pathlib import Path
@@ -25,6 +26,18 @@ try:
 except ImportError:
     PROCESSOR_AVAILABLE = False
 
+try:
+    from batch_monitor import BatchMonitorService
+    MONITOR_AVAILABLE = True
+except ImportError:
+    MONITOR_AVAILABLE = False
+
+try:
+    from shared_utils.batch_registry import BatchRegistryRefresher
+    REGISTRY_AVAILABLE = True
+except ImportError:
+    REGISTRY_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,8 +48,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Global processor instance
+# Global processor, monitor and registry refresher instances
 processor: Optional[WellspringBatchProcessor] = None
+monitor_service: Optional["BatchMonitorService"] = None
+registry_refresher: Optional["BatchRegistryRefresher"] = None
 
 
 class BatchSubmissionRequest(BaseModel):
@@ -55,6 +70,9 @@ class BatchStatusResponse(BaseModel):
     failed_at: Optional[int] = None
     request_counts: Optional[Dict[str, Any]] = None
     metadata: Optional[Dict[str, Any]] = None
+    progress: Optional[float] = None
+    eta_seconds: Optional[int] = None
+    cache_age_seconds: Optional[float] = None
 
 
 class BatchResultsResponse(BaseModel):
@@ -66,8 +84,8 @@ class BatchResultsResponse(BaseModel):
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize the batch processor on startup"""
-    global processor
+    """Initialize the batch processor, start the shared job monitor and the registry refresher"""
+    global processor, monitor_service, registry_refresher
     
     if not PROCESSOR_AVAILABLE:
         logger.warning("OpenAI batch processor not available")
@@ -82,6 +100,50 @@ async def startup_event():
             logger.warning("OPENAI_API_KEY not found in environment")
     except Exception as e:
         logger.error(f"Failed to initialize batch processor: {e}")
+    
+    if processor and MONITOR_AVAILABLE:
+        try:
+            monitor_service = BatchMonitorService(processor)
+            await monitor_service.start()
+        except Exception as e:
+            logger.error(f"Failed to start batch monitor: {e}")
+            monitor_service = None
+    
+    if processor and REGISTRY_AVAILABLE:
+        registry_refresher = BatchRegistryRefresher(processor.batch_registry)
+        registry_refresher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the shared job monitor and the registry refresher"""
+    if monitor_service:
+        await monitor_service.stop()
+    if registry_refresher:
+        registry_refresher.stop()
+
+
+def _submit_batch_file(json_file_path: str, description: str) -> Dict[str, Any]:
+    """Load, format, upload and create a batch job for a prompts file"""
+    batch_data = processor.load_visual_batch_prompts(json_file_path)
+    tasks = processor.format_prompts_for_batch_api(batch_data)
+    
+    if not tasks:
+        raise HTTPException(status_code=400, detail="No valid tasks found in the batch file")
+    
+    # Already-answered prompts are served from the prompt cache; only misses are submitted
+    task_count = len(tasks)
+    tasks, cached_results = processor.apply_prompt_cache(tasks)
+    cached_count = cached_results["total_results"] if cached_results else 0
+    
+    if not tasks:
+        return {"job_id": None, "status": "cached", "task_count": task_count, "cached_count": cached_count}
+    
+    batch_file_path = processor.create_batch_file(tasks)
+    file_id = processor.upload_batch_file(batch_file_path)
+    batch_job = processor.create_batch_job(file_id, description)
+    
+    return {"job_id": batch_job.id, "status": batch_job.status, "task_count": task_count, "cached_count": cached_count}
 
 
 @app.get("/")
@@ -95,7 +157,9 @@ async def root():
             "submit_batch": "/batch/submit",
             "monitor_batch": "/batch/{job_id}/status",
             "list_batches": "/batch/list",
-            "download_results": "/batch/{job_id}/results"
+            "download_results": "/batch/{job_id}/results",
+            "track_batch": "/batch/{job_id}/monitor",
+            "monitored_jobs": "/batch/monitor/jobs"
         }
     }
 
@@ -120,31 +184,17 @@ async def submit_batch(request: BatchSubmissionRequest, background_tasks: Backgr
         raise HTTPException(status_code=404, detail=f"File not found: {request.json_file_path}")
     
     try:
-        # Load and validate the JSON file
-        batch_data = processor.load_visual_batch_prompts(request.json_file_path)
-        
-        # Format prompts for batch API
-        tasks = processor.format_prompts_for_batch_api(batch_data)
-        
-        if not tasks:
-            raise HTTPException(status_code=400, detail="No valid tasks found in the batch file")
-        
-        # Create and upload batch file
-        batch_file_path = processor.create_batch_file(tasks)
-        file_id = processor.upload_batch_file(batch_file_path)
-        
-        # Create batch job
-        batch_job = processor.create_batch_job(file_id, request.description)
+        submission = await asyncio.to_thread(_submit_batch_file, request.json_file_path, request.description)
         
         return {
             "success": True,
-            "job_id": batch_job.id,
-            "status": batch_job.status,
-            "task_count": len(tasks),
+            **submission,
             "estimated_completion": "24 hours",
             "message": "Batch job submitted successfully"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting batch: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to submit batch: {str(e)}")
@@ -176,7 +226,7 @@ async def get_batch_status(job_id: str) -> BatchStatusResponse:
 @app.get("/batch/list")
 async def list_batch_jobs():
     """
-    List all batch jobs
+    List all batch jobs from the batch registry cache
     
     Returns:
         List of all batch jobs with their statuses
@@ -196,6 +246,20 @@ async def list_batch_jobs():
         raise HTTPException(status_code=500, detail=f"Failed to list batch jobs: {str(e)}")
 
 
+@app.get("/batch/dashboard")
+async def batch_dashboard():
+    """
+    Job counts, progress and ETAs for every active batch, served from the registry cache
+    
+    Returns:
+        Counts by status, active request totals and active jobs with ETAs
+    """
+    if not processor:
+        raise HTTPException(status_code=503, detail="Batch processor not available")
+    
+    return processor.batch_registry.dashboard()
+
+
 @app.get("/batch/{job_id}/results")
 async def get_batch_results(job_id: str):
     """
@@ -237,57 +301,88 @@ async def get_batch_results(job_id: str):
 
 
 @app.post("/batch/{job_id}/monitor")
-async def monitor_batch_job(job_id: str, background_tasks: BackgroundTasks):
+async def monitor_batch_job(job_id: str, auto_process: bool = True):
     """
     Start monitoring a batch job until completion
     
+    The job is handed to the shared monitor service, which polls it alongside
+    every other tracked job and downloads and processes results on completion.
+    
     Args:
         job_id: OpenAI batch job ID
-        background_tasks: FastAPI background tasks for async monitoring
+        auto_process: Download and process results when the job completes
         
     Returns:
-        Monitoring confirmation
+        Monitoring confirmation with the job's current table entry
     """
-    if not processor:
-        raise HTTPException(status_code=503, detail="Batch processor not available")
+    if not monitor_service:
+        raise HTTPException(status_code=503, detail="Batch monitor not available")
     
-    def monitor_job():
-        """Background task to monitor the job"""
-        try:
-            completed_job = processor.monitor_batch_job(job_id)
-            logger.info(f"Job {job_id} completed with status: {completed_job.status}")
-            
-            if completed_job.status == "completed":
-                # Auto-download and process results
-                results_file_path = processor.download_results(completed_job)
-                processed_results = processor.process_results(results_file_path)
-                logger.info(f"Results processed for job {job_id}. Total: {processed_results['total_results']}")
-                
-        except Exception as e:
-            logger.error(f"Error monitoring job {job_id}: {e}")
-    
-    # Add monitoring task to background
-    background_tasks.add_task(monitor_job)
+    job = monitor_service.track(job_id, auto_process=auto_process)
     
     return {
         "success": True,
         "job_id": job_id,
+        "job": job,
         "message": "Monitoring started in background"
     }
 
 
+@app.get("/batch/{job_id}/monitor")
+async def get_monitored_job(job_id: str):
+    """
+    Get the monitor's last recorded state for a batch job
+    
+    Args:
+        job_id: OpenAI batch job ID
+        
+    Returns:
+        The job's entry in the monitor job table
+    """
+    if not monitor_service:
+        raise HTTPException(status_code=503, detail="Batch monitor not available")
+    
+    job = monitor_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not monitored: {job_id}")
+    
+    return job
+
+
+@app.get("/batch/monitor/jobs")
+async def list_monitored_jobs():
+    """
+    List all jobs known to the batch monitor
+    
+    Returns:
+        Monitor job table entries, most recently tracked first
+    """
+    if not monitor_service:
+        raise HTTPException(status_code=503, detail="Batch monitor not available")
+    
+    jobs = monitor_service.list_jobs()
+    return {
+        "total_jobs": len(jobs),
+        "tracked_jobs": len(monitor_service.jobs),
+        "jobs": jobs
+    }
+
+
 @app.post("/batch/process-complete")
 async def process_complete_workflow(request: BatchSubmissionRequest):
     """
     Run the complete batch processing workflow (submit + monitor + process)
     
+    Submits the batch and hands it to the shared monitor, which processes the
+    results once the job completes. Poll ``/batch/{job_id}/monitor`` for progress.
+    
     Args:
         request: Batch submission request
         
     Returns:
-        Complete processed results
+        Job submission confirmation with job ID
     """
-    if not processor:
+    if not processor or not monitor_service:
         raise HTTPException(status_code=503, detail="Batch processor not available")
     
     # Validate file exists
@@ -295,13 +390,19 @@ async def process_complete_workflow(request: BatchSubmissionRequest):
         raise HTTPException(status_code=404, detail=f"File not found: {request.json_file_path}")
     
     try:
-        # Run complete workflow
-        results = processor.run_complete_batch_workflow(request.json_file_path)
+        submission = await asyncio.to_thread(_submit_batch_file, request.json_file_path, request.description)
+        if not submission["job_id"]:
+            return {"success": True, **submission, "message": "All prompts served from cache"}
         
-        if "error" in results:
-            raise HTTPException(status_code=500, detail=results["error"])
+        job = monitor_service.track(submission["job_id"], auto_process=True)
         
-        return results
+        return {
+            "success": True,
+            **submission,
+            "job": job,
+            "monitor_url": f"/batch/{submission['job_id']}/monitor",
+            "message": "Batch job submitted; results will be processed on completion"
+        }
         
     except HTTPException:
         raise
@@ -316,6 +417,9 @@ async def health_check():
     return {
         "status": "healthy",
         "processor_available": processor is not None,
+        "monitor_running": monitor_service is not None,
+        "tracked_jobs": len(monitor_service.jobs) if monitor_service else 0,
+        "registry_refresher_running": registry_refresher is not None,
         "openai_configured": bool(os.getenv("OPENAI_API_KEY"))
     }
 
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Wellspring Batch Monitor Service
+================================
+
+Asyncio-native monitoring for OpenAI batch jobs. A single poller task
+multiplexes every tracked job id, backs off exponentially (with jitter) while
+a job's state is unchanged, and records each state change in a SQLite job
+table. Thread usage stays constant no matter how many jobs are tracked.
+
+Author: BHSME Team
+Version: 1.0.0
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+
+try:
+    from openai import AsyncOpenAI, NotFoundError
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "shared_utils" / "data" / "wellspring.db"
+
+
+@dataclass
+class TrackedJob:
+    """In-memory polling state for a single batch job"""
+    job_id: str
+    auto_process: bool
+    status: Optional[str] = None
+    interval: float = 0.0
+    next_poll_at: float = 0.0
+    not_found_count: int = 0
+
+
+class BatchMonitorService:
+    """
+    Shared poller for OpenAI batch jobs
+
+    Usage:
+        service = BatchMonitorService(processor)
+        await service.start()
+        service.track("batch_abc123", auto_process=True)
+        ...
+        await service.stop()
+    """
+
+    def __init__(
+        self,
+        processor: Any,
+        db_path: Optional[Path] = None,
+        base_interval: float = 15.0,
+        max_interval: float = 600.0,
+        backoff_factor: float = 2.0,
+        jitter: float = 0.2,
+        max_concurrent_polls: int = 10,
+        max_not_found: int = 3
+    ):
+        """
+        Initialize the monitor service
+
+        Args:
+            processor: WellspringBatchProcessor used for credentials and result processing
+            db_path: SQLite database holding the job table
+            base_interval: Seconds between polls right after a state change
+            max_interval: Upper bound for the backed-off poll interval
+            backoff_factor: Interval multiplier while a job's state is unchanged
+            jitter: Fractional random spread applied to each interval
+            max_concurrent_polls: Maximum in-flight status requests per poll round
+            max_not_found: Consecutive "not found" polls after which a job is marked failed
+        """
+        if not OPENAI_AVAILABLE:
+            raise ImportError("OpenAI SDK not available. Install with: pip install openai --upgrade")
+
+        self.processor = processor
+        self.client = AsyncOpenAI(api_key=processor.api_key)
+        self.db_path = Path(db_path or DEFAULT_DB_PATH)
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.poll_semaphore = asyncio.Semaphore(max_concurrent_polls)
+        self.max_not_found = max_not_found
+
+        self.jobs: Dict[str, TrackedJob] = {}
+        self._wakeup = asyncio.Event()
+        self._poller: Optional[asyncio.Task] = None
+        # Strong references keep result downloads from being garbage-collected mid-run
+        self._finish_tasks: Set[asyncio.Task] = set()
+        # Job table updates from a round whose write failed, retried with the next round
+        self._unsaved_updates: List[Tuple[str, Dict[str, Any]]] = []
+
+        self._initialize_job_table()
+
+    async def start(self):
+        """Resume unfinished jobs from the job table and start the shared poller"""
+        if self._poller and not self._poller.done():
+            return
+
+        for row in self._load_unfinished_jobs():
+            self._add_job(row["job_id"], bool(row["auto_process"]), row["status"])
+
+        self._poller = asyncio.create_task(self._poll_loop())
+        logger.info(f"Batch monitor started with {len(self.jobs)} tracked job(s)")
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the shared poller and wait for in-flight result processing
+
+        Args:
+            timeout: Seconds to wait for result downloads before cancelling them (None waits)
+        """
+        if self._poller:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+
+        if self._finish_tasks:
+            logger.info(f"Waiting for {len(self._finish_tasks)} job(s) to finish processing results")
+            _, pending = await asyncio.wait(set(self._finish_tasks), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                logger.warning(f"Cancelled result processing for {len(pending)} job(s); "
+                               f"they will be finished on the next start")
+
+        await self.client.close()
+        logger.info("Batch monitor stopped")
+
+    def track(self, job_id: str, auto_process: bool = True) -> Dict[str, Any]:
+        """
+        Start tracking a batch job; returns immediately
+
+        Args:
+            job_id: OpenAI batch job ID
+            auto_process: Download and process results when the job completes
+
+        Returns:
+            The job's row in the job table
+        """
+        if job_id not in self.jobs:
+            self._add_job(job_id, auto_process)
+            self._upsert_jobs([(job_id, {"auto_process": auto_process, "tracked_at": datetime.now().isoformat()})])
+            logger.info(f"Tracking batch job: {job_id}")
+
+        self._wakeup.set()
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's row from the job table"""
+        rows = self._query("SELECT * FROM batch_monitor_jobs WHERE job_id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """List all jobs in the job table, most recently tracked first"""
+        return self._query("SELECT * FROM batch_monitor_jobs ORDER BY tracked_at DESC")
+
+    def _add_job(self, job_id: str, auto_process: bool, status: Optional[str] = None):
+        loop = asyncio.get_event_loop()
+        self.jobs[job_id] = TrackedJob(
+            job_id=job_id,
+            auto_process=auto_process,
+            status=status,
+            interval=self.base_interval,
+            next_poll_at=loop.time()
+        )
+
+    def _next_interval(self, job: TrackedJob, changed: bool) -> float:
+        """Reset the interval on change, otherwise back off exponentially"""
+        if changed:
+            job.interval = self.base_interval
+        else:
+            job.interval = min(job.interval * self.backoff_factor, self.max_interval)
+
+        spread = job.interval * self.jitter
+        return max(1.0, job.interval + random.uniform(-spread, spread))
+
+    async def _poll_loop(self):
+        """Single task that polls every due job and sleeps until the next one"""
+        loop = asyncio.get_event_loop()
+
+        while True:
+            try:
+                await self._poll_round(loop)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # One bad round (e.g. a locked database) must not end monitoring for every job
+                logger.error(f"Batch monitor poll round failed; retrying in {self.base_interval:g}s: {e}")
+                await asyncio.sleep(self.base_interval)
+
+    async def _poll_round(self, loop: asyncio.AbstractEventLoop):
+        """Poll every due job once, or wait until the next job is due"""
+        now = loop.time()
+        due = [job for job in self.jobs.values() if job.next_poll_at <= now]
+
+        if due:
+            polled = await asyncio.gather(*(self._poll_job(job) for job in due))
+            updates = self._unsaved_updates + [(job_id, fields) for job_id, fields, _ in polled]
+            try:
+                self._upsert_jobs(updates)
+                self._unsaved_updates = []
+            except Exception:
+                # Status changes are only reported once, so keep them for the next round
+                self._unsaved_updates = updates
+                raise
+            self._record_in_registry([batch_job for _, _, batch_job in polled if batch_job is not None])
+
+            for job_id, fields, batch_job in polled:
+                if batch_job is not None and batch_job.status in TERMINAL_STATUSES:
+                    job = self.jobs.pop(job_id)
+                    task = asyncio.create_task(self._finish_job(job, batch_job))
+                    self._finish_tasks.add(task)
+                    task.add_done_callback(self._finish_tasks.discard)
+                elif "finished_at" in fields:
+                    self.jobs.pop(job_id)
+            return
+
+        self._wakeup.clear()
+        timeout = None
+        if self.jobs:
+            timeout = max(0.0, min(job.next_poll_at for job in self.jobs.values()) - now)
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _poll_job(self, job: TrackedJob) -> Tuple[str, Dict[str, Any], Any]:
+        """
+        Poll one job and schedule its next check
+
+        Returns:
+            Tuple of (job_id, job table updates, retrieved batch job or None)
+        """
+        loop = asyncio.get_event_loop()
+        now_iso = datetime.now().isoformat()
+
+        try:
+            async with self.poll_semaphore:
+                batch_job = await self.client.batches.retrieve(job.job_id)
+        except Exception as e:
+            logger.error(f"Error polling batch job {job.job_id}: {e}")
+            updates = {"last_checked_at": now_iso, "error_message": str(e)}
+
+            if isinstance(e, NotFoundError) or getattr(e, "status_code", None) == 404:
+                job.not_found_count += 1
+                if job.not_found_count >= self.max_not_found:
+                    logger.warning(f"Batch job {job.job_id} not found after {job.not_found_count} polls; "
+                                   f"marking it failed")
+                    updates.update(status="failed", status_changed_at=now_iso, finished_at=now_iso)
+                    return job.job_id, updates, None
+            else:
+                job.not_found_count = 0
+
+            job.next_poll_at = loop.time() + self._next_interval(job, changed=False)
+            return job.job_id, updates, None
+
+        job.not_found_count = 0
+
+        changed = batch_job.status != job.status
+        request_counts = batch_job.request_counts.__dict__ if batch_job.request_counts else None
+        updates: Dict[str, Any] = {
+            "request_counts": json.dumps(request_counts) if request_counts else None,
+            "last_checked_at": now_iso
+        }
+
+        if changed:
+            logger.info(f"Job {job.job_id} status: {job.status} -> {batch_job.status}")
+            job.status = batch_job.status
+            updates.update(
+                status=batch_job.status,
+                output_file_id=batch_job.output_file_id,
+                error_file_id=batch_job.error_file_id,
+                status_changed_at=now_iso,
+                error_message=None
+            )
+
+        job.next_poll_at = loop.time() + self._next_interval(job, changed)
+        return job.job_id, updates, batch_job
+
+    async def _finish_job(self, job: TrackedJob, batch_job: Any):
+        """Record the final state and optionally download and process results"""
+        updates: Dict[str, Any] = {"finished_at": datetime.now().isoformat()}
+
+        if batch_job.status == "completed" and job.auto_process:
+            try:
+                # Download and processing are one-off blocking calls per job
+                results_file_path = await asyncio.to_thread(self.processor.download_results, batch_job)
+                processed_results = await asyncio.to_thread(self.processor.process_results, results_file_path)
+                updates["results_path"] = results_file_path
+                logger.info(f"Results processed for job {job.job_id}. Total: {processed_results['total_results']}")
+            except Exception as e:
+                logger.error(f"Error processing results for job {job.job_id}: {e}")
+                updates["error_message"] = str(e)
+
+        try:
+            self._upsert_jobs([(job.job_id, updates)])
+        except Exception as e:
+            # finished_at stays unset, so the job is picked up again on the next start
+            logger.error(f"Error recording finished job {job.job_id}: {e}")
+            return
+        logger.info(f"Job {job.job_id} finished with status: {batch_job.status}")
+
+    def _record_in_registry(self, batch_jobs: List[Any]):
+        """Share freshly polled states with the processor's batch registry, sparing it its own API calls"""
+        registry = getattr(self.processor, "batch_registry", None)
+        if registry is None:
+            return
+        try:
+            registry.record_many(batch_jobs)
+        except Exception as e:
+            logger.error(f"Error recording polled jobs in the batch registry: {e}")
+
+    def _initialize_job_table(self):
+        """Create the job table if needed"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS batch_monitor_jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT,
+                auto_process INTEGER DEFAULT 1,
+                request_counts TEXT,
+                output_file_id TEXT,
+                error_file_id TEXT,
+                results_path TEXT,
+                error_message TEXT,
+                tracked_at TEXT,
+                last_checked_at TEXT,
+                status_changed_at TEXT,
+                finished_at TEXT
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _load_unfinished_jobs(self) -> List[Dict[str, Any]]:
+        return self._query("SELECT * FROM batch_monitor_jobs WHERE finished_at IS NULL")
+
+    def _upsert_jobs(self, updates: List[Tuple[str, Dict[str, Any]]]):
+        """Insert missing job rows and update the given columns in one transaction"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for job_id, fields in updates:
+                conn.execute("INSERT OR IGNORE INTO batch_monitor_jobs (job_id, tracked_at) VALUES (?, ?)",
+                             (job_id, datetime.now().isoformat()))
+
+                if "auto_process" in fields:
+                    fields["auto_process"] = int(bool(fields["auto_process"]))
+
+                if fields:
+                    assignments = ", ".join(f"{column} = ?" for column in fields)
+                    conn.execute(f"UPDATE batch_monitor_jobs SET {assignments} WHERE job_id = ?",
+                                 (*fields.values(), job_id))
+
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+        conn.close()
+        return rows
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Wellspring Batch Sharder
+========================
+
+Splits large batch submissions into JSONL shards that respect the OpenAI
+Batch API request-count and file-size limits, submits the shards
+concurrently, and tracks them as one logical job. Shard results are merged
+through ``WellspringBatchProcessor.process_results``.
+
+Author: BHSME Team
+Version: 1.0.0
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# OpenAI Batch API limits, with headroom on the file size
+MAX_REQUESTS_PER_SHARD = 50000
+MAX_SHARD_BYTES = 190 * 1024 * 1024
+DEFAULT_MAX_CONCURRENT_SHARDS = 8
+
+# Shards whose upload or job creation failed; they have no batch job to poll
+SUBMIT_FAILED = "submit_failed"
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled", SUBMIT_FAILED}
+
+
+class WellspringBatchSharder:
+    """
+    Shards, submits and tracks a large batch as one logical job
+
+    Usage:
+        sharder = WellspringBatchSharder(processor)
+        results = sharder.run_sharded_workflow("visual_batch_prompts.json")
+    """
+
+    def __init__(
+        self,
+        processor: Any,
+        max_requests_per_shard: int = MAX_REQUESTS_PER_SHARD,
+        max_shard_bytes: int = MAX_SHARD_BYTES,
+        max_concurrent_shards: int = DEFAULT_MAX_CONCURRENT_SHARDS
+    ):
+        """
+        Initialize the sharder
+
+        Args:
+            processor: WellspringBatchProcessor used for file and job operations
+            max_requests_per_shard: Maximum requests per shard file
+            max_shard_bytes: Maximum size in bytes of a shard file
+            max_concurrent_shards: Maximum shards uploaded/downloaded at once
+        """
+        self.processor = processor
+        self.max_requests_per_shard = max_requests_per_shard
+        self.max_shard_bytes = max_shard_bytes
+        self.max_concurrent_shards = max_concurrent_shards
+        self._manifest_lock = threading.Lock()
+
+    def shard_tasks(self, tasks: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Split tasks into count- and size-bounded shards
+
+        Args:
+            tasks: Formatted batch API tasks
+
+        Returns:
+            List of shards, each a list of tasks
+        """
+        shards = []
+        current_shard = []
+        current_bytes = 0
+
+        for task in tasks:
+            task_bytes = len(json.dumps(task).encode("utf-8")) + 1
+            if task_bytes > self.max_shard_bytes:
+                raise ValueError(f"Task {task.get('custom_id')} exceeds the maximum shard size")
+
+            if current_shard and (len(current_shard) >= self.max_requests_per_shard
+                                  or current_bytes + task_bytes > self.max_shard_bytes):
+                shards.append(current_shard)
+                current_shard = []
+                current_bytes = 0
+
+            current_shard.append(task)
+            current_bytes += task_bytes
+
+        if current_shard:
+            shards.append(current_shard)
+
+        logger.info(f"Split {len(tasks)} tasks into {len(shards)} shard(s)")
+        return shards
+
+    def submit_sharded_job(self, tasks: List[Dict[str, Any]],
+                           description: str = "Wellspring Visual Research Batch") -> Dict[str, Any]:
+        """
+        Write every shard file, then upload and create batch jobs concurrently
+
+        The manifest is saved as each shard is submitted, so jobs that were
+        created are recorded even if another shard fails. Failed shards are
+        marked ``submit_failed`` and can be retried with resubmit_failed_shards.
+
+        Args:
+            tasks: Formatted batch API tasks
+            description: Description for the logical job
+
+        Returns:
+            Logical job manifest
+        """
+        logical_job_id = f"sharded_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        shards = self.shard_tasks(tasks)
+
+        manifest = {
+            "logical_job_id": logical_job_id,
+            "description": description,
+            "created_at": datetime.now().isoformat(),
+            "task_count": len(tasks),
+            "status": "submitting",
+            "shards": [
+                {
+                    "index": index,
+                    "task_count": len(shard),
+                    "status": "pending",
+                    "file_path": self.processor.create_batch_file(
+                        shard, filename=f"{logical_job_id}_shard{index:03d}.jsonl"
+                    )
+                }
+                for index, shard in enumerate(shards)
+            ]
+        }
+        self.save_manifest(manifest)
+
+        self._submit_shards(manifest, manifest["shards"])
+        logger.info(f"Submitted logical job {logical_job_id} as {len(shards)} batch job(s)")
+        return manifest
+
+    def resubmit_failed_shards(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Retry shards whose upload or job creation failed
+
+        Args:
+            manifest: Logical job manifest
+
+        Returns:
+            Updated manifest
+        """
+        failed = [shard for shard in manifest["shards"] if shard["status"] == SUBMIT_FAILED]
+        if failed:
+            logger.info(f"Resubmitting {len(failed)} failed shard(s) of {manifest['logical_job_id']}")
+            self._submit_shards(manifest, failed)
+        return manifest
+
+    def _submit_shards(self, manifest: Dict[str, Any], shards: List[Dict[str, Any]]):
+        """Upload and create batch jobs for the given shards, saving the manifest after each"""
+        shard_total = len(manifest["shards"])
+
+        def submit_shard(shard_info: Dict[str, Any]) -> Dict[str, Any]:
+            # Workers only read the manifest; updates are applied by the collecting thread
+            updates: Dict[str, Any] = {"file_id": shard_info.get("file_id")}
+            try:
+                if not updates["file_id"]:
+                    updates["file_id"] = self.processor.upload_batch_file(shard_info["file_path"])
+                batch_job = self.processor.create_batch_job(
+                    updates["file_id"],
+                    f"{manifest['description']} (shard {shard_info['index'] + 1}/{shard_total})"
+                )
+                updates.update(job_id=batch_job.id, status=batch_job.status, error=None)
+            except Exception as e:
+                logger.error(f"Error submitting shard {shard_info['index']}: {e}")
+                updates.update(status=SUBMIT_FAILED, error=str(e))
+            return updates
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_shards) as executor:
+            futures = {executor.submit(submit_shard, shard_info): shard_info for shard_info in shards}
+            for future in as_completed(futures):
+                shard_info = futures[future]
+                updates = future.result()
+                error = updates.pop("error")
+                shard_info.update({key: value for key, value in updates.items() if value is not None})
+                if error is None:
+                    shard_info.pop("error", None)
+                else:
+                    shard_info["error"] = error
+                self.save_manifest(manifest)
+
+        failed_count = sum(1 for shard in manifest["shards"] if shard["status"] == SUBMIT_FAILED)
+        manifest["status"] = "partially_submitted" if failed_count else "submitted"
+        self.save_manifest(manifest)
+        if failed_count:
+            logger.warning(f"{failed_count} shard(s) of {manifest['logical_job_id']} failed to submit; "
+                           f"rerun with --resume-sharded {manifest['logical_job_id']} to retry them")
+
+    def monitor_sharded_job(self, manifest: Dict[str, Any], check_interval: int = 60) -> Dict[str, Any]:
+        """
+        Poll every unfinished shard until all reach a terminal status
+
+        Args:
+            manifest: Logical job manifest
+            check_interval: Seconds between polling rounds
+
+        Returns:
+            Updated manifest
+        """
+        logger.info(f"Monitoring logical job: {manifest['logical_job_id']}")
+
+        while True:
+            pending = [shard for shard in manifest["shards"] if shard["status"] not in TERMINAL_STATUSES]
+
+            for shard in pending:
+                try:
+                    status_info = self.processor.get_batch_status(shard["job_id"])
+                    shard["status"] = status_info["status"]
+                    shard["request_counts"] = status_info["request_counts"]
+                except Exception as e:
+                    logger.error(f"Error checking shard {shard['index']}: {e}")
+
+            self.save_manifest(manifest)
+
+            remaining = [shard for shard in manifest["shards"] if shard["status"] not in TERMINAL_STATUSES]
+            logger.info(f"Logical job {manifest['logical_job_id']}: "
+                        f"{len(manifest['shards']) - len(remaining)}/{len(manifest['shards'])} shards finished")
+
+            if not remaining:
+                return manifest
+
+            time.sleep(check_interval)
+
+    def collect_sharded_results(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Download completed shards concurrently and merge them via process_results
+
+        Args:
+            manifest: Logical job manifest
+
+        Returns:
+            Merged processed results summary
+        """
+        completed = [shard for shard in manifest["shards"] if shard["status"] == "completed"]
+
+        def download_shard(shard: Dict[str, Any]) -> str:
+            batch_job = self.processor.client.batches.retrieve(shard["job_id"])
+            # Shards finish together, so name results by shard rather than by download time
+            shard["results_file"] = self.processor.download_results(
+                batch_job, filename=f"{manifest['logical_job_id']}_shard{shard['index']:03d}_results.jsonl"
+            )
+            return shard["results_file"]
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_shards) as executor:
+            results_files = list(executor.map(download_shard, completed))
+
+        # process_results ingests into the shared SQLite store, so shards are merged sequentially
+        merged_results = self.processor.merge_processed_results(
+            [self.processor.process_results(results_file) for results_file in results_files]
+        )
+        merged_results["logical_job_id"] = manifest["logical_job_id"]
+        merged_results["failed_shards"] = [
+            shard["index"] for shard in manifest["shards"] if shard["status"] != "completed"
+        ]
+
+        manifest["status"] = "completed" if not merged_results["failed_shards"] else "partial"
+        self.save_manifest(manifest)
+
+        logger.info(f"Merged {merged_results['total_results']} results from {len(results_files)} shard(s)")
+        return merged_results
+
+    def run_sharded_workflow(self, json_file_path: str, check_interval: int = 60) -> Dict[str, Any]:
+        """
+        Run the complete sharded workflow: format, shard, submit, monitor and merge
+
+        Args:
+            json_file_path: Path to the visual batch prompts JSON file
+            check_interval: Seconds between polling rounds
+
+        Returns:
+            Merged processed results
+        """
+        batch_data = self.processor.load_visual_batch_prompts(json_file_path)
+        tasks = self.processor.format_prompts_for_batch_api(batch_data)
+
+        if not tasks:
+            logger.warning("No valid tasks found to process")
+            return {"error": "No valid tasks found"}
+
+        tasks, cached_results = self.processor.apply_prompt_cache(tasks)
+        if not tasks:
+            logger.info("All prompts served from cache")
+            cached_results["markdown_files"] = self.processor.write_section_markdown(cached_results)
+            return cached_results
+
+        manifest = self.submit_sharded_job(tasks, "Wellspring Visual Research Batch Processing")
+        manifest = self.monitor_sharded_job(manifest, check_interval)
+        merged_results = self.collect_sharded_results(manifest)
+
+        if cached_results:
+            merged_results.update(self.processor.merge_processed_results([cached_results, merged_results]))
+
+        merged_results["markdown_files"] = self.processor.write_section_markdown(merged_results)
+        return merged_results
+
+    def manifest_path(self, logical_job_id: str) -> Path:
+        """Path of the JSON manifest for a logical job"""
+        return self.processor.output_dir / f"{logical_job_id}_manifest.json"
+
+    def save_manifest(self, manifest: Dict[str, Any]):
+        """Persist a logical job manifest atomically"""
+        path = self.manifest_path(manifest["logical_job_id"])
+        partial_path = path.with_suffix(".json.partial")
+        with self._manifest_lock:
+            with open(partial_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            partial_path.replace(path)
+
+    def load_manifest(self, logical_job_id: str) -> Optional[Dict[str, Any]]:
+        """Load a logical job manifest, if it exists"""
+        path = self.manifest_path(logical_job_id)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
@@ -16,12 +16,13 @@ def check_and_process():
     
     try:
         p = WellspringBatchProcessor()
-        job = p.client.batches.retrieve(job_id)
+        # Status comes from the batch registry cache; the API is only hit when it is stale
+        status = p.get_batch_status(job_id)
         
-        print(f"📊 Status: {job.status}")
+        print(f"📊 Status: {status['status']}")
         
-        if hasattr(job, 'request_counts') and job.request_counts:
-            counts = job.request_counts.__dict__
+        if status['request_counts']:
+            counts = status['request_counts']
             completed = counts.get('completed', 0)
             total = counts.get('total', 0)
             failed = counts.get('failed', 0)
@@ -31,11 +32,12 @@ def check_and_process():
             print(f"✅ Completed: {completed}")
             print(f"❌ Failed: {failed}")
         
-        if job.status == "completed":
+        if status['status'] == "completed":
             print()
             print("🎉 JOB COMPLETED! Processing results...")
             
             # Download and process results
+            job = p.client.batches.retrieve(job_id)
             results_file = p.download_results(job)
             processed_results = p.process_results(results_file)
             
@@ -58,11 +60,13 @@ def check_and_process():
             print("   • Use the insights for your Wellspring Manual")
             print("   • Run more batch jobs for additional research!")
             
-        elif job.status in ["failed", "expired", "cancelled"]:
-            print(f"❌ Job {job.status}. Check logs for details.")
+        elif status['status'] in ["failed", "expired", "cancelled"]:
+            print(f"❌ Job {status['status']}. Check logs for details.")
             
         else:
-            print(f"⏳ Job still {job.status}. Check again later.")
+            print(f"⏳ Job still {status['status']}. Check again later.")
+            if status.get('eta_seconds'):
+                print(f"🕒 ETA: ~{status['eta_seconds'] // 60} min")
             print("💡 Tip: Run this script periodically to check completion")
         
     except Exception as e:
@@ -28,6 +28,11 @@ def check_job_status():
         print(f'❌ Failed: {failed}')
         print(f'⏳ Remaining: {total - completed}')
     
+    if s.get('eta_seconds'):
+        print(f'🕒 ETA: ~{s["eta_seconds"] // 60} min (at current throughput)')
+    if s.get('cache_age_seconds') is not None:
+        print(f'💾 Cached status, {s["cache_age_seconds"]:.0f}s old')
+    
     print()
     print('📋 WHAT THIS MEANS:')
     print('• OpenAI is actively processing your research prompts')
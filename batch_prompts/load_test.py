@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Wellspring Pipeline Load Test
+=============================
+
+Measures end-to-end throughput (jobs per hour) of the batch and image
+pipelines against the local mock OpenAI server, so performance work can be
+benchmarked without a live account or API spend.
+
+Batch mode runs ``WellspringBatchProcessor.run_complete_batch_workflow`` for
+many synthetic prompt files concurrently: upload, batch creation, polling,
+streamed download and SQLite ingestion all run for real. Image mode runs the
+``ImageGenerationScheduler`` worker pool against the mock images endpoint.
+
+Each run works in its own directory with its own results store, prompt
+cache and batch registry, so it never touches real batch data.
+
+Usage:
+    python load_test.py --jobs 20 --concurrency 8 --prompts-per-job 50
+    python load_test.py --mode images --jobs 60 --client-rpm 120 --images-per-minute 100
+    python load_test.py --base-url http://127.0.0.1:8100/v1   # use an already-running mock
+
+Author: BHSME Team
+Version: 1.0.0
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from mock_openai_server import MockOpenAIConfig, create_app
+from openai_batch_processor import WellspringBatchProcessor
+
+
+DEFAULT_PORT = 8100
+
+
+class LoadTestBatchProcessor(WellspringBatchProcessor):
+    """Batch processor that keeps all of its files and databases in a scratch directory"""
+
+    def __init__(self, work_dir: Path, api_key: Optional[str] = None):
+        self.work_dir = Path(work_dir)
+        super().__init__(api_key=api_key, db_path=self.work_dir / "wellspring.db")
+
+    def setup_directories(self):
+        self.base_dir = self.work_dir
+        self.input_dir = self.base_dir / "input"
+        self.output_dir = self.base_dir / "output"
+        self.logs_dir = self.base_dir / "logs"
+
+        for directory in [self.input_dir, self.output_dir, self.logs_dir]:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        self.results_db_path = self.output_dir / "batch_results.db"
+        self.initialize_results_store()
+
+
+def start_mock_server(config: MockOpenAIConfig, port: int = DEFAULT_PORT, host: str = "127.0.0.1"):
+    """
+    Run the mock server in a background thread
+
+    Returns:
+        The uvicorn server; set ``should_exit`` to stop it
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline or not thread.is_alive():
+            raise RuntimeError(f"Mock server failed to start on {host}:{port}")
+        time.sleep(0.05)
+    return server
+
+
+def synthetic_batch_prompts(run_id: str, job_index: int, prompts_per_job: int) -> Dict[str, Any]:
+    """A visual batch prompts document with unique prompts, so nothing is served from cache"""
+    return {
+        "batch_prompts": {
+            "prompt_sets": [{
+                "section": f"loadtest{job_index:04d}",
+                "research_prompts": {
+                    f"prompt{n:04d}": (f"[{run_id}/{job_index}/{n}] Summarize design guidance for "
+                                       f"behavioral health facility feature {n}.")
+                    for n in range(prompts_per_job)
+                }
+            }]
+        }
+    }
+
+
+def run_batch_load_test(processor: WellspringBatchProcessor, jobs: int, concurrency: int,
+                        prompts_per_job: int, poll_interval: float) -> List[Dict[str, Any]]:
+    """
+    Run many complete batch workflows concurrently
+
+    Returns:
+        One record per job with timing, status and result count
+    """
+    run_id = uuid.uuid4().hex[:8]
+
+    def run_job(job_index: int) -> Dict[str, Any]:
+        prompts_path = processor.input_dir / f"load_test_{run_id}_{job_index:04d}.json"
+        with open(prompts_path, 'w', encoding='utf-8') as f:
+            json.dump(synthetic_batch_prompts(run_id, job_index, prompts_per_job), f)
+
+        started = time.perf_counter()
+        try:
+            results = processor.run_complete_batch_workflow(str(prompts_path), check_interval=poll_interval)
+            error = results.get("error")
+            items = results.get("total_results", 0)
+        except Exception as e:
+            error, items = str(e), 0
+
+        return {
+            "job": job_index,
+            "success": error is None,
+            "error": error,
+            "items": items,
+            "seconds": time.perf_counter() - started
+        }
+
+    records = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(run_job, job_index) for job_index in range(jobs)]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            print(f"   {'✅' if record['success'] else '❌'} job {record['job']:4d}: "
+                  f"{record['items']} results in {record['seconds']:.1f}s"
+                  + (f" - {record['error']}" if record['error'] else ""))
+    return records
+
+
+def run_image_load_test(work_dir: Path, jobs: int, concurrency: int, client_rpm: float) -> List[Dict[str, Any]]:
+    """
+    Generate and download synthetic images through the scheduler worker pool
+
+    Returns:
+        One record per image with completion time and status
+    """
+    from wellspring_image_scheduler import ImageGenerationScheduler, ImageJob
+
+    image_dir = work_dir / "images"
+    image_dir.mkdir(parents=True, exist_ok=True)
+
+    image_jobs = []
+    for n in range(jobs):
+        job_id = f"image_{n:04d}"
+        image_jobs.append(ImageJob(job_id=job_id, prompt=f"Load test image {n}", filepath=image_dir / f"{job_id}.png",
+                                   params={"model": "dall-e-3", "size": "1024x1024", "n": 1}))
+
+    records = []
+    run_started = time.perf_counter()
+
+    def record(result: Dict[str, Any]):
+        success = result["status"] == "success"
+        records.append({
+            "job": result["job_id"],
+            "success": success,
+            "error": None if success else result.get("error", result["status"]),
+            "items": 1 if success else 0,
+            "bytes": result.get("bytes", 0),
+            # Images share one worker pool, so latency is time from run start to completion
+            "seconds": time.perf_counter() - run_started
+        })
+
+    scheduler = ImageGenerationScheduler(requests_per_minute=client_rpm, max_workers=concurrency,
+                                         progress_file=work_dir / "image_progress.jsonl")
+    asyncio.run(scheduler.run(image_jobs, on_result=record))
+    return records
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(records: List[Dict[str, Any]], wall_seconds: float) -> Dict[str, Any]:
+    """Throughput and latency figures for a run"""
+    succeeded = [record for record in records if record["success"]]
+    latencies = [record["seconds"] for record in succeeded]
+    items = sum(record["items"] for record in succeeded)
+    hours = wall_seconds / 3600 if wall_seconds > 0 else float("inf")
+
+    return {
+        "jobs": len(records),
+        "succeeded": len(succeeded),
+        "failed": len(records) - len(succeeded),
+        "wall_seconds": round(wall_seconds, 2),
+        "jobs_per_hour": round(len(succeeded) / hours, 1),
+        "items_per_hour": round(items / hours, 1),
+        "latency_seconds": {
+            "p50": round(percentile(latencies, 0.5), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "max": round(max(latencies, default=0.0), 2)
+        },
+        "errors": sorted({record["error"] for record in records if record["error"]})[:10]
+    }
+
+
+def fetch_mock_stats(base_url: str) -> Optional[Dict[str, Any]]:
+    """Counters from the mock server, if the base URL points at one"""
+    try:
+        response = httpx.get(base_url.rstrip("/").removesuffix("/v1") + "/mock/stats", timeout=10)
+        return response.json() if response.status_code == 200 else None
+    except httpx.HTTPError:
+        return None
+
+
+def main():
+    """CLI interface for the load test"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Wellspring pipeline load test against the mock OpenAI server")
+    parser.add_argument("--mode", choices=["batch", "images"], default="batch")
+    parser.add_argument("--jobs", type=int, default=20, help="Batch jobs (batch mode) or images (images mode)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent workflows or image workers")
+    parser.add_argument("--prompts-per-job", type=int, default=50)
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between batch status checks")
+    parser.add_argument("--client-rpm", type=float, default=600, help="Image scheduler requests-per-minute budget")
+    parser.add_argument("--base-url", help="Use an already-running server instead of starting the mock")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--work-dir", help="Scratch directory (defaults to load_tests/run_<timestamp>)")
+
+    mock_defaults = MockOpenAIConfig.from_env()
+    mock_group = parser.add_argument_group("mock server behaviour")
+    for config_field in fields(MockOpenAIConfig):
+        default = getattr(mock_defaults, config_field.name)
+        mock_group.add_argument(f"--{config_field.name.replace('_', '-')}", type=type(default), default=default)
+
+    args = parser.parse_args()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    work_dir = Path(args.work_dir) if args.work_dir else Path(__file__).parent / "load_tests" / f"run_{timestamp}"
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        config = MockOpenAIConfig(**{f.name: getattr(args, f.name) for f in fields(MockOpenAIConfig)})
+        server = start_mock_server(config, port=args.port)
+        base_url = f"http://127.0.0.1:{args.port}/v1"
+
+    # OpenAI SDK clients created from here on talk to the mock
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "mock-load-test-key")
+
+    print("🧪 WELLSPRING PIPELINE LOAD TEST")
+    print("=" * 50)
+    print(f"🎯 Mode: {args.mode} | jobs: {args.jobs} | concurrency: {args.concurrency}")
+    print(f"🌐 API: {base_url}")
+    print(f"📁 Work dir: {work_dir}")
+    print("")
+
+    try:
+        started = time.perf_counter()
+        if args.mode == "batch":
+            processor = LoadTestBatchProcessor(work_dir)
+            records = run_batch_load_test(processor, args.jobs, args.concurrency,
+                                          args.prompts_per_job, args.poll_interval)
+        else:
+            records = run_image_load_test(work_dir, args.jobs, args.concurrency, args.client_rpm)
+        wall_seconds = time.perf_counter() - started
+
+        report = {
+            "mode": args.mode,
+            "timestamp": timestamp,
+            "base_url": base_url,
+            "parameters": vars(args),
+            "summary": summarize(records, wall_seconds),
+            "mock_stats": fetch_mock_stats(base_url),
+            "jobs": sorted(records, key=lambda record: str(record["job"]))
+        }
+    finally:
+        if server:
+            server.should_exit = True
+
+    report_path = work_dir / f"load_test_report_{timestamp}.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    summary = report["summary"]
+    print("")
+    print("📊 LOAD TEST RESULTS")
+    print("=" * 30)
+    print(f"✅ Succeeded: {summary['succeeded']}/{summary['jobs']}")
+    print(f"⏱️  Wall time: {summary['wall_seconds']}s")
+    print(f"🚀 Jobs/hour: {summary['jobs_per_hour']}")
+    print(f"📦 {'Results' if args.mode == 'batch' else 'Images'}/hour: {summary['items_per_hour']}")
+    print(f"📈 Latency p50/p95/max: {summary['latency_seconds']['p50']}s / "
+          f"{summary['latency_seconds']['p95']}s / {summary['latency_seconds']['max']}s")
+    print(f"📄 Report: {report_path}")
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+Mock OpenAI Server for Offline Load Testing
+===========================================
+
+Local stand-in for the parts of the OpenAI API the Wellspring pipeline uses:
+files, batches, chat completions and image generation. Point any OpenAI SDK
+client at it with ``OPENAI_BASE_URL=http://127.0.0.1:8100/v1``.
+
+Latency, error rates, rate limits and batch processing time are all
+configurable, either with MOCK_OPENAI_* environment variables, CLI flags, or
+at runtime via ``POST /mock/config``. Counters are exposed at ``/mock/stats``.
+
+Batches advance through validating -> in_progress -> finalizing -> completed
+based on elapsed time; the output and error files are generated when the
+batch first reaches completed.
+
+File uploads require python-multipart alongside FastAPI.
+
+Author: BHSME Team
+Version: 1.0.0
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+FILE_CHUNK_SIZE = 64 * 1024
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+@dataclass
+class MockOpenAIConfig:
+    """Behaviour knobs for the mock server"""
+    latency_ms: float = 50.0
+    latency_jitter_ms: float = 20.0
+    error_rate: float = 0.0
+    requests_per_minute: float = 0.0
+    images_per_minute: float = 0.0
+    validation_seconds: float = 1.0
+    batch_seconds: float = 5.0
+    batch_seconds_per_request: float = 0.01
+    finalizing_seconds: float = 1.0
+    batch_failure_rate: float = 0.0
+    completion_words: int = 200
+    image_side: int = 256
+
+    @classmethod
+    def from_env(cls) -> "MockOpenAIConfig":
+        """Build a config from MOCK_OPENAI_<FIELD> environment variables"""
+        config = cls()
+        for config_field in fields(cls):
+            value = os.getenv(f"MOCK_OPENAI_{config_field.name.upper()}")
+            if value is not None:
+                config.update({config_field.name: value})
+        return config
+
+    def update(self, changes: Dict[str, Any]):
+        """Apply a partial update, coercing values to each field's type"""
+        for name, value in changes.items():
+            if not hasattr(self, name):
+                raise ValueError(f"Unknown config field: {name}")
+            setattr(self, name, type(getattr(self, name))(value))
+
+
+class RateLimiter:
+    """Token bucket that rejects instead of waiting, like the real API"""
+
+    def __init__(self):
+        # None means full: capacity depends on the limit, known only per call
+        self.tokens: Optional[float] = None
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, per_minute: float) -> Optional[float]:
+        """Take a token; return None on success or the seconds until one is available"""
+        if per_minute <= 0:
+            # Refill so a limit enabled later starts with a full bucket
+            self.tokens = None
+            return None
+
+        rate = per_minute / 60.0
+        capacity = max(1.0, per_minute / 6.0)
+        with self._lock:
+            now = time.monotonic()
+            if self.tokens is None:
+                self.tokens = capacity
+            else:
+                self.tokens = min(capacity, self.tokens + (now - self.updated_at) * rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            return (1 - self.tokens) / rate
+
+
+def _error_body(message: str, error_type: str, code: Optional[str] = None) -> Dict[str, Any]:
+    """OpenAI-style error payload"""
+    return {"error": {"message": message, "type": error_type, "param": None, "code": code}}
+
+
+def _new_id(prefix: str, separator: str = "_") -> str:
+    return f"{prefix}{separator}{uuid.uuid4().hex[:24]}"
+
+
+def _png_bytes(side: int) -> bytes:
+    """A valid, incompressible RGB PNG so downloads have realistic sizes"""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+    raw = b"".join(b"\x00" + os.urandom(side * 3) for _ in range(side))
+    header = struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b"")
+
+
+class MockOpenAIState:
+    """In-memory files, batches and counters"""
+
+    def __init__(self, config: MockOpenAIConfig):
+        self.config = config
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.file_data: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.images: Dict[str, bytes] = {}
+        self.request_limiter = RateLimiter()
+        self.image_limiter = RateLimiter()
+        self.stats: Counter = Counter()
+        self._image_template: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.files.clear()
+            self.file_data.clear()
+            self.batches.clear()
+            self.images.clear()
+            self.stats.clear()
+            self._image_template = None
+
+    # Files
+
+    def add_file(self, data: bytes, filename: str, purpose: str) -> Dict[str, Any]:
+        file_object = {
+            "id": _new_id("file", "-"),
+            "object": "file",
+            "bytes": len(data),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+            "status_details": None
+        }
+        with self._lock:
+            self.files[file_object["id"]] = file_object
+            self.file_data[file_object["id"]] = data
+        return file_object
+
+    # Chat completions
+
+    def chat_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Deterministic fake completion derived from the prompt"""
+        prompt = json.dumps(body.get("messages", []), sort_keys=True)
+        seed = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        words = [seed[i:i + 6] for i in range(0, len(seed), 6)]
+        content = " ".join(words[i % len(words)] for i in range(self.config.completion_words))
+        prompt_tokens = max(1, len(prompt) // 4)
+
+        return {
+            "id": _new_id("chatcmpl"),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": f"Mock response {seed[:12]}: {content}"},
+                "logprobs": None,
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": self.config.completion_words,
+                "total_tokens": prompt_tokens + self.config.completion_words
+            }
+        }
+
+    # Images
+
+    def image_bytes(self) -> bytes:
+        if self._image_template is None:
+            self._image_template = _png_bytes(self.config.image_side)
+        return self._image_template
+
+    # Batches
+
+    def create_batch(self, input_file_id: str, endpoint: str, completion_window: str,
+                     metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        now = int(time.time())
+        batch = {
+            "id": _new_id("batch"),
+            "object": "batch",
+            "endpoint": endpoint,
+            "errors": None,
+            "input_file_id": input_file_id,
+            "completion_window": completion_window,
+            "status": "validating",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": now,
+            "in_progress_at": None,
+            "expires_at": now + 24 * 3600,
+            "finalizing_at": None,
+            "completed_at": None,
+            "failed_at": None,
+            "expired_at": None,
+            "cancelling_at": None,
+            "cancelled_at": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": metadata
+        }
+
+        requests, errors = self._parse_batch_input(input_file_id, endpoint)
+        processing_seconds = self.config.batch_seconds + self.config.batch_seconds_per_request * len(requests)
+
+        # Timeline offsets are fixed at creation so later config changes don't reshuffle running batches
+        batch["_requests"] = requests
+        batch["_started"] = time.time()
+        batch["_in_progress_after"] = self.config.validation_seconds
+        batch["_finalizing_after"] = self.config.validation_seconds + processing_seconds
+        batch["_completed_after"] = batch["_finalizing_after"] + self.config.finalizing_seconds
+        batch["_failure_rate"] = self.config.batch_failure_rate
+
+        if errors:
+            batch["status"] = "failed"
+            batch["failed_at"] = now
+            batch["errors"] = {"object": "list", "data": errors}
+
+        with self._lock:
+            self.batches[batch["id"]] = batch
+        self.stats["batches_created"] += 1
+        return batch
+
+    def _parse_batch_input(self, input_file_id: str, endpoint: str):
+        if input_file_id not in self.file_data:
+            return [], [{"code": "invalid_file", "message": f"No such file: {input_file_id}", "line": None}]
+
+        requests, errors = [], []
+        for line_number, line in enumerate(self.file_data[input_file_id].decode("utf-8").splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                errors.append({"code": "invalid_json_line", "message": "Line is not valid JSON", "line": line_number})
+                continue
+            if not request.get("custom_id") or request.get("url") != endpoint:
+                errors.append({"code": "invalid_request", "message": "Missing custom_id or mismatched url",
+                               "line": line_number})
+                continue
+            requests.append(request)
+        return requests, errors
+
+    def advance_batch(self, batch: Dict[str, Any]) -> Dict[str, Any]:
+        """Move a batch along its timeline and generate results on completion"""
+        if batch["status"] in TERMINAL_STATUSES:
+            return batch
+
+        now = int(time.time())
+        if batch["status"] == "cancelling":
+            batch["status"] = "cancelled"
+            batch["cancelled_at"] = now
+            return batch
+
+        elapsed = time.time() - batch["_started"]
+        total = len(batch["_requests"])
+        batch["request_counts"]["total"] = total
+
+        if elapsed >= batch["_completed_after"]:
+            self._complete_batch(batch)
+        elif elapsed >= batch["_finalizing_after"]:
+            batch["status"] = "finalizing"
+            batch["in_progress_at"] = batch["in_progress_at"] or now
+            batch["finalizing_at"] = batch["finalizing_at"] or now
+            batch["request_counts"]["completed"] = total
+        elif elapsed >= batch["_in_progress_after"]:
+            batch["status"] = "in_progress"
+            batch["in_progress_at"] = batch["in_progress_at"] or now
+            window = batch["_finalizing_after"] - batch["_in_progress_after"]
+            progress = (elapsed - batch["_in_progress_after"]) / window if window > 0 else 1.0
+            batch["request_counts"]["completed"] = int(total * min(1.0, progress))
+        return batch
+
+    def _complete_batch(self, batch: Dict[str, Any]):
+        output_lines, error_lines = [], []
+        for request in batch["_requests"]:
+            line = {"id": _new_id("batch_req"), "custom_id": request["custom_id"], "error": None}
+            if random.random() < batch["_failure_rate"]:
+                line["response"] = {"status_code": 500, "request_id": uuid.uuid4().hex,
+                                    "body": _error_body("Mock batch request failure", "server_error")}
+                error_lines.append(line)
+            else:
+                line["response"] = {"status_code": 200, "request_id": uuid.uuid4().hex,
+                                    "body": self.chat_completion(request.get("body", {}))}
+                output_lines.append(line)
+
+        if output_lines:
+            data = "".join(json.dumps(line) + "\n" for line in output_lines).encode("utf-8")
+            batch["output_file_id"] = self.add_file(data, f"{batch['id']}_output.jsonl", "batch_output")["id"]
+        if error_lines:
+            data = "".join(json.dumps(line) + "\n" for line in error_lines).encode("utf-8")
+            batch["error_file_id"] = self.add_file(data, f"{batch['id']}_error.jsonl", "batch_output")["id"]
+
+        now = int(time.time())
+        batch["status"] = "completed"
+        batch["in_progress_at"] = batch["in_progress_at"] or now
+        batch["finalizing_at"] = batch["finalizing_at"] or now
+        batch["completed_at"] = now
+        batch["request_counts"] = {"total": len(batch["_requests"]), "completed": len(output_lines),
+                                   "failed": len(error_lines)}
+        self.stats["batches_completed"] += 1
+        self.stats["batch_requests_completed"] += len(output_lines)
+        self.stats["batch_requests_failed"] += len(error_lines)
+
+
+def public_batch(batch: Dict[str, Any]) -> Dict[str, Any]:
+    """Batch object without the server's private bookkeeping fields"""
+    return {key: value for key, value in batch.items() if not key.startswith("_")}
+
+
+def create_app(config: Optional[MockOpenAIConfig] = None) -> FastAPI:
+    """
+    Build the mock server application
+
+    Args:
+        config: Behaviour settings (defaults to MOCK_OPENAI_* environment variables)
+
+    Returns:
+        FastAPI app serving the mock API under /v1 and controls under /mock
+    """
+    state = MockOpenAIState(config or MockOpenAIConfig.from_env())
+    app = FastAPI(title="Mock OpenAI API", description="Offline stand-in for load testing", version="1.0.0")
+    app.state.mock = state
+
+    @app.exception_handler(HTTPException)
+    async def openai_style_errors(request: Request, exc: HTTPException):
+        """Return errors in the OpenAI shape so SDK clients parse them normally"""
+        content = exc.detail if isinstance(exc.detail, dict) else _error_body(str(exc.detail), "invalid_request_error")
+        return JSONResponse(status_code=exc.status_code, content=content)
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        """Inject latency, rate limiting and random server errors on /v1 routes"""
+        path = request.url.path
+        if not path.startswith("/v1/"):
+            return await call_next(request)
+
+        state.stats["requests_total"] += 1
+        config = state.config
+
+        if config.latency_ms > 0:
+            delay = random.gauss(config.latency_ms, config.latency_jitter_ms) / 1000.0
+            await asyncio.sleep(max(0.0, delay))
+
+        retry_after = state.request_limiter.try_acquire(config.requests_per_minute)
+        if retry_after is None and path == "/v1/images/generations":
+            retry_after = state.image_limiter.try_acquire(config.images_per_minute)
+        if retry_after is not None:
+            state.stats["responses_429"] += 1
+            return JSONResponse(
+                status_code=429,
+                content=_error_body("Rate limit reached (mock)", "requests", "rate_limit_exceeded"),
+                headers={"retry-after": f"{retry_after:.2f}"}
+            )
+
+        if random.random() < config.error_rate:
+            state.stats["responses_500"] += 1
+            return JSONResponse(status_code=500, content=_error_body("Injected server error (mock)", "server_error"))
+
+        return await call_next(request)
+
+    # Files
+
+    @app.post("/v1/files")
+    async def upload_file(file: UploadFile = File(...), purpose: str = Form(...)):
+        data = await file.read()
+        state.stats["files_uploaded"] += 1
+        return state.add_file(data, file.filename or "upload.jsonl", purpose)
+
+    @app.get("/v1/files")
+    async def list_files():
+        return {"object": "list", "data": list(state.files.values()), "has_more": False}
+
+    @app.get("/v1/files/{file_id}")
+    async def retrieve_file(file_id: str):
+        if file_id not in state.files:
+            raise HTTPException(status_code=404, detail=_error_body(f"No such file: {file_id}", "invalid_request_error"))
+        return state.files[file_id]
+
+    @app.get("/v1/files/{file_id}/content")
+    async def file_content(file_id: str):
+        if file_id not in state.file_data:
+            raise HTTPException(status_code=404, detail=_error_body(f"No such file: {file_id}", "invalid_request_error"))
+        data = state.file_data[file_id]
+
+        def chunks() -> Iterator[bytes]:
+            for start in range(0, len(data), FILE_CHUNK_SIZE):
+                yield data[start:start + FILE_CHUNK_SIZE]
+
+        state.stats["files_downloaded"] += 1
+        return StreamingResponse(chunks(), media_type="application/octet-stream",
+                                 headers={"Content-Length": str(len(data))})
+
+    @app.delete("/v1/files/{file_id}")
+    async def delete_file(file_id: str):
+        state.files.pop(file_id, None)
+        state.file_data.pop(file_id, None)
+        return {"id": file_id, "object": "file", "deleted": True}
+
+    # Batches
+
+    @app.post("/v1/batches")
+    async def create_batch(request: Request):
+        body = await request.json()
+        if body.get("endpoint") != "/v1/chat/completions":
+            raise HTTPException(status_code=400, detail=_error_body(
+                "The mock only supports /v1/chat/completions batches", "invalid_request_error"))
+        batch = state.create_batch(body.get("input_file_id", ""), body["endpoint"],
+                                   body.get("completion_window", "24h"), body.get("metadata"))
+        return public_batch(batch)
+
+    @app.get("/v1/batches")
+    async def list_batches(limit: int = 20, after: Optional[str] = None):
+        batches = sorted(state.batches.values(), key=lambda batch: batch["created_at"], reverse=True)
+        if after:
+            ids = [batch["id"] for batch in batches]
+            batches = batches[ids.index(after) + 1:] if after in ids else []
+
+        page = [public_batch(state.advance_batch(batch)) for batch in batches[:limit]]
+        return {
+            "object": "list",
+            "data": page,
+            "first_id": page[0]["id"] if page else None,
+            "last_id": page[-1]["id"] if page else None,
+            "has_more": len(batches) > limit
+        }
+
+    @app.get("/v1/batches/{batch_id}")
+    async def retrieve_batch(batch_id: str):
+        if batch_id not in state.batches:
+            raise HTTPException(status_code=404, detail=_error_body(f"No such batch: {batch_id}", "invalid_request_error"))
+        state.stats["batch_polls"] += 1
+        return public_batch(state.advance_batch(state.batches[batch_id]))
+
+    @app.post("/v1/batches/{batch_id}/cancel")
+    async def cancel_batch(batch_id: str):
+        if batch_id not in state.batches:
+            raise HTTPException(status_code=404, detail=_error_body(f"No such batch: {batch_id}", "invalid_request_error"))
+        batch = state.batches[batch_id]
+        if batch["status"] not in TERMINAL_STATUSES:
+            batch["status"] = "cancelling"
+            batch["cancelling_at"] = int(time.time())
+        return public_batch(batch)
+
+    # Chat completions and images
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        state.stats["chat_completions"] += 1
+        return state.chat_completion(await request.json())
+
+    @app.post("/v1/images/generations")
+    async def image_generations(request: Request):
+        body = await request.json()
+        count = int(body.get("n", 1))
+        data = []
+        for _ in range(count):
+            image_id = uuid.uuid4().hex
+            if body.get("response_format") == "b64_json":
+                data.append({"b64_json": base64.b64encode(state.image_bytes()).decode("ascii"),
+                             "revised_prompt": body.get("prompt")})
+            else:
+                state.images[image_id] = state.image_bytes()
+                data.append({"url": f"{str(request.base_url).rstrip('/')}/mock/images/{image_id}.png",
+                             "revised_prompt": body.get("prompt")})
+        state.stats["images_generated"] += count
+        return {"created": int(time.time()), "data": data}
+
+    @app.get("/mock/images/{image_name}")
+    async def image_download(image_name: str):
+        image_id = image_name.rsplit(".", 1)[0]
+        if image_id not in state.images:
+            raise HTTPException(status_code=404, detail="Image expired or unknown")
+        state.stats["images_downloaded"] += 1
+        return Response(content=state.images.pop(image_id), media_type="image/png")
+
+    # Controls
+
+    @app.get("/mock/stats")
+    async def mock_stats():
+        statuses = Counter(batch["status"] for batch in state.batches.values())
+        return {"counters": dict(state.stats), "batch_statuses": dict(statuses), "config": asdict(state.config)}
+
+    @app.post("/mock/config")
+    async def mock_config(request: Request):
+        try:
+            state.config.update(await request.json())
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return asdict(state.config)
+
+    @app.post("/mock/reset")
+    async def mock_reset():
+        state.reset()
+        return {"reset": True}
+
+    return app
+
+
+def main():
+    """Run the mock server from the command line"""
+    import argparse
+    import uvicorn
+
+    defaults = MockOpenAIConfig.from_env()
+    parser = argparse.ArgumentParser(description="Mock OpenAI server for offline load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_OPENAI_PORT", 8100)))
+    for config_field in fields(MockOpenAIConfig):
+        default = getattr(defaults, config_field.name)
+        parser.add_argument(f"--{config_field.name.replace('_', '-')}", type=type(default), default=default)
+
+    args = parser.parse_args()
+    config = MockOpenAIConfig(**{f.name: getattr(args, f.name) for f in fields(MockOpenAIConfig)})
+
+    print(f"🧪 Mock OpenAI server on http://{args.host}:{args.port}/v1")
+    print(f"   export OPENAI_BASE_URL=http://{args.host}:{args.port}/v1")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
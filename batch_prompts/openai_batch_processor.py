@@ -11,12 +11,20 @@ Author: BHSME Team
 Version: 1.0.0
 """
 
+import hashlib
 import json
 import os
+import re
+import sqlite3
+import sys
 import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Any
+from urllib.parse import quote, unquote
 import logging
 
 try:
@@ -26,6 +34,10 @@ except ImportError:
     OPENAI_AVAILABLE = False
     print("OpenAI SDK not installed. Run: pip install openai --upgrade")
 
+sys.path.append(str(Path(__file__).parent.parent))
+from shared_utils.batch_registry import BatchRegistry
+from shared_utils.prompt_cache import PromptCache, request_hash
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -33,6 +45,226 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Results are streamed to disk and ingested in bounded chunks
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+RESULTS_INSERT_BATCH_SIZE = 500
+RESPONSE_PREVIEW_CHARS = 500
+
+FAILED_BATCH_STATUSES = ("failed", "expired", "cancelled")
+
+# custom_id parts are percent-escaped and joined on a separator that never survives escaping
+CUSTOM_ID_SEPARATOR = "|"
+
+# Result files smaller than this are parsed inline; larger ones are spread over a process pool
+PARALLEL_RESULTS_MIN_BYTES = 4 * 1024 * 1024
+POSTPROCESS_WORKERS = min(8, os.cpu_count() or 1)
+
+# Batch API prices in USD per million (input, output) tokens; the longest matching prefix wins
+BATCH_PRICING_PER_MILLION = {
+    "gpt-4o-mini": (0.075, 0.30),
+    "gpt-4o": (1.25, 5.00),
+    "gpt-4.1-mini": (0.20, 0.80),
+    "gpt-4.1": (1.00, 4.00),
+}
+
+
+def encode_custom_id(*parts: Any) -> str:
+    """
+    Build a reversible custom_id from its parts
+    
+    Each part is percent-escaped, so sections and prompt types may contain
+    underscores, separators or any other character.
+    
+    Args:
+        parts: custom_id components, e.g. section, prompt type, request hash
+        
+    Returns:
+        Encoded custom_id
+    """
+    return CUSTOM_ID_SEPARATOR.join(quote(str(part), safe=" ") for part in parts)
+
+
+def decode_custom_id(custom_id: str) -> List[str]:
+    """
+    Split a custom_id back into the parts given to ``encode_custom_id``
+    
+    Legacy ids (``{section}_{prompt_type}_{suffix}``) are split on the first
+    and last underscore, which is correct whenever the section has none.
+    
+    Args:
+        custom_id: Encoded custom_id
+        
+    Returns:
+        The decoded parts
+    """
+    if CUSTOM_ID_SEPARATOR in custom_id:
+        return [unquote(part) for part in custom_id.split(CUSTOM_ID_SEPARATOR)]
+    
+    parts = custom_id.split("_")
+    if len(parts) <= 2:
+        return parts
+    return [parts[0], "_".join(parts[1:-1]), parts[-1]]
+
+
+def result_row(result: Dict[str, Any], results_file: str, processed_at: str) -> Tuple:
+    """Flatten one batch result record into a batch_results row"""
+    custom_id = result.get("custom_id", "")
+    parts = decode_custom_id(custom_id) if custom_id else []
+    section = parts[0] if len(parts) >= 2 else None
+    prompt_type = parts[1] if len(parts) >= 2 else None
+    
+    response = result.get("response") or {}
+    body = response.get("body") or {}
+    content = (body.get("choices") or [{}])[0].get("message", {}).get("content", "")
+    error = result.get("error")
+    
+    return (
+        custom_id,
+        results_file,
+        section,
+        prompt_type,
+        content,
+        json.dumps(body.get("usage", {})),
+        body.get("model", ""),
+        response.get("status_code"),
+        json.dumps(error) if error else None,
+        processed_at
+    )
+
+
+def empty_usage_totals() -> Dict[str, Any]:
+    """Zeroed aggregate token and cost totals"""
+    return {
+        "requests": 0,
+        "cached_requests": 0,
+        "failed_requests": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "estimated_cost_usd": 0.0,
+        "by_model": {}
+    }
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Batch API cost of a request in USD, or None for models without a known price"""
+    prefixes = [prefix for prefix in BATCH_PRICING_PER_MILLION if model.startswith(prefix)]
+    if not prefixes:
+        return None
+    input_price, output_price = BATCH_PRICING_PER_MILLION[max(prefixes, key=len)]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def add_result_usage(totals: Dict[str, Any], result: Dict[str, Any]):
+    """
+    Count one batch result into aggregate usage totals
+    
+    Results served from the prompt cache cost nothing in this run, so they
+    are counted as cached requests but add no tokens.
+    """
+    totals["requests"] += 1
+    response = result.get("response") or {}
+    if result.get("error") or response.get("status_code") != 200:
+        totals["failed_requests"] += 1
+        return
+    if result.get("cached"):
+        totals["cached_requests"] += 1
+        return
+    
+    body = response.get("body") or {}
+    usage = body.get("usage") or {}
+    model = body.get("model") or "unknown"
+    prompt_tokens = usage.get("prompt_tokens", 0)
+    completion_tokens = usage.get("completion_tokens", 0)
+    
+    model_totals = totals["by_model"].setdefault(model, {
+        "requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "estimated_cost_usd": 0.0
+    })
+    model_totals["requests"] += 1
+    for key, value in (("prompt_tokens", prompt_tokens), ("completion_tokens", completion_tokens),
+                       ("total_tokens", usage.get("total_tokens", prompt_tokens + completion_tokens))):
+        model_totals[key] += value
+        totals[key] += value
+    
+    cost = estimate_cost(model, prompt_tokens, completion_tokens)
+    if cost is not None:
+        model_totals["estimated_cost_usd"] += cost
+        totals["estimated_cost_usd"] += cost
+
+
+def merge_usage_totals(totals: Dict[str, Any], other: Optional[Dict[str, Any]]):
+    """Add one set of usage totals into another in place"""
+    if not other:
+        return
+    for key, value in other.items():
+        if key == "by_model":
+            for model, model_totals in value.items():
+                merged = totals["by_model"].setdefault(model, dict.fromkeys(model_totals, 0))
+                for model_key, model_value in model_totals.items():
+                    merged[model_key] += model_value
+        else:
+            totals[key] += value
+
+
+def process_result_lines(lines: List[str], results_file: str, processed_at: str) -> Dict[str, Any]:
+    """
+    Parse a chunk of batch result lines
+    
+    Runs in post-processing worker processes, so it only takes and returns
+    picklable data and never touches the databases.
+    
+    Args:
+        lines: Raw JSONL lines
+        results_file: Results file the lines came from
+        processed_at: Ingestion timestamp
+        
+    Returns:
+        batch_results rows, results for the prompt cache, usage totals and
+        the number of malformed lines
+    """
+    rows = []
+    cache_results = []
+    usage_totals = empty_usage_totals()
+    malformed = 0
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            result = json.loads(line)
+        except json.JSONDecodeError:
+            malformed += 1
+            continue
+        
+        rows.append(result_row(result, results_file, processed_at))
+        add_result_usage(usage_totals, result)
+        
+        response = result.get("response") or {}
+        if response.get("status_code") == 200 and not result.get("cached"):
+            cache_results.append({
+                "custom_id": result.get("custom_id"),
+                "response": {"status_code": 200, "body": response.get("body")}
+            })
+    
+    return {"rows": rows, "cache_results": cache_results, "usage_totals": usage_totals, "malformed": malformed}
+
+
+def bounded_map(executor: Executor, fn: Callable, items: Iterable, window: int) -> Iterator[Any]:
+    """Map fn over items on an executor in order, with at most ``window`` items in flight"""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def section_slug(section: str) -> str:
+    """Filesystem-safe name for a section"""
+    return re.sub(r"[^A-Za-z0-9]+", "_", section).strip("_").lower() or "section"
+
 
 class WellspringBatchProcessor:
     """
@@ -46,12 +278,14 @@ class WellspringBatchProcessor:
     5. Download and process results
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, db_path: Optional[str] = None):
         """
         Initialize the batch processor
         
         Args:
             api_key: OpenAI API key (defaults to environment variable)
+            db_path: SQLite database for the prompt cache and batch registry
+                (defaults to the shared wellspring.db)
         """
         if not OPENAI_AVAILABLE:
             raise ImportError("OpenAI SDK not available. Install with: pip install openai --upgrade")
@@ -62,9 +296,12 @@ class WellspringBatchProcessor:
         
         self.client = OpenAI(api_key=self.api_key)
         self.batch_jobs: Dict[str, Dict] = {}
+        self.postprocess_workers = POSTPROCESS_WORKERS
         
         # Create output directories
         self.setup_directories()
+        self.prompt_cache = PromptCache(db_path)
+        self.batch_registry = BatchRegistry(self.client, db_path)
     
     def setup_directories(self):
         """Create necessary directories for batch processing"""
@@ -75,6 +312,31 @@ class WellspringBatchProcessor:
         
         for directory in [self.input_dir, self.output_dir, self.logs_dir]:
             directory.mkdir(parents=True, exist_ok=True)
+        
+        self.results_db_path = self.output_dir / "batch_results.db"
+        self.initialize_results_store()
+    
+    def initialize_results_store(self):
+        """Create the SQLite table that batch results are ingested into"""
+        conn = sqlite3.connect(self.results_db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS batch_results (
+                custom_id TEXT PRIMARY KEY,
+                results_file TEXT,
+                section TEXT,
+                prompt_type TEXT,
+                response TEXT,
+                usage TEXT,
+                model TEXT,
+                status_code INTEGER,
+                error TEXT,
+                processed_at TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_batch_results_file ON batch_results (results_file)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_batch_results_section ON batch_results (section, prompt_type)")
+        conn.commit()
+        conn.close()
     
     def load_visual_batch_prompts(self, json_file_path: str) -> Dict[str, Any]:
         """
@@ -117,33 +379,95 @@ class WellspringBatchProcessor:
             # Create tasks for each type of research prompt
             for prompt_type, prompt_content in research_prompts.items():
                 if prompt_content and prompt_content.strip():
-                    custom_id = f"{section}_{prompt_type}_{int(time.time())}"
+                    body = {
+                        "model": "gpt-4o-mini",
+                        "temperature": 0.3,
+                        "max_tokens": 2000,
+                        "messages": [
+                            {
+                                "role": "system",
+                                "content": "You are a professional research assistant specializing in behavioral health facility development. Provide detailed, well-cited responses with specific data points and actionable insights."
+                            },
+                            {
+                                "role": "user",
+                                "content": prompt_content.strip()
+                            }
+                        ]
+                    }
+                    
+                    # Content-derived suffix keeps custom_ids stable across re-runs
+                    custom_id = encode_custom_id(section, prompt_type, request_hash(body, '/v1/chat/completions')[:12])
                     
                     task = {
                         "custom_id": custom_id,
                         "method": "POST",
                         "url": "/v1/chat/completions",
-                        "body": {
-                            "model": "gpt-4o-mini",
-                            "temperature": 0.3,
-                            "max_tokens": 2000,
-                            "messages": [
-                                {
-                                    "role": "system",
-                                    "content": "You are a professional research assistant specializing in behavioral health facility development. Provide detailed, well-cited responses with specific data points and actionable insights."
-                                },
-                                {
-                                    "role": "user",
-                                    "content": prompt_content.strip()
-                                }
-                            ]
-                        }
+                        "body": body
                     }
                     tasks.append(task)
         
         logger.info(f"Formatted {len(tasks)} tasks for batch processing")
         return tasks
     
+    def apply_prompt_cache(self, tasks: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Serve already-answered prompts from the prompt cache
+        
+        Cache hits are written out as a local results file and ingested
+        through process_results, so they merge with fresh results in the
+        results store.
+        
+        Args:
+            tasks: Formatted batch API tasks
+            
+        Returns:
+            Tuple of (tasks still to submit, processed summary of cached results or None)
+        """
+        to_submit, cached_lines = self.prompt_cache.prepare_tasks(tasks)
+        
+        if not cached_lines:
+            return to_submit, None
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        cached_path = self.output_dir / f"wellspring_cached_results_{timestamp}.jsonl"
+        with open(cached_path, 'w', encoding='utf-8') as f:
+            for line in cached_lines:
+                f.write(json.dumps(line, ensure_ascii=False) + '\n')
+        
+        logger.info(f"Served {len(cached_lines)} prompts from cache; {len(to_submit)} left to submit")
+        return to_submit, self.process_results(str(cached_path))
+    
+    @staticmethod
+    def merge_processed_results(summaries: List[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Merge several process_results summaries into one
+        
+        Args:
+            summaries: Summaries to merge; None entries are skipped
+            
+        Returns:
+            Merged summary
+        """
+        merged = {
+            "total_results": 0,
+            "results_by_section": {},
+            "usage_totals": empty_usage_totals(),
+            "timestamp": datetime.now().isoformat(),
+            "results_files": []
+        }
+        
+        for summary in summaries:
+            if not summary:
+                continue
+            merged["total_results"] += summary["total_results"]
+            merged["results_files"].extend(summary.get("results_files") or [summary.get("results_file")])
+            merged["results_db"] = summary.get("results_db")
+            merge_usage_totals(merged["usage_totals"], summary.get("usage_totals"))
+            for section, prompts in summary["results_by_section"].items():
+                merged["results_by_section"].setdefault(section, {}).update(prompts)
+        
+        return merged
+    
     def create_batch_file(self, tasks: List[Dict[str, Any]], filename: str = None) -> str:
         """
         Create a JSONL file for batch processing
@@ -225,6 +549,7 @@ class WellspringBatchProcessor:
                 "created_at": datetime.now(),
                 "description": description
             }
+            self.batch_registry.record(batch_job)
             
             logger.info(f"Created batch job: {batch_job.id}")
             return batch_job
@@ -249,6 +574,7 @@ class WellspringBatchProcessor:
         while True:
             try:
                 batch_job = self.client.batches.retrieve(job_id)
+                self.batch_registry.record(batch_job)
                 status = batch_job.status
                 
                 logger.info(f"Job {job_id} status: {status}")
@@ -262,12 +588,13 @@ class WellspringBatchProcessor:
                 logger.error(f"Error monitoring batch job: {e}")
                 time.sleep(check_interval)
     
-    def download_results(self, batch_job: Dict[str, Any]) -> str:
+    def download_results(self, batch_job: Dict[str, Any], filename: Optional[str] = None) -> str:
         """
-        Download batch job results
+        Download batch job results, streaming them to disk in chunks
         
         Args:
             batch_job: Completed batch job object
+            filename: Optional results file name (defaults to a timestamped name)
             
         Returns:
             Path to downloaded results file
@@ -275,89 +602,325 @@ class WellspringBatchProcessor:
         if not batch_job.output_file_id:
             raise ValueError("No output file available for this batch job")
         
-        try:
-            result = self.client.files.content(batch_job.output_file_id).content
-            
+        if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            result_filename = f"wellspring_batch_results_{timestamp}.jsonl"
-            result_path = self.output_dir / result_filename
+            filename = f"wellspring_batch_results_{timestamp}_{batch_job.id}.jsonl"
+        result_path = self.output_dir / filename
+        partial_path = result_path.with_suffix(".jsonl.part")
+        
+        try:
+            bytes_written = 0
+            with self.client.files.with_streaming_response.content(batch_job.output_file_id) as response:
+                with open(partial_path, 'wb') as f:
+                    for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        bytes_written += len(chunk)
             
-            with open(result_path, 'wb') as f:
-                f.write(result)
+            partial_path.replace(result_path)
             
-            logger.info(f"Downloaded results to: {result_path}")
+            logger.info(f"Downloaded results to: {result_path} ({bytes_written} bytes)")
             return str(result_path)
         
         except Exception as e:
+            partial_path.unlink(missing_ok=True)
             logger.error(f"Error downloading results: {e}")
             raise
     
+    def iter_results(self, results_file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily parse a batch results JSONL file one line at a time
+        
+        Args:
+            results_file_path: Path to the results JSONL file
+            
+        Yields:
+            Parsed result records
+        """
+        with open(results_file_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Skipping malformed result line {line_number}: {e}")
+    
+    def iter_result_chunks(self, results_file_path: str, chunk_size: int = RESULTS_INSERT_BATCH_SIZE) -> Iterator[List[str]]:
+        """Read a results JSONL file as lists of raw lines, for parsing off the main thread"""
+        with open(results_file_path, 'r', encoding='utf-8') as f:
+            chunk = []
+            for line in f:
+                chunk.append(line)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+    
     def process_results(self, results_file_path: str) -> Dict[str, Any]:
         """
-        Process and analyze batch results
+        Stream batch results into the results store and summarize them
+        
+        Results are parsed in chunks (on a process pool for large files),
+        written to the ``batch_results`` table as each chunk completes and
+        counted into per-model token and cost totals, so the full result set
+        is never held in memory. Full responses are read back with
+        ``get_stored_results``; the returned summary carries previews.
         
         Args:
             results_file_path: Path to the results JSONL file
             
         Returns:
-            Processed results data
+            Processed results summary
         """
-        results = []
+        processed_at = datetime.now().isoformat()
+        results_file = str(results_file_path)
+        insert_sql = "INSERT OR REPLACE INTO batch_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        parse_chunk = partial(process_result_lines, results_file=results_file, processed_at=processed_at)
+        workers = self.postprocess_workers
+        use_pool = workers > 1 and Path(results_file_path).stat().st_size >= PARALLEL_RESULTS_MIN_BYTES
         
         try:
-            with open(results_file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if line.strip():
-                        result = json.loads(line.strip())
-                        results.append(result)
+            conn = sqlite3.connect(self.results_db_path)
+            total_results = 0
+            malformed = 0
+            usage_totals = empty_usage_totals()
+            
+            def ingest(parsed: Dict[str, Any]):
+                nonlocal total_results, malformed
+                if parsed["rows"]:
+                    conn.executemany(insert_sql, parsed["rows"])
+                    conn.commit()
+                    self.prompt_cache.store_results(parsed["cache_results"])
+                total_results += len(parsed["rows"])
+                malformed += parsed["malformed"]
+                merge_usage_totals(usage_totals, parsed["usage_totals"])
+            
+            chunks = self.iter_result_chunks(results_file_path)
+            if use_pool:
+                # Chunks are parsed in parallel but ingested in file order, a bounded number at a time
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for parsed in bounded_map(executor, parse_chunk, chunks, workers * 2):
+                        ingest(parsed)
+            else:
+                for chunk in chunks:
+                    ingest(parse_chunk(chunk))
+            
+            if malformed:
+                logger.warning(f"Skipped {malformed} malformed result lines in {results_file}")
+            
+            # Deferred duplicates are answered once their submitted copy is cached
+            resolved_duplicates = self.prompt_cache.resolve_pending()
+            if resolved_duplicates:
+                ingest(parse_chunk([json.dumps(result) for result in resolved_duplicates]))
             
             # Organize results by section and prompt type
             processed_results = {
-                "total_results": len(results),
+                "total_results": total_results,
                 "results_by_section": {},
-                "timestamp": datetime.now().isoformat(),
-                "raw_results": results
+                "usage_totals": usage_totals,
+                "timestamp": processed_at,
+                "results_file": results_file,
+                "results_db": str(self.results_db_path)
             }
             
-            for result in results:
-                custom_id = result.get("custom_id", "")
-                if "_" in custom_id:
-                    parts = custom_id.split("_")
-                    if len(parts) >= 2:
-                        section = parts[0]
-                        prompt_type = parts[1]
-                        
-                        if section not in processed_results["results_by_section"]:
-                            processed_results["results_by_section"][section] = {}
-                        
-                        processed_results["results_by_section"][section][prompt_type] = {
-                            "custom_id": custom_id,
-                            "response": result.get("response", {}).get("body", {}).get("choices", [{}])[0].get("message", {}).get("content", ""),
-                            "usage": result.get("response", {}).get("body", {}).get("usage", {}),
-                            "model": result.get("response", {}).get("body", {}).get("model", "")
-                        }
-            
-            # Save processed results
+            cursor = conn.execute("""
+                SELECT section, prompt_type, custom_id, substr(response, 1, ?), usage, model
+                FROM batch_results
+                WHERE results_file = ? AND section IS NOT NULL
+                ORDER BY section, prompt_type
+            """, (RESPONSE_PREVIEW_CHARS, results_file))
+            
+            for section, prompt_type, custom_id, response, usage, model in cursor:
+                processed_results["results_by_section"].setdefault(section, {})[prompt_type] = {
+                    "custom_id": custom_id,
+                    "response": response,
+                    "usage": json.loads(usage) if usage else {},
+                    "model": model
+                }
+            
+            conn.close()
+            
+            # Save processed results summary
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            processed_filename = f"wellspring_processed_results_{timestamp}.json"
+            processed_filename = f"wellspring_processed_results_{timestamp}_{Path(results_file).stem}.json"
             processed_path = self.output_dir / processed_filename
             
             with open(processed_path, 'w', encoding='utf-8') as f:
-                json.dump(processed_results, f, indent=2, ensure_ascii=False)
+                json.dump(processed_results, f, ensure_ascii=False)
             
-            logger.info(f"Processed results saved to: {processed_path}")
+            logger.info(f"Processed {total_results} results into {self.results_db_path} "
+                        f"({usage_totals['total_tokens']} tokens, ~${usage_totals['estimated_cost_usd']:.4f}); "
+                        f"summary saved to: {processed_path}")
             return processed_results
         
         except Exception as e:
             logger.error(f"Error processing results: {e}")
             raise
     
-    def run_complete_batch_workflow(self, json_file_path: str) -> Dict[str, Any]:
+    def _write_section_markdown(self, section: str, results_files: List[str], path: Path) -> str:
+        """Render one section's stored results to a markdown file"""
+        placeholders = ", ".join("?" for _ in results_files)
+        conn = sqlite3.connect(self.results_db_path)
+        try:
+            rows = conn.execute(f"""
+                SELECT prompt_type, custom_id, response, model, error
+                FROM batch_results
+                WHERE section = ? AND results_file IN ({placeholders})
+                ORDER BY prompt_type
+            """, [section, *results_files]).fetchall()
+        finally:
+            conn.close()
+        
+        lines = [f"# {section}", "", "*Wellspring visual research*", ""]
+        for prompt_type, custom_id, response, model, error in rows:
+            lines.append(f"## {(prompt_type or 'Research').replace('_', ' ').title()}")
+            lines.append("")
+            if error:
+                lines.append(f"> ⚠️ Request failed: {error}")
+            else:
+                lines.append(response or "")
+            lines.append("")
+            lines.append(f"<!-- custom_id: {custom_id} | model: {model} -->")
+            lines.append("")
+        
+        partial_path = path.with_suffix(".md.partial")
+        partial_path.write_text("\n".join(lines), encoding='utf-8')
+        os.replace(partial_path, path)
+        return str(path)
+    
+    def write_section_markdown(self, processed_results: Dict[str, Any], output_dir: Optional[str] = None,
+                               max_workers: int = 8) -> Dict[str, str]:
+        """
+        Write one visual research markdown file per section, concurrently
+        
+        Full responses are read from the results store for the summary's
+        results files, so previews in the summary are never used.
+        
+        Args:
+            processed_results: Summary from process_results or merge_processed_results
+            output_dir: Target directory (defaults to output/visual_research)
+            max_workers: Concurrent section writers
+            
+        Returns:
+            Mapping of section to markdown file path
+        """
+        sections = list(processed_results.get("results_by_section", {}))
+        results_files = [str(f) for f in (processed_results.get("results_files")
+                                          or [processed_results.get("results_file")]) if f]
+        if not sections or not results_files:
+            return {}
+        
+        markdown_dir = Path(output_dir) if output_dir else self.output_dir / "visual_research"
+        markdown_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Sections whose slugs collide get a short hash so no file is overwritten
+        slugs = [section_slug(section) for section in sections]
+        paths = [
+            markdown_dir / (f"{slug}_{hashlib.sha256(section.encode()).hexdigest()[:8]}.md"
+                            if slugs.count(slug) > 1 else f"{slug}.md")
+            for section, slug in zip(sections, slugs)
+        ]
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            written = list(executor.map(
+                lambda item: self._write_section_markdown(item[0], results_files, item[1]), zip(sections, paths)
+            ))
+        
+        logger.info(f"Wrote {len(written)} section markdown files to {markdown_dir}")
+        return dict(zip(sections, written))
+    
+    def get_stored_results(self, section: Optional[str] = None,
+                           results_file: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream full results back out of the results store
+        
+        Args:
+            section: Only return results for this section
+            results_file: Only return results ingested from this file
+            
+        Yields:
+            Stored result rows
+        """
+        query = "SELECT * FROM batch_results WHERE 1 = 1"
+        params = []
+        if section:
+            query += " AND section = ?"
+            params.append(section)
+        if results_file:
+            query += " AND results_file = ?"
+            params.append(str(results_file))
+        query += " ORDER BY section, prompt_type"
+        
+        conn = sqlite3.connect(self.results_db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            for row in conn.execute(query, params):
+                yield dict(row)
+        finally:
+            conn.close()
+    
+    def workflow_id_for(self, json_file_path: str) -> str:
+        """Idempotency key for a workflow: a hash of the prompts file's content"""
+        digest = hashlib.sha256()
+        with open(json_file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return f"workflow_{digest.hexdigest()[:16]}"
+    
+    def workflow_state_path(self, workflow_id: str) -> Path:
+        """Path of the JSON state file for a workflow run"""
+        return self.output_dir / f"{workflow_id}_workflow.json"
+    
+    def save_workflow_state(self, state: Dict[str, Any], stage: Optional[str] = None):
+        """
+        Persist a workflow's state, optionally marking a stage as completed
+        
+        Written to a temp file and renamed, so a crash never leaves a torn file.
+        """
+        if stage:
+            state["stage"] = stage
+            state["history"].append({"stage": stage, "at": datetime.now().isoformat()})
+        state["updated_at"] = datetime.now().isoformat()
+        
+        path = self.workflow_state_path(state["workflow_id"])
+        partial_path = path.with_suffix(".json.part")
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
+        partial_path.replace(path)
+    
+    def load_workflow_state(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Load a workflow's state, if it exists"""
+        path = self.workflow_state_path(workflow_id)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _find_batch_for_file(self, file_id: str) -> Optional[str]:
+        """ID of an existing non-failed batch created from an uploaded file, if any"""
+        self.batch_registry.refresh_listing(force=True)
+        for batch in self.batch_registry.list_batches(refresh=False):
+            if batch["input_file_id"] == file_id and batch["status"] not in FAILED_BATCH_STATUSES:
+                return batch["id"]
+        return None
+    
+    def run_complete_batch_workflow(self, json_file_path: str, check_interval: int = 60,
+                                    resume: bool = True) -> Dict[str, Any]:
         """
         Run the complete batch processing workflow
         
+        Each stage is recorded with its artifact (batch file, file ID, batch ID,
+        results file) in a workflow state file keyed by the prompts file's
+        content. Re-running with the same input resumes after the last
+        completed stage and reattaches to an in-flight job instead of
+        uploading and submitting again.
+        
         Args:
             json_file_path: Path to the visual batch prompts JSON file
+            check_interval: Seconds between status checks while the job runs
+            resume: Continue a previous run of the same input (False starts over)
             
         Returns:
             Final processed results
@@ -365,37 +928,88 @@ class WellspringBatchProcessor:
         logger.info("Starting complete batch processing workflow")
         
         try:
-            # Step 1: Load visual batch prompts
-            batch_data = self.load_visual_batch_prompts(json_file_path)
+            workflow_id = self.workflow_id_for(json_file_path)
+            state = self.load_workflow_state(workflow_id) if resume else None
             
-            # Step 2: Format prompts for batch API
-            tasks = self.format_prompts_for_batch_api(batch_data)
+            if state:
+                logger.info(f"Resuming workflow {workflow_id} after stage: {state['stage']}")
+            else:
+                state = {
+                    "workflow_id": workflow_id,
+                    "input_file": str(json_file_path),
+                    "created_at": datetime.now().isoformat(),
+                    "stage": None,
+                    "history": []
+                }
             
-            if not tasks:
-                logger.warning("No valid tasks found to process")
-                return {"error": "No valid tasks found"}
+            if state["stage"] == "processed":
+                logger.info(f"Workflow {workflow_id} already completed")
+                return state["results"]
             
-            # Step 3: Create batch file
-            batch_file_path = self.create_batch_file(tasks)
+            # Steps 1-3: Load and format prompts, serve cache hits, write the batch file
+            if not state.get("batch_file"):
+                batch_data = self.load_visual_batch_prompts(json_file_path)
+                tasks = self.format_prompts_for_batch_api(batch_data)
+                
+                if not tasks:
+                    logger.warning("No valid tasks found to process")
+                    return {"error": "No valid tasks found"}
+                
+                # Serve already-answered prompts locally; only misses are submitted
+                tasks, state["cached_results"] = self.apply_prompt_cache(tasks)
+                if not tasks:
+                    logger.info("All prompts served from cache")
+                    state["results"] = state["cached_results"]
+                    state["results"]["markdown_files"] = self.write_section_markdown(state["results"])
+                    self.save_workflow_state(state, "processed")
+                    return state["results"]
+                
+                state["task_count"] = len(tasks)
+                state["batch_file"] = self.create_batch_file(tasks, f"{workflow_id}_tasks.jsonl")
+                self.save_workflow_state(state, "batch_file")
             
             # Step 4: Upload to OpenAI
-            file_id = self.upload_batch_file(batch_file_path)
+            if not state.get("file_id"):
+                state["file_id"] = self.upload_batch_file(state["batch_file"])
+                self.save_workflow_state(state, "uploaded")
             
-            # Step 5: Create batch job
-            batch_job = self.create_batch_job(file_id, "Wellspring Visual Research Batch Processing")
+            # Step 5: Create the batch job, or reattach to one already created from this upload
+            if not state.get("batch_id"):
+                state["batch_id"] = self._find_batch_for_file(state["file_id"])
+                if state["batch_id"]:
+                    logger.info(f"Reattaching to existing batch job: {state['batch_id']}")
+                else:
+                    batch_job = self.create_batch_job(state["file_id"], "Wellspring Visual Research Batch Processing")
+                    state["batch_id"] = batch_job.id
+                self.save_workflow_state(state, "job_created")
             
             # Step 6: Monitor job
-            completed_job = self.monitor_batch_job(batch_job.id)
+            completed_job = self.monitor_batch_job(state["batch_id"], check_interval)
+            state["batch_status"] = completed_job.status
             
             if completed_job.status != "completed":
+                # A rerun resubmits the already-uploaded file as a new job
                 logger.error(f"Batch job failed with status: {completed_job.status}")
+                state["failed_batch_ids"] = state.get("failed_batch_ids", []) + [state.pop("batch_id")]
+                self.save_workflow_state(state, "uploaded")
                 return {"error": f"Batch job failed: {completed_job.status}"}
             
+            if state["stage"] == "job_created":
+                self.save_workflow_state(state, "job_finished")
+            
             # Step 7: Download results
-            results_file_path = self.download_results(completed_job)
+            if not state.get("results_file") or not Path(state["results_file"]).exists():
+                state["results_file"] = self.download_results(completed_job)
+                self.save_workflow_state(state, "downloaded")
             
-            # Step 8: Process results
-            processed_results = self.process_results(results_file_path)
+            # Step 8: Process results (ingestion is keyed by custom_id, so a repeat is harmless)
+            processed_results = self.process_results(state["results_file"])
+            if state.get("cached_results"):
+                processed_results = self.merge_processed_results([state["cached_results"], processed_results])
+            processed_results["markdown_files"] = self.write_section_markdown(processed_results)
+            
+            state["results"] = processed_results
+            self.save_workflow_state(state, "processed")
             
             logger.info("Batch processing workflow completed successfully")
             return processed_results
@@ -408,23 +1022,20 @@ class WellspringBatchProcessor:
         """
         Get current status of a batch job
         
+        Served from the batch registry; the API is only called when the
+        cached entry is missing or past its TTL.
+        
         Args:
             job_id: Batch job ID
             
         Returns:
-            Job status information
+            Job status information, including progress and ETA
         """
         try:
-            batch_job = self.client.batches.retrieve(job_id)
-            return {
-                "id": batch_job.id,
-                "status": batch_job.status,
-                "created_at": batch_job.created_at,
-                "completed_at": batch_job.completed_at,
-                "failed_at": batch_job.failed_at,
-                "request_counts": batch_job.request_counts.__dict__ if batch_job.request_counts else None,
-                "metadata": batch_job.metadata
-            }
+            status = self.batch_registry.get(job_id)
+            if status is None:
+                raise ValueError(f"Unknown batch job: {job_id}")
+            return status
         except Exception as e:
             logger.error(f"Error getting batch status: {e}")
             raise
@@ -433,21 +1044,14 @@ class WellspringBatchProcessor:
         """
         List all batch jobs
         
+        Served from the batch registry, which re-lists from the API at most
+        once per listing TTL.
+        
         Returns:
             List of batch job information
         """
         try:
-            batches = self.client.batches.list()
-            return [
-                {
-                    "id": batch.id,
-                    "status": batch.status,
-                    "created_at": batch.created_at,
-                    "completed_at": batch.completed_at,
-                    "metadata": batch.metadata
-                }
-                for batch in batches.data
-            ]
+            return self.batch_registry.list_batches()
         except Exception as e:
             logger.error(f"Error listing batch jobs: {e}")
             raise
@@ -465,6 +1069,11 @@ def main():
     parser.add_argument("--monitor-only", help="Monitor existing batch job by ID")
     parser.add_argument("--list-jobs", action="store_true", help="List all batch jobs")
     parser.add_argument("--status", help="Get status of specific batch job")
+    parser.add_argument("--sharded", action="store_true",
+                        help="Split the batch into limit-sized shards and submit them concurrently")
+    parser.add_argument("--resume-sharded", help="Resume monitoring a sharded job by logical job ID")
+    parser.add_argument("--restart", action="store_true",
+                        help="Start the workflow over instead of resuming a previous run of the same input")
     
     args = parser.parse_args()
     
@@ -490,9 +1099,27 @@ def main():
                 processed_results = processor.process_results(results_path)
                 print(f"Results processed. Total: {processed_results['total_results']}")
         
+        elif args.resume_sharded:
+            from batch_sharder import WellspringBatchSharder
+            
+            sharder = WellspringBatchSharder(processor)
+            manifest = sharder.load_manifest(args.resume_sharded)
+            if not manifest:
+                print(f"No manifest found for sharded job: {args.resume_sharded}")
+                return 1
+            
+            manifest = sharder.resubmit_failed_shards(manifest)
+            manifest = sharder.monitor_sharded_job(manifest)
+            results = sharder.collect_sharded_results(manifest)
+            print(f"Sharded job finished. Total results: {results['total_results']}")
+        
         else:
             # Run complete workflow
-            results = processor.run_complete_batch_workflow(args.input)
+            if args.sharded:
+                from batch_sharder import WellspringBatchSharder
+                results = WellspringBatchSharder(processor).run_sharded_workflow(args.input)
+            else:
+                results = processor.run_complete_batch_workflow(args.input, resume=not args.restart)
             if "error" not in results:
                 print(f"Batch processing completed successfully!")
                 print(f"Total results: {results['total_results']}")
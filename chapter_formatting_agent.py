@@ -14,14 +14,343 @@ Key Features:
 - InDesign automation via scripting
 """
 
+import html
+import io
 import json
+import os
+import re
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import logging
-from typing import Dict, List, Tuple, Optional
+from string import Template
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO, Tuple, Optional
+from xml.sax.saxutils import XMLGenerator, escape as xml_escape
 from dataclasses import dataclass
 
+# "Chapter 7" or "Chapter 7: Title" on a line of its own
+CHAPTER_LABEL = re.compile(r'^chapter\s+(\d+)\s*(?::\s*(?P<title>.+))?$', re.IGNORECASE)
+
+# A chapter label that ends a line after a sentence, where two columns were extracted as one line
+TRAILING_CHAPTER_LABEL = re.compile(r'[.!?”"]\s+chapter\s+(\d+)$', re.IGNORECASE)
+
+# Table of contents lines end in dot leaders and a page number
+DOT_LEADER = re.compile(r'\.{5,}\s*[0-9ivxlc]+$', re.IGNORECASE)
+
+PAGE_MARKER = re.compile(r'^--- PAGE (\d+) ---$')
+END_PAGE_MARKER = re.compile(r'^--- END PAGE (\d+) ---$')
+
+# Icons rotate through the library in chapter order
+ICON_TYPES = ["foundation", "blueprint", "compass"]
+
+
+def iter_marked_pages(text_path: Path) -> Iterator[Tuple[int, str]]:
+    """
+    Stream (page number, text) pairs from text extracted with page markers
+    
+    Reads the "--- PAGE n ---" / "--- END PAGE n ---" format written by the
+    PDF text extractor one line at a time.
+    """
+    page_number = None
+    lines = []
+    with open(text_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            stripped = line.strip()
+            start = PAGE_MARKER.match(stripped)
+            if start:
+                page_number, lines = int(start.group(1)), []
+            elif END_PAGE_MARKER.match(stripped):
+                if page_number is not None:
+                    yield page_number, "\n".join(lines)
+                page_number = None
+            elif page_number is not None:
+                lines.append(line.rstrip("\n"))
+
+
+def iter_pdf_pages(pdf_path: Path) -> Iterator[Tuple[int, str]]:
+    """Stream (page number, text) pairs from a PDF, one page at a time"""
+    import pdfplumber
+    
+    with pdfplumber.open(str(pdf_path)) as pdf:
+        for page_number, page in enumerate(pdf.pages, 1):
+            try:
+                yield page_number, page.extract_text() or ""
+            except Exception:
+                yield page_number, ""
+            page.flush_cache()
+
+
+def _title_after(lines: List[str], index: int) -> Optional[str]:
+    """Title lines following a chapter label, up to the first quote, bullet or sentence"""
+    title_lines = []
+    for line in lines[index + 1:index + 4]:
+        if line[0] in '“"•' or line.endswith(('.', ':')) or CHAPTER_LABEL.match(line):
+            break
+        title_lines.append(line)
+    return " ".join(title_lines) or None
+
+
+def scan_chapter_starts(pages: Iterable[Tuple[int, str]]) -> List[Tuple[int, str, int]]:
+    """
+    Find chapter start pages in one pass over page texts
+    
+    A page starts chapter N when it carries a "Chapter N" label and N is the
+    next chapter expected, which skips running heads and cross references to
+    other chapters. Table of contents pages are recognised by their dot
+    leaders and skipped.
+    
+    Args:
+        pages: (page number, text) pairs in page order
+        
+    Returns:
+        (chapter number, title, start page) per chapter found
+    """
+    chapters = []
+    expected = 1
+    
+    for page_number, text in pages:
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        if sum(1 for line in lines if DOT_LEADER.search(line)) >= 3:
+            continue
+        
+        for index, line in enumerate(lines):
+            match = CHAPTER_LABEL.match(line) or TRAILING_CHAPTER_LABEL.search(line)
+            if match and int(match.group(1)) == expected:
+                # Titles are only reliable when the label heads the page
+                title = None
+                if index == 0 and match.re is CHAPTER_LABEL:
+                    title = match.group('title') or _title_after(lines, index)
+                chapters.append((expected, (title or f"Chapter {expected}").strip(), page_number))
+                expected += 1
+                break
+    
+    return chapters
+
+
+def pdf_outline_chapters(pdf_path: Path) -> List[Tuple[int, str, int]]:
+    """
+    Chapter starts from a PDF's bookmarks
+    
+    A "Chapter N" bookmark gives the start page; its first child bookmark,
+    when present, gives the title.
+    
+    Returns:
+        (chapter number, title, start page) per chapter bookmark, or [] without an outline
+    """
+    import PyPDF2
+    
+    reader = PyPDF2.PdfReader(str(pdf_path))
+    outline = reader.outline or []
+    chapters = {}
+    
+    for index, item in enumerate(outline):
+        if isinstance(item, list):
+            continue
+        match = CHAPTER_LABEL.match(str(item.title).strip())
+        if not match:
+            continue
+        try:
+            page_number = reader.get_destination_page_number(item) + 1
+        except Exception:
+            continue
+        
+        title = match.group('title')
+        children = outline[index + 1] if index + 1 < len(outline) and isinstance(outline[index + 1], list) else []
+        if not title and children and not isinstance(children[0], list):
+            title = str(children[0].title)
+        
+        chapter_number = int(match.group(1))
+        chapters.setdefault(chapter_number, (chapter_number, (title or f"Chapter {chapter_number}").strip(),
+                                             page_number))
+    
+    return [chapters[number] for number in sorted(chapters)]
+
+
+class XMLStreamWriter:
+    """
+    Indented XML written element by element to a file handle
+    
+    Built on xml.sax.saxutils.XMLGenerator, which escapes text and attribute
+    values as they are written.
+    """
+    
+    def __init__(self, out: TextIO, indent: str = "  "):
+        self.out = out
+        self.indent = indent
+        self.depth = 0
+        self._generator = XMLGenerator(out, encoding="UTF-8", short_empty_elements=True)
+        self._generator.startDocument()
+        
+    def _newline(self):
+        self._generator.ignorableWhitespace("\n" + self.indent * self.depth)
+        
+    def start(self, name: str, attributes: Optional[Dict[str, str]] = None):
+        """Open an element on its own line"""
+        if self.depth:
+            self._newline()
+        self._generator.startElement(name, attributes or {})
+        self.depth += 1
+        
+    def end(self, name: str):
+        """Close the innermost element on its own line"""
+        self.depth -= 1
+        self._newline()
+        self._generator.endElement(name)
+        
+    def element(self, name: str, text: object = None, attributes: Optional[Dict[str, str]] = None):
+        """Write a complete element with optional text content"""
+        self._newline()
+        self._generator.startElement(name, attributes or {})
+        if text is not None:
+            self._generator.characters(str(text))
+        self._generator.endElement(name)
+        
+    def close(self):
+        """Finish the document"""
+        self._generator.endDocument()
+
+
+# Export templates are compiled once and filled per chapter while streaming to the output file
+TXT_HEADER_TEMPLATE = Template("""\
+WELLSPRING CHAPTER FORMATTING SPECIFICATIONS
+==================================================
+
+SUMMARY:
+Total chapters: $total_chapters
+Iconography specs: $iconography_specs
+Pages affected: 300+
+
+MARGIN ADJUSTMENTS:
+Top margin: 51pt → ${top}pt (+3 points)
+Bottom margin: 51pt → ${bottom}pt (+3 points)
+Inside margin: 54pt → ${inside}pt (+3 points)
+Outside margin: 54pt → ${outside}pt (+3 points)
+
+TYPOGRAPHY CHANGES:
+Chapter title font: $chapter_title_font
+Chapter title size: ${chapter_title_size}pt
+Primary color: $primary (Dark Blue)
+Accent color: $accent (Gold)
+
+CHAPTER-SPECIFIC FORMATTING:""")
+
+TXT_CHAPTER_TEMPLATE = Template("""
+
+Chapter $number: $title
+  Start page: $start_page
+  Layout: Right-hand page start
+  Icon type: $icon_type
+  Color scheme: $color_scheme""")
+
+TXT_ICON_TEMPLATE = Template("""
+  Icon: $icon_name
+  Position: $position
+  Size: ${width}x${height} points
+  Colors: $colors""")
+
+IDML_TEMPLATE = Template("""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Document>
+    <idPkg:Spread xmlns:idPkg="http://ns.adobe.com/AdobeInDesign/idml/1.0/packaging">
+        <MasterSpread Self="ub6" Length="1">
+            <Properties>
+                <Label>A-Master</Label>
+            </Properties>
+            <MarginPreference>
+                <Properties>
+                    <Top>$top</Top>
+                    <Bottom>$bottom</Bottom>
+                    <Inside>$inside</Inside>
+                    <Outside>$outside</Outside>
+                </Properties>
+            </MarginPreference>
+        </MasterSpread>
+        
+        <!-- Chapter Styles -->
+        <ParagraphStyle Self="ChapterTitle">
+            <Properties>
+                <Name>Chapter Title</Name>
+                <AppliedFont>$chapter_title_font</AppliedFont>
+                <PointSize>$chapter_title_size</PointSize>
+                <FillColor>$primary</FillColor>
+            </Properties>
+        </ParagraphStyle>
+        
+        <!-- Architectural Corner Style -->
+        <ObjectStyle Self="ArchitecturalCorner">
+            <Properties>
+                <Name>Architectural Corner</Name>
+                <FillColor>$primary</FillColor>
+            </Properties>
+        </ObjectStyle>
+    </idPkg:Spread>
+</Document>""")
+
+HTML_HEAD_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <title>Wellspring Chapter Formatting Instructions</title>
+    <style>
+        body { font-family: 'Minion Pro', serif; margin: 40px; }
+        h1 { color: $primary; }
+        h2 { color: $accent; }
+        .chapter { border-left: 4px solid $primary; padding-left: 20px; margin: 20px 0; }
+        .margins { background: #f5f5f5; padding: 15px; border-radius: 5px; }
+        .icon-spec { background: #e8f4f8; padding: 10px; margin: 10px 0; border-radius: 3px; }
+    </style>
+</head>
+<body>
+    <h1>Wellspring Chapter Formatting Specifications</h1>
+    
+    <div class="margins">
+        <h2>Margin Adjustments (+3 points)</h2>
+        <ul>
+            <li>Top: 51pt → ${top}pt</li>
+            <li>Bottom: 51pt → ${bottom}pt</li>
+            <li>Inside: 54pt → ${inside}pt</li>
+            <li>Outside: 54pt → ${outside}pt</li>
+        </ul>
+    </div>
+    
+    <h2>Typography Specifications</h2>
+    <ul>
+        <li>Chapter Title Font: $chapter_title_font</li>
+        <li>Chapter Title Size: ${chapter_title_size}pt</li>
+        <li>Primary Color: $primary</li>
+        <li>Accent Color: $accent</li>
+    </ul>
+    
+    <h2>Chapter-Specific Formatting</h2>""")
+
+HTML_CHAPTER_TEMPLATE = Template("""
+    <div class="chapter">
+        <h3>Chapter $number: $title</h3>
+        <p><strong>Start Page:</strong> $start_page (Right-hand)</p>
+        <p><strong>Icon Type:</strong> $icon_type</p>
+        <p><strong>Color Scheme:</strong> $color_scheme</p>""")
+
+HTML_ICON_TEMPLATE = Template("""
+        <div class="icon-spec">
+            <strong>Iconography:</strong><br>
+            Name: $icon_name<br>
+            Position: $position<br>
+            Size: $width × $height points<br>
+            Colors: $colors
+        </div>""")
+
+HTML_FOOTER = """
+    
+    <h2>Implementation Notes</h2>
+    <ul>
+        <li>All chapters must start on right-hand pages</li>
+        <li>Insert blank pages before chapters if needed</li>
+        <li>Apply architectural corner elements to every page</li>
+        <li>Corner elements: 18×18 points in dark blue</li>
+    </ul>
+</body>
+</html>"""
+
+
 @dataclass
 class ChapterFormat:
     """Chapter formatting specifications"""
@@ -135,44 +464,68 @@ class WellspringChapterFormatter:
                 )
             """)
             
+    def _chapter_source(self, input_file: str) -> Optional[Path]:
+        """
+        File to read chapter pages from
+        
+        PDFs and text extracted with page markers carry page numbers directly.
+        IDML and InDesign XML exports do not, so their PDF export (same name,
+        .pdf) is used instead.
+        """
+        path = Path(input_file)
+        if path.suffix.lower() in ('.pdf', '.txt', '.md') and path.exists():
+            return path
+        
+        pdf_export = path.with_suffix('.pdf')
+        if pdf_export.exists():
+            self.logger.info(f"{path.name} has no page numbers; reading chapter pages from {pdf_export}")
+            return pdf_export
+        
+        return None
+    
     def analyze_chapter_structure(self, input_file: str) -> List[ChapterFormat]:
         """
         Analyze document structure and identify chapters
+        
+        Chapter start pages come from the PDF's chapter bookmarks when it has
+        them; otherwise the page texts (from the PDF, or from text extracted
+        with page markers) are scanned once, in order, for chapter labels.
         """
         self.logger.info(f"Analyzing chapter structure from: {input_file}")
         
-        # For now, create sample chapter structure
-        # TODO: Integrate with actual document parsing
+        source = self._chapter_source(input_file)
+        if source is None:
+            self.logger.error(f"No PDF or extracted text found for {input_file}")
+            return []
+        
+        found = []
+        if source.suffix.lower() == '.pdf':
+            found = pdf_outline_chapters(source)
+            if found:
+                self.logger.info(f"Read {len(found)} chapters from the PDF outline")
+            else:
+                found = scan_chapter_starts(iter_pdf_pages(source))
+        else:
+            found = scan_chapter_starts(iter_marked_pages(source))
+        
         chapters = [
             ChapterFormat(
-                chapter_number=1,
-                title="Introduction to Behavioral Health Capital Projects",
-                start_page=15,
-                icon_type="foundation",
+                chapter_number=chapter_number,
+                title=title,
+                start_page=start_page,
+                icon_type=ICON_TYPES[(chapter_number - 1) % len(ICON_TYPES)],
                 color_scheme="dark_blue_gold",
-                layout_style="opener",
-                margin_adjustments=self.formatting_specs["margins"]
-            ),
-            ChapterFormat(
-                chapter_number=2, 
-                title="Planning and Pre-Development",
-                start_page=45,
-                icon_type="blueprint",
-                color_scheme="dark_blue_gold",
-                layout_style="standard",
-                margin_adjustments=self.formatting_specs["margins"]
-            ),
-            ChapterFormat(
-                chapter_number=3,
-                title="Design and Development Process", 
-                start_page=78,
-                icon_type="compass",
-                color_scheme="dark_blue_gold", 
-                layout_style="standard",
+                layout_style="opener" if chapter_number == 1 else "standard",
                 margin_adjustments=self.formatting_specs["margins"]
             )
+            for chapter_number, title, start_page in found
         ]
         
+        missing = sorted(set(range(1, max((c.chapter_number for c in chapters), default=0) + 1))
+                         - {c.chapter_number for c in chapters})
+        if missing:
+            self.logger.warning(f"Chapters not found: {missing}")
+        
         self.logger.info(f"Identified {len(chapters)} chapters")
         return chapters
         
@@ -227,6 +580,11 @@ class WellspringChapterFormatter:
 
 #target indesign
 
+// Chapter index precomputed from the manuscript: start pages are 1-based, in document order
+var CHAPTER_INDEX = __CHAPTER_INDEX__;
+
+var CORNER_LABEL = "wellspring-architectural-corner";
+
 function formatWellspringChapters() {
     if (app.documents.length == 0) {
         alert("Please open a document first.");
@@ -235,24 +593,49 @@ function formatWellspringChapters() {
     
     var doc = app.activeDocument;
     
+    // One undo step for the whole run, with screen redraw off while it works
+    var enableRedraw = app.scriptPreferences.enableRedraw;
+    app.scriptPreferences.enableRedraw = false;
+    try {
+        app.doScript(function () {
+            runFormatting(doc);
+        }, ScriptLanguage.JAVASCRIPT, undefined, UndoModes.ENTIRE_SCRIPT, "Wellspring chapter formatting");
+    } finally {
+        app.scriptPreferences.enableRedraw = enableRedraw;
+    }
+    
+    alert("Chapter formatting complete!\\n" + CHAPTER_INDEX.length + " chapter start pages formatted.");
+}
+
+function runFormatting(doc) {
     // Apply margin specifications
     applyMargins(doc);
     
+    // Apply architectural corners
+    applyArchitecturalCorners(doc);
+    
     // Format chapters
     formatChapters(doc);
     
     // Place iconography
     placeIconography(doc);
-    
-    // Apply architectural corners
-    applyArchitecturalCorners(doc);
-    
-    alert("Chapter formatting complete!");
 }
 
 function applyMargins(doc) {
-    // Apply Brian's +3 point margin increases
-    var marginPrefs = doc.marginPreferences;
+    // Apply Brian's +3 point margin increases to the document defaults
+    // and to every master page, which the document pages inherit
+    setMargins(doc.marginPreferences);
+    
+    var masters = doc.masterSpreads;
+    for (var i = 0; i < masters.length; i++) {
+        var masterPages = masters[i].pages;
+        for (var j = 0; j < masterPages.length; j++) {
+            setMargins(masterPages[j].marginPreferences);
+        }
+    }
+}
+
+function setMargins(marginPrefs) {
     marginPrefs.top = "54pt";
     marginPrefs.bottom = "54pt"; 
     marginPrefs.inside = "57pt";
@@ -260,27 +643,21 @@ function applyMargins(doc) {
 }
 
 function formatChapters(doc) {
-    // Chapter formatting logic
-    var pages = doc.pages;
-    
-    // Ensure chapter starts on right pages
-    for (var i = 0; i < pages.length; i++) {
-        var page = pages[i];
-        
-        // Check if this is a chapter start page
-        if (isChapterStartPage(page)) {
-            ensureRightPageStart(page, doc);
-            applyChapterLayout(page);
+    // Only the indexed chapter-start pages are visited. They are handled
+    // last to first, so a blank page inserted before one chapter does not
+    // shift the pages of the chapters still to be formatted.
+    for (var i = CHAPTER_INDEX.length - 1; i >= 0; i--) {
+        var pageIndex = CHAPTER_INDEX[i].page - 1;
+        if (pageIndex >= doc.pages.length) {
+            continue;
         }
+        
+        var page = doc.pages[pageIndex];
+        ensureRightPageStart(page, doc);
+        applyChapterLayout(page, CHAPTER_INDEX[i]);
     }
 }
 
-function isChapterStartPage(page) {
-    // Logic to identify chapter start pages
-    // TODO: Implement chapter detection
-    return false;
-}
-
 function ensureRightPageStart(page, doc) {
     // Ensure chapter starts on right-hand page
     if (page.side == PageSideOptions.LEFT_HAND) {
@@ -290,7 +667,7 @@ function ensureRightPageStart(page, doc) {
     }
 }
 
-function applyChapterLayout(page) {
+function applyChapterLayout(page, chapter) {
     // Apply chapter-specific layout
     // Header colors, typography, etc.
 }
@@ -301,19 +678,36 @@ function placeIconography(doc) {
 }
 
 function applyArchitecturalCorners(doc) {
-    // Place architectural corner elements on every page
-    var pages = doc.pages;
+    // Corners go on the master pages, so every document page shows them
+    // without a frame being created per page
+    var masters = doc.masterSpreads;
     
-    for (var i = 0; i < pages.length; i++) {
-        var page = pages[i];
-        placeCornerElement(page);
+    for (var i = 0; i < masters.length; i++) {
+        var masterPages = masters[i].pages;
+        for (var j = 0; j < masterPages.length; j++) {
+            if (!hasCornerElement(masterPages[j])) {
+                placeCornerElement(masterPages[j]);
+            }
+        }
+    }
+}
+
+function hasCornerElement(page) {
+    // Corners from an earlier run are labelled, so re-running adds none
+    var rectangles = page.rectangles;
+    for (var i = 0; i < rectangles.length; i++) {
+        if (rectangles[i].label == CORNER_LABEL) {
+            return true;
+        }
     }
+    return false;
 }
 
 function placeCornerElement(page) {
     // Create architectural corner element
     var cornerFrame = page.rectangles.add();
     cornerFrame.geometricBounds = [0, 0, 18, 18]; // 1/4 inch corner
+    cornerFrame.label = CORNER_LABEL;
     
     // Apply corner styling
     cornerFrame.fillColor = "Dark Blue";
@@ -324,7 +718,11 @@ function placeCornerElement(page) {
 formatWellspringChapters();
 """
         
-        return script_template
+        chapter_index = [
+            {"chapter": chapter.chapter_number, "page": chapter.start_page, "title": chapter.title}
+            for chapter in sorted(chapters, key=lambda chapter: chapter.start_page)
+        ]
+        return script_template.replace("__CHAPTER_INDEX__", json.dumps(chapter_index))
         
     def generate_chapter_layout_report(self, chapters: List[ChapterFormat]) -> Dict:
         """
@@ -449,20 +847,11 @@ formatWellspringChapters();
                 "summary": report["summary"]
             }
         
-        # 5. Save script to file
-        script_file = output_path / "wellspring_chapter_formatting.jsx"
-        with open(script_file, 'w') as f:
-            f.write(indesign_script)
-            
-        # 6. Save report
-        report_file = output_path / f"chapter_formatting_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
-            
-        # 7. Export all additional formats
-        exported_files = self.export_all_formats(chapters, iconography, report, output_path)
-            
-        # 8. Save to database
+        # 5. Export the script, report and all additional formats
+        exported_files = self.export_all_formats(chapters, iconography, report, output_path,
+                                                 indesign_script=indesign_script)
+        
+        # 6. Save to database
         self.save_formatting_specs(chapters, iconography)
         
         self.logger.info(f"Workflow complete! Files saved to: {output_path}")
@@ -470,11 +859,11 @@ formatWellspringChapters();
         return {
             "status": "success",
             "chapters_processed": len(chapters),
-            "script_file": str(script_file),
-            "report_file": str(report_file),
+            "script_file": exported_files["jsx"],
+            "report_file": exported_files["json"],
             "exported_formats": exported_files,
             "iconography_specs": len(iconography),
-            "total_files_created": len(exported_files) + 2,  # +2 for jsx and json
+            "total_files_created": len(exported_files),
             "summary": report["summary"]
         }
     
@@ -581,271 +970,211 @@ formatWellspringChapters();
         changes += 300  # Approximate pages for corner elements
         return changes
 
-    def generate_txt_export(self, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec], report: Dict) -> str:
-        """
-        Generate plain text formatting specifications
-        """
-        txt_content = []
-        txt_content.append("WELLSPRING CHAPTER FORMATTING SPECIFICATIONS")
-        txt_content.append("=" * 50)
-        txt_content.append("")
-        
-        # Summary
-        txt_content.append("SUMMARY:")
-        txt_content.append(f"Total chapters: {len(chapters)}")
-        txt_content.append(f"Iconography specs: {len(iconography)}")
-        txt_content.append(f"Pages affected: 300+")
-        txt_content.append("")
-        
-        # Margin specifications
+    def _spec_fields(self) -> Dict[str, object]:
+        """Margin and typography values shared by the export templates"""
         margins = self.formatting_specs["margins"]
-        txt_content.append("MARGIN ADJUSTMENTS:")
-        txt_content.append(f"Top margin: 51pt → {margins['top']}pt (+3 points)")
-        txt_content.append(f"Bottom margin: 51pt → {margins['bottom']}pt (+3 points)")
-        txt_content.append(f"Inside margin: 54pt → {margins['inside']}pt (+3 points)")
-        txt_content.append(f"Outside margin: 54pt → {margins['outside']}pt (+3 points)")
-        txt_content.append("")
-        
-        # Typography
         typography = self.formatting_specs["typography"]
-        txt_content.append("TYPOGRAPHY CHANGES:")
-        txt_content.append(f"Chapter title font: {typography['chapter_title_font']}")
-        txt_content.append(f"Chapter title size: {typography['chapter_title_size']}pt")
-        txt_content.append(f"Primary color: {typography['header_colors']['primary']} (Dark Blue)")
-        txt_content.append(f"Accent color: {typography['header_colors']['accent']} (Gold)")
-        txt_content.append("")
-        
-        # Chapter details
-        txt_content.append("CHAPTER-SPECIFIC FORMATTING:")
+        return {
+            "top": margins["top"],
+            "bottom": margins["bottom"],
+            "inside": margins["inside"],
+            "outside": margins["outside"],
+            "chapter_title_font": typography["chapter_title_font"],
+            "chapter_title_size": typography["chapter_title_size"],
+            "primary": typography["header_colors"]["primary"],
+            "accent": typography["header_colors"]["accent"]
+        }
+    
+    @staticmethod
+    def _chapter_fields(chapter: ChapterFormat, escape: Callable[[str], str] = str) -> Dict[str, object]:
+        """Template values for one chapter, with text passed through an escaping function"""
+        return {
+            "number": chapter.chapter_number,
+            "title": escape(chapter.title),
+            "start_page": chapter.start_page,
+            "icon_type": escape(chapter.icon_type),
+            "color_scheme": escape(chapter.color_scheme)
+        }
+    
+    @staticmethod
+    def _icon_fields(icon: IconographySpec, escape: Callable[[str], str] = str) -> Dict[str, object]:
+        """Template values for one chapter icon"""
+        return {
+            "icon_name": escape(icon.icon_name),
+            "position": escape(icon.position),
+            "width": icon.size[0],
+            "height": icon.size[1],
+            "colors": escape(", ".join(icon.color_palette))
+        }
+    
+    def write_txt_export(self, out: TextIO, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec], report: Dict):
+        """
+        Stream plain text formatting specifications to a file handle
+        """
+        out.write(TXT_HEADER_TEMPLATE.substitute(self._spec_fields(), total_chapters=len(chapters),
+                                                 iconography_specs=len(iconography)))
         for chapter in chapters:
-            txt_content.append(f"\nChapter {chapter.chapter_number}: {chapter.title}")
-            txt_content.append(f"  Start page: {chapter.start_page}")
-            txt_content.append(f"  Layout: Right-hand page start")
-            txt_content.append(f"  Icon type: {chapter.icon_type}")
-            txt_content.append(f"  Color scheme: {chapter.color_scheme}")
-            
+            out.write(TXT_CHAPTER_TEMPLATE.substitute(self._chapter_fields(chapter)))
             if chapter.chapter_number in iconography:
-                icon = iconography[chapter.chapter_number]
-                txt_content.append(f"  Icon: {icon.icon_name}")
-                txt_content.append(f"  Position: {icon.position}")
-                txt_content.append(f"  Size: {icon.size[0]}x{icon.size[1]} points")
-                txt_content.append(f"  Colors: {', '.join(icon.color_palette)}")
-        
-        return "\n".join(txt_content)
+                out.write(TXT_ICON_TEMPLATE.substitute(self._icon_fields(iconography[chapter.chapter_number])))
     
-    def generate_xml_export(self, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec], report: Dict) -> str:
+    def write_xml_export(self, out: TextIO, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec], report: Dict):
         """
-        Generate XML formatting specifications
+        Stream XML formatting specifications to a file handle
+        
+        Text is escaped by the XML writer, so titles with &, < or quotes stay well-formed.
         """
-        xml_content = []
-        xml_content.append('<?xml version="1.0" encoding="UTF-8"?>')
-        xml_content.append('<wellspring_formatting>')
-        xml_content.append('  <metadata>')
-        xml_content.append(f'    <generated_at>{datetime.now().isoformat()}</generated_at>')
-        xml_content.append(f'    <total_chapters>{len(chapters)}</total_chapters>')
-        xml_content.append(f'    <iconography_specs>{len(iconography)}</iconography_specs>')
-        xml_content.append('  </metadata>')
+        xml = XMLStreamWriter(out)
+        xml.start('wellspring_formatting')
         
-        # Margins
-        margins = self.formatting_specs["margins"]
-        xml_content.append('  <margins>')
-        xml_content.append(f'    <top>{margins["top"]}</top>')
-        xml_content.append(f'    <bottom>{margins["bottom"]}</bottom>')
-        xml_content.append(f'    <inside>{margins["inside"]}</inside>')
-        xml_content.append(f'    <outside>{margins["outside"]}</outside>')
-        xml_content.append('  </margins>')
-        
-        # Typography
-        typography = self.formatting_specs["typography"]
-        xml_content.append('  <typography>')
-        xml_content.append(f'    <chapter_title_font>{typography["chapter_title_font"]}</chapter_title_font>')
-        xml_content.append(f'    <chapter_title_size>{typography["chapter_title_size"]}</chapter_title_size>')
-        xml_content.append(f'    <primary_color>{typography["header_colors"]["primary"]}</primary_color>')
-        xml_content.append(f'    <accent_color>{typography["header_colors"]["accent"]}</accent_color>')
-        xml_content.append('  </typography>')
-        
-        # Chapters
-        xml_content.append('  <chapters>')
+        xml.start('metadata')
+        xml.element('generated_at', datetime.now().isoformat())
+        xml.element('total_chapters', len(chapters))
+        xml.element('iconography_specs', len(iconography))
+        xml.end('metadata')
+        
+        specs = self._spec_fields()
+        xml.start('margins')
+        for side in ('top', 'bottom', 'inside', 'outside'):
+            xml.element(side, specs[side])
+        xml.end('margins')
+        
+        xml.start('typography')
+        xml.element('chapter_title_font', specs['chapter_title_font'])
+        xml.element('chapter_title_size', specs['chapter_title_size'])
+        xml.element('primary_color', specs['primary'])
+        xml.element('accent_color', specs['accent'])
+        xml.end('typography')
+        
+        xml.start('chapters')
         for chapter in chapters:
-            xml_content.append('    <chapter>')
-            xml_content.append(f'      <number>{chapter.chapter_number}</number>')
-            xml_content.append(f'      <title><![CDATA[{chapter.title}]]></title>')
-            xml_content.append(f'      <start_page>{chapter.start_page}</start_page>')
-            xml_content.append(f'      <icon_type>{chapter.icon_type}</icon_type>')
-            xml_content.append(f'      <color_scheme>{chapter.color_scheme}</color_scheme>')
+            xml.start('chapter')
+            xml.element('number', chapter.chapter_number)
+            xml.element('title', chapter.title)
+            xml.element('start_page', chapter.start_page)
+            xml.element('icon_type', chapter.icon_type)
+            xml.element('color_scheme', chapter.color_scheme)
             
             if chapter.chapter_number in iconography:
                 icon = iconography[chapter.chapter_number]
-                xml_content.append('      <iconography>')
-                xml_content.append(f'        <icon_name>{icon.icon_name}</icon_name>')
-                xml_content.append(f'        <position>{icon.position}</position>')
-                xml_content.append(f'        <width>{icon.size[0]}</width>')
-                xml_content.append(f'        <height>{icon.size[1]}</height>')
-                xml_content.append('        <colors>')
+                xml.start('iconography')
+                xml.element('icon_name', icon.icon_name)
+                xml.element('position', icon.position)
+                xml.element('width', icon.size[0])
+                xml.element('height', icon.size[1])
+                xml.start('colors')
                 for color in icon.color_palette:
-                    xml_content.append(f'          <color>{color}</color>')
-                xml_content.append('        </colors>')
-                xml_content.append('      </iconography>')
+                    xml.element('color', color)
+                xml.end('colors')
+                xml.end('iconography')
             
-            xml_content.append('    </chapter>')
-        xml_content.append('  </chapters>')
-        xml_content.append('</wellspring_formatting>')
+            xml.end('chapter')
+        xml.end('chapters')
         
-        return "\n".join(xml_content)
+        xml.end('wellspring_formatting')
+        xml.close()
+    
+    def write_idml_template(self, out: TextIO, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec]):
+        """
+        Stream the IDML template structure (simplified for demonstration) to a file handle
+        """
+        out.write(IDML_TEMPLATE.substitute({key: xml_escape(str(value)) for key, value in self._spec_fields().items()}))
+    
+    def write_pdf_instructions(self, out: TextIO, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec], report: Dict):
+        """
+        Stream PDF-ready formatting instructions (HTML for PDF conversion) to a file handle
+        """
+        out.write(HTML_HEAD_TEMPLATE.substitute({key: html.escape(str(value)) for key, value in self._spec_fields().items()}))
+        for chapter in chapters:
+            out.write(HTML_CHAPTER_TEMPLATE.substitute(self._chapter_fields(chapter, html.escape)))
+            if chapter.chapter_number in iconography:
+                out.write(HTML_ICON_TEMPLATE.substitute(self._icon_fields(iconography[chapter.chapter_number], html.escape)))
+            out.write("</div>")
+        out.write(HTML_FOOTER)
+    
+    def generate_txt_export(self, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec], report: Dict) -> str:
+        """
+        Generate plain text formatting specifications
+        """
+        out = io.StringIO()
+        self.write_txt_export(out, chapters, iconography, report)
+        return out.getvalue()
+    
+    def generate_xml_export(self, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec], report: Dict) -> str:
+        """
+        Generate XML formatting specifications
+        """
+        out = io.StringIO()
+        self.write_xml_export(out, chapters, iconography, report)
+        return out.getvalue()
     
     def generate_idml_template(self, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec]) -> str:
         """
         Generate IDML template structure (simplified for demonstration)
         """
-        idml_template = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
-<Document>
-    <idPkg:Spread xmlns:idPkg="http://ns.adobe.com/AdobeInDesign/idml/1.0/packaging">
-        <MasterSpread Self="ub6" Length="1">
-            <Properties>
-                <Label>A-Master</Label>
-            </Properties>
-            <MarginPreference>
-                <Properties>
-                    <Top>{self.formatting_specs['margins']['top']}</Top>
-                    <Bottom>{self.formatting_specs['margins']['bottom']}</Bottom>
-                    <Inside>{self.formatting_specs['margins']['inside']}</Inside>
-                    <Outside>{self.formatting_specs['margins']['outside']}</Outside>
-                </Properties>
-            </MarginPreference>
-        </MasterSpread>
-        
-        <!-- Chapter Styles -->
-        <ParagraphStyle Self="ChapterTitle">
-            <Properties>
-                <Name>Chapter Title</Name>
-                <AppliedFont>{self.formatting_specs['typography']['chapter_title_font']}</AppliedFont>
-                <PointSize>{self.formatting_specs['typography']['chapter_title_size']}</PointSize>
-                <FillColor>{self.formatting_specs['typography']['header_colors']['primary']}</FillColor>
-            </Properties>
-        </ParagraphStyle>
-        
-        <!-- Architectural Corner Style -->
-        <ObjectStyle Self="ArchitecturalCorner">
-            <Properties>
-                <Name>Architectural Corner</Name>
-                <FillColor>{self.formatting_specs['typography']['header_colors']['primary']}</FillColor>
-            </Properties>
-        </ObjectStyle>
-    </idPkg:Spread>
-</Document>"""
-        return idml_template
+        out = io.StringIO()
+        self.write_idml_template(out, chapters, iconography)
+        return out.getvalue()
     
     def generate_pdf_instructions(self, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec], report: Dict) -> str:
         """
         Generate PDF-ready formatting instructions (HTML for PDF conversion)
         """
-        html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>Wellspring Chapter Formatting Instructions</title>
-    <style>
-        body {{ font-family: 'Minion Pro', serif; margin: 40px; }}
-        h1 {{ color: {self.formatting_specs['typography']['header_colors']['primary']}; }}
-        h2 {{ color: {self.formatting_specs['typography']['header_colors']['accent']}; }}
-        .chapter {{ border-left: 4px solid {self.formatting_specs['typography']['header_colors']['primary']}; padding-left: 20px; margin: 20px 0; }}
-        .margins {{ background: #f5f5f5; padding: 15px; border-radius: 5px; }}
-        .icon-spec {{ background: #e8f4f8; padding: 10px; margin: 10px 0; border-radius: 3px; }}
-    </style>
-</head>
-<body>
-    <h1>Wellspring Chapter Formatting Specifications</h1>
-    
-    <div class="margins">
-        <h2>Margin Adjustments (+3 points)</h2>
-        <ul>
-            <li>Top: 51pt → {self.formatting_specs['margins']['top']}pt</li>
-            <li>Bottom: 51pt → {self.formatting_specs['margins']['bottom']}pt</li>
-            <li>Inside: 54pt → {self.formatting_specs['margins']['inside']}pt</li>
-            <li>Outside: 54pt → {self.formatting_specs['margins']['outside']}pt</li>
-        </ul>
-    </div>
-    
-    <h2>Typography Specifications</h2>
-    <ul>
-        <li>Chapter Title Font: {self.formatting_specs['typography']['chapter_title_font']}</li>
-        <li>Chapter Title Size: {self.formatting_specs['typography']['chapter_title_size']}pt</li>
-        <li>Primary Color: {self.formatting_specs['typography']['header_colors']['primary']}</li>
-        <li>Accent Color: {self.formatting_specs['typography']['header_colors']['accent']}</li>
-    </ul>
-    
-    <h2>Chapter-Specific Formatting</h2>"""
-        
-        for chapter in chapters:
-            html_content += f"""
-    <div class="chapter">
-        <h3>Chapter {chapter.chapter_number}: {chapter.title}</h3>
-        <p><strong>Start Page:</strong> {chapter.start_page} (Right-hand)</p>
-        <p><strong>Icon Type:</strong> {chapter.icon_type}</p>
-        <p><strong>Color Scheme:</strong> {chapter.color_scheme}</p>"""
-            
-            if chapter.chapter_number in iconography:
-                icon = iconography[chapter.chapter_number]
-                html_content += f"""
-        <div class="icon-spec">
-            <strong>Iconography:</strong><br>
-            Name: {icon.icon_name}<br>
-            Position: {icon.position}<br>
-            Size: {icon.size[0]} × {icon.size[1]} points<br>
-            Colors: {', '.join(icon.color_palette)}
-        </div>"""
-            
-            html_content += "</div>"
-        
-        html_content += """
+        out = io.StringIO()
+        self.write_pdf_instructions(out, chapters, iconography, report)
+        return out.getvalue()
     
-    <h2>Implementation Notes</h2>
-    <ul>
-        <li>All chapters must start on right-hand pages</li>
-        <li>Insert blank pages before chapters if needed</li>
-        <li>Apply architectural corner elements to every page</li>
-        <li>Corner elements: 18×18 points in dark blue</li>
-    </ul>
-</body>
-</html>"""
-        
-        return html_content
+    @staticmethod
+    def _write_export(file_path: Path, write: Callable[[TextIO], None]) -> str:
+        """Stream one export to a .partial file and move it into place once complete"""
+        partial_path = file_path.with_name(file_path.name + ".partial")
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            write(f)
+        os.replace(partial_path, file_path)
+        return str(file_path)
 
-    def export_all_formats(self, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec], report: Dict, output_path: Path) -> Dict[str, str]:
+    def export_all_formats(self, chapters: List[ChapterFormat], iconography: Dict[int, IconographySpec], report: Dict,
+                           output_path: Path, indesign_script: Optional[str] = None) -> Dict[str, str]:
         """
-        Export formatting specifications in all requested formats
+        Export formatting specifications in all six formats
+        
+        Each export streams straight to its own file handle, and the six are
+        written concurrently.
+        
+        Args:
+            chapters: Chapter formats
+            iconography: Icon specs by chapter number
+            report: Chapter layout report
+            output_path: Output directory
+            indesign_script: InDesign script to save; generated when not given
+            
+        Returns:
+            Export file paths keyed by format (jsx, json, txt, xml, idml, pdf_html)
         """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        exported_files = {}
-        
-        # 1. TXT format
-        txt_content = self.generate_txt_export(chapters, iconography, report)
-        txt_file = output_path / f"wellspring_formatting_{timestamp}.txt"
-        with open(txt_file, 'w') as f:
-            f.write(txt_content)
-        exported_files['txt'] = str(txt_file)
-        
-        # 2. XML format
-        xml_content = self.generate_xml_export(chapters, iconography, report)
-        xml_file = output_path / f"wellspring_formatting_{timestamp}.xml"
-        with open(xml_file, 'w') as f:
-            f.write(xml_content)
-        exported_files['xml'] = str(xml_file)
-        
-        # 3. IDML template
-        idml_content = self.generate_idml_template(chapters, iconography)
-        idml_file = output_path / f"wellspring_template_{timestamp}.idml"
-        with open(idml_file, 'w') as f:
-            f.write(idml_content)
-        exported_files['idml'] = str(idml_file)
-        
-        # 4. PDF-ready HTML
-        pdf_content = self.generate_pdf_instructions(chapters, iconography, report)
-        pdf_file = output_path / f"wellspring_instructions_{timestamp}.html"
-        with open(pdf_file, 'w') as f:
-            f.write(pdf_content)
-        exported_files['pdf_html'] = str(pdf_file)
-        
-        # Note: For actual PDF generation, we'd need additional libraries like reportlab or weasyprint
+        if indesign_script is None:
+            indesign_script = self.create_indesign_script(chapters, iconography)
+        
+        exports = {
+            'jsx': (output_path / "wellspring_chapter_formatting.jsx",
+                    lambda f: f.write(indesign_script)),
+            'json': (output_path / f"chapter_formatting_report_{timestamp}.json",
+                     lambda f: json.dump(report, f, indent=2)),
+            'txt': (output_path / f"wellspring_formatting_{timestamp}.txt",
+                    lambda f: self.write_txt_export(f, chapters, iconography, report)),
+            'xml': (output_path / f"wellspring_formatting_{timestamp}.xml",
+                    lambda f: self.write_xml_export(f, chapters, iconography, report)),
+            'idml': (output_path / f"wellspring_template_{timestamp}.idml",
+                     lambda f: self.write_idml_template(f, chapters, iconography)),
+            # For actual PDF generation, we'd need additional libraries like reportlab or weasyprint
+            'pdf_html': (output_path / f"wellspring_instructions_{timestamp}.html",
+                         lambda f: self.write_pdf_instructions(f, chapters, iconography, report))
+        }
+        
+        with ThreadPoolExecutor(max_workers=len(exports)) as executor:
+            futures = {format_type: executor.submit(self._write_export, file_path, write)
+                       for format_type, (file_path, write) in exports.items()}
+            exported_files = {format_type: future.result() for format_type, future in futures.items()}
         
         return exported_files
 
@@ -857,7 +1186,8 @@ def main():
     
     parser = argparse.ArgumentParser(description='Wellspring Chapter Formatting Agent')
     parser.add_argument('--preview', action='store_true', help='Preview changes without applying them')
-    parser.add_argument('--input', default='docs/The-Wellspring-Book.xml', help='Input file path')
+    parser.add_argument('--input', default='docs/The-Wellspring-Book.pdf',
+                        help='Book PDF, text extracted with page markers, or an IDML/XML export next to its PDF')
     parser.add_argument('--output', default='output', help='Output directory')
     
     args = parser.parse_args()
@@ -5,6 +5,7 @@ Generates 3 visual options per opportunity with deep research prompts for cost-e
 """
 
 import re
+import sys
 import json
 import sqlite3
 from pathlib import Path
@@ -13,6 +14,9 @@ from typing import List, Dict, Optional
 from datetime import datetime
 import logging
 
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from shared_utils.prompt_cache import PromptCache, prompt_text_hash
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -46,6 +50,7 @@ class VisualOpportunitiesGenerator:
             db_path = Path(__file__).parent.parent.parent / "shared_utils" / "data" / "wellspring.db"
         self.db_path = Path(db_path)
         self.shadcn_chart_templates = self._load_chart_templates()
+        self.prompt_cache = PromptCache(self.db_path) if self.db_path.exists() else None
     
     def _load_chart_templates(self) -> Dict[str, Dict]:
         """Load shadcn UI chart component templates."""
@@ -175,13 +180,22 @@ class VisualOpportunitiesGenerator:
                     chapter_section=chapter_name,
                     page_estimate=content[:match.start()].count('\n') // 25 + 1,
                     visual_options=visual_options,
-                    batch_research_id=f"batch_{chapter_name}_{i}_{datetime.now().strftime('%Y%m%d')}"
+                    batch_research_id=self._batch_research_id(chapter_name, i, visual_options)
                 )
                 opportunities.append(opportunity)
         
         logger.info(f"Generated {len(opportunities)} visual opportunities with {len(opportunities) * 3} total options")
         return opportunities
     
+    def _batch_research_id(self, chapter_name: str, pattern_index: int, visual_options: List[VisualOption]) -> str:
+        """Stable research ID derived from the option prompts, so re-runs match up."""
+        content_hash = prompt_text_hash([option.research_prompt for option in visual_options])
+        return f"batch_{chapter_name}_{pattern_index}_{content_hash[:12]}"
+    
+    def is_prompt_answered(self, research_prompt: str) -> bool:
+        """Check the prompt cache for an existing answer to a research prompt."""
+        return bool(self.prompt_cache and self.prompt_cache.is_prompt_answered(research_prompt))
+    
     def _generate_three_options(self, data_content: str, content_type: str, priority: int) -> List[VisualOption]:
         """Generate 3 different visual options for each opportunity."""
         options = []
@@ -386,9 +400,14 @@ Implementation: {self.shadcn_chart_templates['kpi_dashboard']['implementation']}
         report.append("=" * 80)
         
         total_prompts = len(opportunities) * 3
+        answered = {
+            option.research_prompt for opp in opportunities for option in opp.visual_options
+            if self.is_prompt_answered(option.research_prompt)
+        }
         report.append(f"\n🎯 EXECUTIVE SUMMARY:")
         report.append(f"  • Total Visual Opportunities: {len(opportunities)}")
         report.append(f"  • Total Research Prompts: {total_prompts}")
+        report.append(f"  • Already Answered (prompt cache): {len(answered)}")
         report.append(f"  • Estimated API Cost Savings: {total_prompts * 0.75:.2f} USD (vs live prompts)")
         report.append(f"  • shadcn UI Components Required: {len(set(opt.shadcn_component for opp in opportunities for opt in opp.visual_options))}")
         
@@ -415,6 +434,8 @@ Implementation: {self.shadcn_chart_templates['kpi_dashboard']['implementation']}
                 report.append(f"  Component: {option.shadcn_component}")
                 report.append(f"  Complexity: {option.complexity_score}/10")
                 report.append(f"  Priority: {option.priority_score}/10")
+                if option.research_prompt in answered:
+                    report.append("  Cached: answered previously, will not be resubmitted")
                 report.append(f"  \n  📝 RESEARCH PROMPT:")
                 report.append("  " + "-" * 40)
                 for line in option.research_prompt.strip().split('\n'):
@@ -1,9 +1,11 @@
 import os
+import re
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from pdf2docx import Converter
 import PyPDF2
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
 # Set up logging
 logging.basicConfig(
@@ -12,11 +14,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Chapters exported together in one DOCX
+CHAPTER_GROUPS = {
+    'Chapters_1-3': (1, 3),
+    'Chapters_4-6': (4, 6),
+    'Chapters_7-9': (7, 9),
+    'Chapters_10-12': (10, 12),
+    'Chapters_13-15': (13, 15),
+    'Chapters_16-19': (16, 19)
+}
+
+CHAPTER_TITLE = re.compile(r'^\s*Chapter\s+(\d+)\b', re.IGNORECASE)
+INTRODUCTION_TITLE = re.compile(r'^\s*Introduction\s*$', re.IGNORECASE)
+
+# Each worker process parses the PDF once and reuses the Converter for every section it converts
+_worker_converter: Optional[Converter] = None
+
+
+def _init_converter_worker(pdf_path: str) -> None:
+    """Open the PDF once per worker process."""
+    global _worker_converter
+    _worker_converter = Converter(pdf_path)
+
+
+def _convert_section_worker(section_name: str, start_page: int, end_page: int, output_dir: str) -> Tuple[str, bool]:
+    """Convert one section with the worker's cached Converter."""
+    output_path = os.path.join(output_dir, f"{section_name}.docx")
+    try:
+        _worker_converter.convert(output_path, start=start_page-1, end=end_page)  # pdf2docx uses 0-based indexing
+        return output_path, True
+    except Exception as e:
+        logger.error(f"Error converting section {section_name}: {str(e)}")
+        return output_path, False
+
 class PDFSplitter:
     def __init__(self, pdf_path: str):
         self.pdf_path = pdf_path
         self.output_dir = os.path.dirname(pdf_path)
         self.page_ranges = {}
+        self._converter = None
         self._analyze_pdf()
 
     def _analyze_pdf(self) -> None:
@@ -33,15 +69,63 @@ class PDFSplitter:
             toc = reader.outline
             if toc:
                 logger.info("Found table of contents structure")
-                self._extract_page_ranges_from_toc(toc)
+                self._extract_page_ranges_from_toc(toc, reader)
             else:
                 logger.warning("No table of contents found, using default page ranges")
                 self._set_default_page_ranges()
-    def _extract_page_ranges_from_toc(self, toc) -> None:
-        """Extract page ranges from table of contents."""
-        # Implementation would parse TOC structure
-        # For now, using default ranges as TOC parsing requires manual review
-        self._set_default_page_ranges()
+
+    def _outline_entries(self, toc, reader) -> List[Tuple[str, int]]:
+        """Flatten the outline into (title, 1-based page) pairs, skipping unresolvable bookmarks."""
+        entries = []
+        for item in toc:
+            if isinstance(item, list):
+                entries.extend(self._outline_entries(item, reader))
+                continue
+            try:
+                entries.append((str(item.title), reader.get_destination_page_number(item) + 1))
+            except Exception:
+                continue
+        return entries
+
+    def _extract_page_ranges_from_toc(self, toc, reader) -> None:
+        """
+        Extract page ranges from table of contents.
+        
+        Each section starts at the outline page of its first chapter (or of
+        the Introduction) and ends the page before the next section starts;
+        everything before the Introduction is exported as the Table of
+        Contents. Falls back to the default ranges if a chapter is missing.
+        """
+        chapter_pages = {}
+        introduction_page = None
+        
+        for title, page in self._outline_entries(toc, reader):
+            chapter_match = CHAPTER_TITLE.match(title)
+            if chapter_match:
+                chapter_pages.setdefault(int(chapter_match.group(1)), page)
+            elif introduction_page is None and INTRODUCTION_TITLE.match(title):
+                introduction_page = page
+        
+        first_chapters = [first for first, _ in CHAPTER_GROUPS.values()]
+        missing = [number for number in first_chapters if number not in chapter_pages]
+        if introduction_page is None or missing:
+            logger.warning(f"Outline is missing the Introduction or chapters {missing}, using default page ranges")
+            self._set_default_page_ranges()
+            return
+        
+        starts = [('Table_of_Contents', 1), ('Introduction', introduction_page)]
+        starts += [(name, chapter_pages[first]) for name, (first, _) in CHAPTER_GROUPS.items()]
+        
+        if any(start >= next_start for (_, start), (_, next_start) in zip(starts, starts[1:])):
+            logger.warning("Outline pages are out of order, using default page ranges")
+            self._set_default_page_ranges()
+            return
+        
+        ends = [next_start - 1 for _, next_start in starts[1:]] + [self.total_pages]
+        self.page_ranges = {name: (start, end) for (name, start), end in zip(starts, ends)}
+        
+        for name, (start, end) in self.page_ranges.items():
+            logger.info(f"   {name}: pages {start}-{end}")
 
     def _set_default_page_ranges(self) -> None:
         """Set default page ranges for each section."""
@@ -62,25 +146,69 @@ class PDFSplitter:
         output_path = os.path.join(self.output_dir, f"{section_name}.docx")
         logger.info(f"Converting section: {section_name} (pages {start_page}-{end_page})")
         
-        cv = None
         try:
-            cv = Converter(self.pdf_path)
-            cv.convert(output_path, start=start_page-1, end=end_page)  # pdf2docx uses 0-based indexing
+            # The parsed document is kept for later sections
+            if self._converter is None:
+                self._converter = Converter(self.pdf_path)
+            self._converter.convert(output_path, start=start_page-1, end=end_page)  # pdf2docx uses 0-based indexing
             logger.info(f"Successfully created: {output_path}")
             return True
         except Exception as e:
             logger.error(f"Error converting section {section_name}: {str(e)}")
             return False
-        finally:
-            if cv is not None:
-                cv.close()
 
-    def split_pdf(self) -> None:
-        """Split PDF into specified sections."""
+    def close(self) -> None:
+        """Release the cached Converter."""
+        if self._converter is not None:
+            self._converter.close()
+            self._converter = None
+
+    def split_pdf(self, max_workers: Optional[int] = None) -> Dict[str, bool]:
+        """
+        Split PDF into specified sections.
+        
+        Sections are converted in a process pool, largest first, and each
+        worker parses the PDF once and reuses it for every section it takes,
+        so the whole split takes about as long as the largest section.
+        
+        Args:
+            max_workers: Conversion processes (defaults to one per section, capped at the CPU count)
+            
+        Returns:
+            Success flag per section
+        """
         logger.info("Starting PDF splitting process")
         
-        for section_name, (start_page, end_page) in self.page_ranges.items():
-            self.convert_section(section_name, start_page, end_page)
+        sections = sorted(self.page_ranges.items(), key=lambda item: item[1][0] - item[1][1])
+        max_workers = max_workers or min(len(sections), os.cpu_count() or 1)
+        
+        if max_workers <= 1:
+            try:
+                return {name: self.convert_section(name, start, end) for name, (start, end) in sections}
+            finally:
+                self.close()
+        
+        results = {}
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_converter_worker,
+                                 initargs=(self.pdf_path,)) as executor:
+            futures = {}
+            for section_name, (start_page, end_page) in sections:
+                logger.info(f"Converting section: {section_name} (pages {start_page}-{end_page})")
+                futures[executor.submit(_convert_section_worker, section_name, start_page, end_page,
+                                        self.output_dir)] = section_name
+            
+            for future in as_completed(futures):
+                section_name = futures[future]
+                try:
+                    output_path, results[section_name] = future.result()
+                except Exception as e:
+                    logger.error(f"Error converting section {section_name}: {str(e)}")
+                    results[section_name] = False
+                    continue
+                if results[section_name]:
+                    logger.info(f"Successfully created: {output_path}")
+        
+        return results
 
 def main():
     pdf_path = "/Users/ojeromyo/Desktop/wellspring_directory/docs/The-Wellspring-Book.pdf"
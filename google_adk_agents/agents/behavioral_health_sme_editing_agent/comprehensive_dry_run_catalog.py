@@ -28,8 +28,9 @@ class ComprehensiveDryRunCatalog:
     that would be made across all input chapters.
     """
     
-    def __init__(self):
-        self.input_dir = Path("input_chapters")
+    def __init__(self, input_dir: str = "input_chapters"):
+        # Also takes chapters written from the DOCX exports by docx_to_text_processor.py
+        self.input_dir = Path(input_dir)
         self.catalog_dir = Path("dry_run_catalog")
         self.catalog_dir.mkdir(exist_ok=True)
         
@@ -424,7 +425,13 @@ class ComprehensiveDryRunCatalog:
 
 def main():
     """Main execution function."""
-    catalog = ComprehensiveDryRunCatalog()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Catalog every change the SME agent would make")
+    parser.add_argument("--input-dir", default="input_chapters", help="Directory of chapter markdown files")
+    args = parser.parse_args()
+    
+    catalog = ComprehensiveDryRunCatalog(args.input_dir)
     catalog.run_comprehensive_analysis()
 
 if __name__ == "__main__":
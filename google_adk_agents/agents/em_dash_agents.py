@@ -54,7 +54,7 @@ class EmDashAgentFactory:
         self.config = CONFIG
         
         # Configure Google AI
-        genai.configure(api_key=self.config.google_api_key)
+        genai.configure(api_key=self.config.require_google_api_key())
         
         # Initialize session services
         self.session_services = self._create_session_services()
@@ -396,13 +396,26 @@ class EmDashAgentOrchestrator:
             logger.error(f"Error getting system status: {e}")
             raise
 
-# Global orchestrator instance
-ORCHESTRATOR = EmDashAgentOrchestrator()
+# Global orchestrator instance, built on first use
+_ORCHESTRATOR: Optional[EmDashAgentOrchestrator] = None
+
+def get_orchestrator() -> EmDashAgentOrchestrator:
+    """Get the shared orchestrator instance."""
+    global _ORCHESTRATOR
+    if _ORCHESTRATOR is None:
+        _ORCHESTRATOR = EmDashAgentOrchestrator()
+    return _ORCHESTRATOR
+
+def __getattr__(name: str) -> Any:
+    """Resolve ``ORCHESTRATOR`` lazily so agents are only built when needed."""
+    if name == "ORCHESTRATOR":
+        return get_orchestrator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Convenience functions for direct use
 async def analyze_file(file_path: str, **kwargs) -> Dict[str, Any]:
     """Analyze a single file for em dash patterns."""
-    return await ORCHESTRATOR.analyze_documents([file_path], **kwargs)
+    return await get_orchestrator().analyze_documents([file_path], **kwargs)
 
 async def process_file(
     file_path: str,
@@ -411,7 +424,7 @@ async def process_file(
     **kwargs
 ) -> Dict[str, Any]:
     """Process a single file for em dash replacements."""
-    return await ORCHESTRATOR.process_documents([file_path], output_directory, dry_run=dry_run, **kwargs)
+    return await get_orchestrator().process_documents([file_path], output_directory, dry_run=dry_run, **kwargs)
 
 async def create_and_execute_workflow(
     workflow_name: str,
@@ -420,11 +433,11 @@ async def create_and_execute_workflow(
     **kwargs
 ) -> Dict[str, Any]:
     """Create and execute a complete em dash workflow."""
-    return await ORCHESTRATOR.execute_workflow(workflow_name, input_files, output_directory, **kwargs)
+    return await get_orchestrator().execute_workflow(workflow_name, input_files, output_directory, **kwargs)
 
 def get_agent_status() -> Dict[str, Any]:
     """Get status of all agents."""
-    return ORCHESTRATOR.get_system_status()
+    return get_orchestrator().get_system_status()
 
 if __name__ == "__main__":
     import asyncio
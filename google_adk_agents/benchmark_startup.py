@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for the Google ADK Em Dash CLI
+Runs main.py subcommands under ``python -X importtime`` and reports import
+cost, wall time, and whether the heavy Google SDKs were pulled in.
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py --runs 5 --top 15
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+MODULE_DIR = Path(__file__).parent
+
+# Subcommands that must start without the Google ADK / GenAI stack
+LIGHT_COMMANDS = [
+    ["--help"],
+    ["config"],
+    ["sessions", "stats"],
+]
+
+HEAVY_MODULE_PREFIXES = ("google.generativeai", "google.adk")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(.+)$")
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse ``-X importtime`` output into (module, self_us, cumulative_us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, module = match.groups()
+            rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def run_command(command: List[str]) -> Dict[str, object]:
+    """Run one CLI invocation under -X importtime and collect its metrics."""
+    env = dict(os.environ)
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *command],
+        cwd=MODULE_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    wall_time = time.perf_counter() - start
+
+    rows = parse_importtime(completed.stderr)
+    heavy_modules = sorted({
+        module for module, _, _ in rows
+        if module.startswith(HEAVY_MODULE_PREFIXES)
+    })
+
+    return {
+        "returncode": completed.returncode,
+        "wall_time": wall_time,
+        "import_time_us": sum(self_us for _, self_us, _ in rows),
+        "rows": rows,
+        "heavy_modules": heavy_modules
+    }
+
+def main() -> int:
+    """Benchmark CLI startup and fail if a light command imports the heavy SDKs."""
+    parser = argparse.ArgumentParser(description="Benchmark google_adk_agents CLI startup")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per command")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    print("⏱️  Google ADK CLI Startup Benchmark")
+    print("=" * 60)
+
+    failures = 0
+    for command in LIGHT_COMMANDS:
+        results = [run_command(command) for _ in range(max(1, args.runs))]
+        wall_times = [r["wall_time"] for r in results]
+        import_times = [r["import_time_us"] / 1000 for r in results]
+        last = results[-1]
+
+        print(f"\n▶️  main.py {' '.join(command)}")
+        print(f"  • Exit code: {last['returncode']}")
+        print(f"  • Wall time (median): {statistics.median(wall_times) * 1000:.1f} ms")
+        print(f"  • Import time (median): {statistics.median(import_times):.1f} ms")
+
+        slowest = sorted(last["rows"], key=lambda row: row[2], reverse=True)[:args.top]
+        print("  • Slowest imports (cumulative):")
+        for module, _, cumulative_us in slowest:
+            print(f"    - {module}: {cumulative_us / 1000:.1f} ms")
+
+        if last["heavy_modules"]:
+            failures += 1
+            print(f"  ❌ Heavy SDK modules imported: {', '.join(last['heavy_modules'][:5])}")
+        else:
+            print("  ✅ No Google ADK/GenAI imports")
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,7 +21,7 @@ from tools.em_dash_processing_tools import (
 )
 
 # Configure Google AI
-genai.configure(api_key=CONFIG.google_api_key)
+genai.configure(api_key=CONFIG.require_google_api_key())
 
 class ComprehensiveEmDashProcessor:
     """
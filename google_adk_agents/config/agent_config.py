@@ -45,10 +45,8 @@ class WellspringADKConfig:
         self.db_path = self.project_root / "shared_utils" / "data" / "wellspring.db"
         self.workspace_path = self.project_root
         
-        # Google AI configuration
+        # Google AI configuration; only validated once something needs the key
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
-        if not self.google_api_key:
-            raise ValueError("GOOGLE_API_KEY environment variable is required")
         
         # Model configurations
         self.default_model = "gemini-2.5-flash-preview-05-20"
@@ -193,6 +191,12 @@ Always ensure high-quality outcomes and maintain clear audit trails.""",
             )
         }
     
+    def require_google_api_key(self) -> str:
+        """Return the Google API key, raising if it is not configured."""
+        if not self.google_api_key:
+            raise ValueError("GOOGLE_API_KEY environment variable is required")
+        return self.google_api_key
+    
     def get_agent_config(self, agent_name: str) -> AgentConfig:
         """Get configuration for a specific agent."""
         if agent_name not in self.agent_configs:
@@ -235,5 +239,18 @@ Always ensure high-quality outcomes and maintain clear audit trails.""",
             }
         }
 
-# Global configuration instance
-CONFIG = WellspringADKConfig()
\ No newline at end of file
+# Global configuration instance, built on first use
+_CONFIG: Optional[WellspringADKConfig] = None
+
+def get_config() -> WellspringADKConfig:
+    """Get the shared configuration instance."""
+    global _CONFIG
+    if _CONFIG is None:
+        _CONFIG = WellspringADKConfig()
+    return _CONFIG
+
+def __getattr__(name: str) -> Any:
+    """Resolve ``CONFIG`` lazily so importing this module stays cheap."""
+    if name == "CONFIG":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
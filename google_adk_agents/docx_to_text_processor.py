@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+DOCX to Text Extractor for the Em Dash and SME Editing Pipelines
+Reads the section DOCX exports in docs/docx straight from their zip XML.
+
+Each file's word/document.xml is streamed with iterparse, keeping only
+paragraph text, the paragraph style name (resolved through word/styles.xml)
+and the largest run font size. Files are read in parallel worker processes.
+
+The exports were converted from the book PDF and carry no heading styles, so
+headings are recognised by font size relative to the file's body text. The
+running heads ("Wellspring - Chapter N", "Chapter title<tab>81") and page
+numbers left over from the PDF pages are dropped.
+
+Outputs:
+- One book text file for the em dash pipeline
+- One markdown file per chapter (Chapter_NN.md) in the format of the SME
+  agent's input_chapters, split at chapter openers across section files
+"""
+
+import asyncio
+import os
+import re
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent))
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# A paragraph this many points larger than the body text is a heading
+HEADING_SIZE_DELTA = 2.0
+
+CHAPTER_LABEL = re.compile(r'^chapter\s+(\d+)$', re.IGNORECASE)
+
+# Page furniture, recognised only in text smaller than the body
+RUNNING_HEAD = re.compile(r'^wellspring\s*-\s*chapter\s+(\d+)$', re.IGNORECASE)
+PAGE_NUMBERS = re.compile(r'^(?:[ivxlcdm]+|\d+)(?:\s+(?:[ivxlcdm]+|\d+))*$', re.IGNORECASE)
+RUNNING_TITLE = re.compile(r'^(?:.+\t\s*(?:[ivxlcdm]+|\d+)|(?:[ivxlcdm]+|\d+)\s*\t.+)$', re.IGNORECASE)
+
+# Table of contents, introduction, then chapter sections by first chapter number
+SECTION_ORDER = re.compile(r'chapters?_(\d+)', re.IGNORECASE)
+
+
+def load_style_names(docx_zip: zipfile.ZipFile) -> Dict[str, Any]:
+    """
+    Paragraph style names by style id, plus the defaults they fall back to
+
+    Returns:
+        {'names': {style id: name}, 'default_style': name, 'default_size': points or None}
+    """
+    styles = {'names': {}, 'default_style': 'Normal', 'default_size': None}
+    if 'word/styles.xml' not in docx_zip.namelist():
+        return styles
+
+    in_defaults = False
+    with docx_zip.open('word/styles.xml') as styles_stream:
+        for event, element in ET.iterparse(styles_stream, events=('start', 'end')):
+            if element.tag == WORD_NS + 'docDefaults':
+                in_defaults = event == 'start'
+            elif event == 'end' and element.tag == WORD_NS + 'sz' and in_defaults:
+                styles['default_size'] = int(element.get(WORD_NS + 'val')) / 2
+            elif event == 'end' and element.tag == WORD_NS + 'style':
+                if element.get(WORD_NS + 'type') == 'paragraph':
+                    name = element.find(WORD_NS + 'name')
+                    style_name = name.get(WORD_NS + 'val') if name is not None else element.get(WORD_NS + 'styleId')
+                    styles['names'][element.get(WORD_NS + 'styleId')] = style_name
+                    if element.get(WORD_NS + 'default') in ('1', 'true'):
+                        styles['default_style'] = style_name
+                element.clear()
+    return styles
+
+
+def iter_docx_paragraphs(docx_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the paragraphs of a DOCX file
+
+    Only text, tabs and line breaks are kept from each paragraph; tracked
+    deletions (w:delText) are skipped. Elements are cleared once read, so the
+    document markup is never held in memory.
+
+    Args:
+        docx_path: DOCX file to read
+
+    Yields:
+        {'style', 'text', 'size', 'in_table'} per non-empty paragraph, with
+        size the largest run font size in points
+    """
+    with zipfile.ZipFile(docx_path, 'r') as docx_zip:
+        styles = load_style_names(docx_zip)
+
+        with docx_zip.open('word/document.xml') as document_stream:
+            table_depth = 0
+            parts, sizes, style_id = [], [], None
+
+            for event, element in ET.iterparse(document_stream, events=('start', 'end')):
+                tag = element.tag
+                if event == 'start':
+                    if tag == WORD_NS + 'tbl':
+                        table_depth += 1
+                    elif tag == WORD_NS + 'p':
+                        parts, sizes, style_id = [], [], None
+                    continue
+
+                if tag == WORD_NS + 't':
+                    if element.text:
+                        parts.append(element.text)
+                elif tag == WORD_NS + 'tab':
+                    parts.append('\t')
+                elif tag in (WORD_NS + 'br', WORD_NS + 'cr'):
+                    parts.append('\n')
+                elif tag == WORD_NS + 'sz':
+                    sizes.append(int(element.get(WORD_NS + 'val')) / 2)
+                elif tag == WORD_NS + 'pStyle':
+                    style_id = element.get(WORD_NS + 'val')
+                elif tag == WORD_NS + 'p':
+                    text = ''.join(parts).strip()
+                    if text:
+                        yield {
+                            'style': styles['names'].get(style_id, style_id) if style_id else styles['default_style'],
+                            'text': text,
+                            'size': max(sizes) if sizes else styles['default_size'],
+                            'in_table': table_depth > 0
+                        }
+                    element.clear()
+                elif tag == WORD_NS + 'tbl':
+                    table_depth -= 1
+                    element.clear()
+
+
+def classify_paragraphs(paragraphs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Mark each paragraph as a heading, body text or page furniture
+
+    Heading styles are used when the document has them; otherwise a
+    paragraph set clearly larger than the body text (the most common size,
+    weighted by characters) is a heading. Running heads also record their
+    chapter number as 'chapter'.
+
+    Returns:
+        The paragraphs with 'kind' set
+    """
+    size_weights = Counter()
+    for paragraph in paragraphs:
+        if paragraph['size']:
+            size_weights[paragraph['size']] += len(paragraph['text'])
+    body_size = size_weights.most_common(1)[0][0] if size_weights else None
+
+    for paragraph in paragraphs:
+        text, size, style = paragraph['text'], paragraph['size'], paragraph['style'].lower()
+        smaller = body_size is not None and size is not None and size < body_size
+        running_head = RUNNING_HEAD.match(text)
+
+        if smaller and (running_head or PAGE_NUMBERS.match(text) or RUNNING_TITLE.match(text)):
+            paragraph['kind'] = 'furniture'
+            if running_head:
+                paragraph['chapter'] = int(running_head.group(1))
+        elif style.startswith(('heading', 'title')) or (
+                body_size is not None and size is not None and size >= body_size + HEADING_SIZE_DELTA):
+            paragraph['kind'] = 'heading'
+        else:
+            paragraph['kind'] = 'body'
+    return paragraphs
+
+
+def content_paragraphs(document: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """A document's headings and body text, without page furniture"""
+    return (paragraph for paragraph in document['paragraphs'] if paragraph['kind'] != 'furniture')
+
+
+def read_docx(docx_path: str) -> Dict[str, Any]:
+    """
+    Read and classify one DOCX file
+
+    Runs in a worker process.
+
+    Returns:
+        {'path', 'paragraphs', 'error'}
+    """
+    try:
+        paragraphs = classify_paragraphs(list(iter_docx_paragraphs(docx_path)))
+    except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+        return {'path': docx_path, 'paragraphs': [], 'error': str(e)}
+    return {'path': docx_path, 'paragraphs': paragraphs, 'error': None}
+
+
+def section_sort_key(docx_path: Path):
+    """Book order for the section exports"""
+    name = docx_path.stem.lower()
+    if 'contents' in name:
+        return (0, 0, name)
+    if 'introduction' in name:
+        return (1, 0, name)
+    match = SECTION_ORDER.search(name)
+    if match:
+        return (2, int(match.group(1)), name)
+    return (3, 0, name)
+
+
+def paragraph_lines(text: str) -> List[str]:
+    """
+    Split a paragraph at its line breaks, rejoining wrapped lines
+
+    Line breaks carried over from the PDF either start a new bullet or wrap
+    the current line, so only lines starting with a bullet stay separate.
+    Tabs left from the PDF layout become single spaces.
+    """
+    lines = []
+    for line in text.split('\n'):
+        line = re.sub(r'[ \t]+', ' ', line).strip()
+        if not line:
+            continue
+        if lines and not line.startswith('•'):
+            # A line ending in a hyphen was hyphenated at the wrap
+            separator = '' if lines[-1].endswith('-') else ' '
+            lines[-1] = f"{lines[-1]}{separator}{line}"
+        else:
+            lines.append(line)
+    return lines
+
+
+def render_markdown(paragraph: Dict[str, Any]) -> str:
+    """Paragraph in the markdown of the SME agent's input chapters"""
+    if paragraph['kind'] == 'heading':
+        return f"**{' '.join(paragraph_lines(paragraph['text']))}**"
+    return "\n".join(f"* {line.lstrip('•').strip()}" if line.startswith('•') else line
+                     for line in paragraph_lines(paragraph['text']))
+
+
+def render_text(paragraph: Dict[str, Any]) -> str:
+    """Paragraph as plain text for the em dash pipeline"""
+    return "\n".join(paragraph_lines(paragraph['text']))
+
+
+def split_chapters(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Regroup section paragraphs into chapters
+
+    Section files do not line up with chapter boundaries, so chapters are
+    split at their "Chapter N" opener headings wherever they fall. Where the
+    export lost a chapter's opener, the chapter starts at its first running
+    head instead, which can be a page or two late. Content before the first
+    chapter (table of contents, introduction) is skipped.
+
+    Args:
+        documents: read_docx results in book order
+
+    Returns:
+        {'number', 'paragraphs', 'opener'} per chapter, in order, with
+        opener False for chapters started at a running head
+    """
+    chapters = []
+    current = None
+    for document in documents:
+        for paragraph in document['paragraphs']:
+            number, opener = None, False
+            if paragraph['kind'] == 'heading':
+                match = CHAPTER_LABEL.match(paragraph['text'])
+                number, opener = (int(match.group(1)), True) if match else (None, False)
+            elif paragraph['kind'] == 'furniture':
+                number = paragraph.get('chapter')
+
+            if number is not None and (current is None or number > current['number']):
+                current = {'number': number, 'paragraphs': [], 'opener': opener}
+                chapters.append(current)
+            if current is not None and paragraph['kind'] != 'furniture':
+                current['paragraphs'].append(paragraph)
+    return chapters
+
+
+class WellspringDOCXProcessor:
+    """
+    Extract text from the Wellspring section DOCX exports for em dash and SME editing.
+    """
+
+    def __init__(self):
+        self.session_id = f"wellspring_docx_processing_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+    def read_docx_files(self, docx_dir: str, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Read every DOCX file in a directory in parallel
+
+        Args:
+            docx_dir: Directory of section DOCX files
+            max_workers: Worker processes (default: CPU count, capped at the file count)
+
+        Returns:
+            read_docx results in book order
+        """
+        docx_paths = sorted(Path(docx_dir).glob('*.docx'), key=section_sort_key)
+        # Word lock files (~$name.docx) are not packages
+        docx_paths = [path for path in docx_paths if not path.name.startswith('~$')]
+        if not docx_paths:
+            raise FileNotFoundError(f"No DOCX files found in {docx_dir}")
+
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(docx_paths)))
+        print(f"📄 Reading {len(docx_paths)} DOCX files with {workers} workers")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            documents = list(executor.map(read_docx, [str(path) for path in docx_paths]))
+
+        for document in documents:
+            name = Path(document['path']).name
+            if document['error']:
+                print(f"⚠️  Could not read {name}: {document['error']}")
+            else:
+                print(f"   ✅ {name}: {sum(1 for _ in content_paragraphs(document))} paragraphs")
+        return documents
+
+    def write_book_text(self, documents: List[Dict[str, Any]], output_path: str) -> str:
+        """
+        Write all sections as one text file for the em dash pipeline
+
+        Each section is wrapped in "--- SECTION name ---" markers.
+
+        Returns:
+            The text written
+        """
+        sections = []
+        for document in documents:
+            name = Path(document['path']).stem
+            body = "\n\n".join(render_text(paragraph) for paragraph in content_paragraphs(document))
+            sections.append(f"\n--- SECTION {name} ---\n\n{body}\n\n--- END SECTION {name} ---\n\n")
+        text = "".join(sections)
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"💾 Saved book text: {output_path} ({len(text):,} characters)")
+        return text
+
+    def write_sme_chapters(self, documents: List[Dict[str, Any]], chapters_dir: str) -> List[Path]:
+        """
+        Write one markdown file per chapter for the SME editing agent
+
+        Returns:
+            Chapter file paths
+        """
+        chapters_path = Path(chapters_dir)
+        chapters_path.mkdir(parents=True, exist_ok=True)
+
+        chapter_files = []
+        for chapter in split_chapters(documents):
+            if not chapter['opener']:
+                print(f"⚠️  Chapter {chapter['number']} has no opener in the DOCX; started at its first running head")
+            chapter_file = chapters_path / f"Chapter_{chapter['number']:02d}.md"
+            with open(chapter_file, 'w', encoding='utf-8') as f:
+                f.write("\n\n".join(render_markdown(paragraph) for paragraph in chapter['paragraphs']) + "\n")
+            chapter_files.append(chapter_file)
+
+        print(f"💾 Saved {len(chapter_files)} SME chapter files to {chapters_path}")
+        return chapter_files
+
+    async def process_entire_book(self, docx_dir: str, output_dir: str, sme_chapters_dir: Optional[str] = None):
+        """Read the DOCX exports once, write SME chapters and run em dash processing on the book text."""
+        # Only the em dash step needs the Gemini agent stack
+        from comprehensive_em_dash_processor import ComprehensiveEmDashProcessor
+
+        print("🚀 WELLSPRING MANUAL - DOCX BOOK PROCESSING")
+        print(f"{'='*80}")
+        print(f"📅 Session: {self.session_id}")
+        print(f"📖 Source DOCX: {docx_dir}")
+        print(f"📁 Output Directory: {output_dir}")
+        print(f"{'='*80}\n")
+
+        print("STEP 1: DOCX TEXT EXTRACTION")
+        print(f"{'-'*40}")
+        documents = self.read_docx_files(docx_dir)
+
+        book_text_file = f"{output_dir}/extracted_wellspring_docx_{self.session_id}.txt"
+        self.write_book_text(documents, book_text_file)
+        self.write_sme_chapters(documents, sme_chapters_dir or f"{output_dir}/docx_chapters_{self.session_id}")
+
+        print("\nSTEP 2: COMPREHENSIVE EM DASH PROCESSING")
+        print(f"{'-'*40}")
+        result = await ComprehensiveEmDashProcessor().process_comprehensive(book_text_file, output_dir)
+
+        print("\n🎉 WELLSPRING DOCX PROCESSING COMPLETE!")
+        print(f"   • Total Em Dashes: {result['total_em_dashes']}")
+        print(f"   • Replacements Made: {result['replacements_made']}")
+        return result
+
+
+async def main():
+    """Main execution function."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract the Wellspring DOCX exports for em dash and SME editing")
+    parser.add_argument("--docx-dir", default="../docs/docx", help="Directory of section DOCX files")
+    parser.add_argument("--output-dir", default="../em_dash_replacement/output", help="Output directory")
+    parser.add_argument("--sme-chapters-dir", help="Where to write SME chapter markdown")
+    parser.add_argument("--extract-only", action="store_true", help="Write text and chapters without em dash processing")
+    args = parser.parse_args()
+
+    processor = WellspringDOCXProcessor()
+
+    try:
+        if args.extract_only:
+            documents = processor.read_docx_files(args.docx_dir)
+            processor.write_book_text(documents, f"{args.output_dir}/extracted_wellspring_docx_{processor.session_id}.txt")
+            processor.write_sme_chapters(documents, args.sme_chapters_dir or
+                                         f"{args.output_dir}/docx_chapters_{processor.session_id}")
+        else:
+            await processor.process_entire_book(args.docx_dir, args.output_dir, args.sme_chapters_dir)
+        return 0
+
+    except Exception as e:
+        print(f"❌ Processing failed: {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
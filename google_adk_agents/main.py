@@ -13,16 +13,10 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
-# Import agent framework components
-from agents.em_dash_agents import (
-    ORCHESTRATOR,
-    analyze_file,
-    process_file,
-    create_and_execute_workflow,
-    get_agent_status
-)
-from sessions.session_manager import SESSION_SERVICE
-from config.agent_config import CONFIG
+# Agent framework components pull in the Google ADK/GenAI SDKs, so they are
+# imported inside the commands that need them to keep CLI startup fast
+from sessions.session_manager import get_session_service
+from config.agent_config import get_config
 
 # Setup logging
 logging.basicConfig(
@@ -34,10 +28,16 @@ logger = logging.getLogger(__name__)
 class EmDashCLI:
     """Command-line interface for the Google ADK Em Dash Agent Framework."""
     
-    def __init__(self):
-        """Initialize the CLI."""
-        self.orchestrator = ORCHESTRATOR
-        self.session_service = SESSION_SERVICE
+    @property
+    def orchestrator(self):
+        """Agent orchestrator, built on first use."""
+        from agents.em_dash_agents import get_orchestrator
+        return get_orchestrator()
+    
+    @property
+    def session_service(self):
+        """Session service, built on first use."""
+        return get_session_service()
         
     def create_parser(self) -> argparse.ArgumentParser:
         """Create the argument parser."""
@@ -122,6 +122,8 @@ Examples:
     async def run_analyze(self, args) -> int:
         """Run analysis command."""
         try:
+            from agents.em_dash_agents import analyze_file
+            
             print(f"🔍 Analyzing {len(args.files)} file(s) for em dash patterns...")
             
             configuration = {
@@ -171,6 +173,8 @@ Examples:
     async def run_process(self, args) -> int:
         """Run processing command."""
         try:
+            from agents.em_dash_agents import process_file
+            
             print(f"🔧 Processing {len(args.files)} file(s) for em dash replacement...")
             
             configuration = {
@@ -214,6 +218,8 @@ Examples:
     async def run_workflow(self, args) -> int:
         """Run workflow command."""
         try:
+            from agents.em_dash_agents import create_and_execute_workflow
+            
             print(f"🚀 Executing workflow: {args.name}")
             print(f"  • Input files: {len(args.files)}")
             print(f"  • Output directory: {args.output_dir}")
@@ -255,6 +261,8 @@ Examples:
     def run_status(self, args) -> int:
         """Run status command."""
         try:
+            from agents.em_dash_agents import get_agent_status
+            
             print("📊 Google ADK Em Dash Agent Framework Status")
             print("=" * 60)
             
@@ -365,13 +373,15 @@ Examples:
     def run_config(self, args) -> int:
         """Run config command."""
         try:
+            adk_config = get_config()
+            
             print("⚙️  Google ADK Em Dash Agent Configuration")
             print("=" * 60)
             
             if args.agents:
                 print(f"\n🤖 Agent Configurations:")
                 for agent_name in ['em_dash_analyzer', 'em_dash_processor', 'em_dash_coordinator']:
-                    config = CONFIG.get_agent_config(agent_name)
+                    config = adk_config.get_agent_config(agent_name)
                     print(f"  • {agent_name}:")
                     print(f"    - Model: {config.model}")
                     print(f"    - Temperature: {config.temperature}")
@@ -380,7 +390,7 @@ Examples:
             
             if args.tools:
                 print(f"\n🔧 Tool Configurations:")
-                tool_configs = CONFIG.get_tool_configurations()
+                tool_configs = adk_config.get_tool_configurations()
                 for category, config in tool_configs.items():
                     print(f"  • {category}:")
                     for key, value in config.items():
@@ -388,10 +398,10 @@ Examples:
             
             if not args.agents and not args.tools:
                 print(f"\n📋 General Configuration:")
-                print(f"  • Database Path: {CONFIG.db_path}")
-                print(f"  • Workspace Path: {CONFIG.workspace_path}")
-                print(f"  • Default Model: {CONFIG.default_model}")
-                print(f"  • Alternative Model: {CONFIG.alternative_model}")
+                print(f"  • Database Path: {adk_config.db_path}")
+                print(f"  • Workspace Path: {adk_config.workspace_path}")
+                print(f"  • Default Model: {adk_config.default_model}")
+                print(f"  • Alternative Model: {adk_config.alternative_model}")
             
             return 0
             
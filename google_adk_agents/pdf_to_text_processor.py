@@ -5,16 +5,105 @@ Extracts text from Wellspring Manual PDF and processes with comprehensive em das
 """
 
 import asyncio
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 import pdfplumber
 import PyPDF2
 from datetime import datetime
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent))
 
 from comprehensive_em_dash_processor import ComprehensiveEmDashProcessor
+from shared_utils.pdf_page_cache import PDFPageCache
+
+# Pages handed to each extraction worker at a time
+PAGES_PER_RANGE = 16
+
+# Bump the suffix when page extraction or its metadata changes, so cached pages are re-extracted
+EXTRACTOR_VERSION = f"pdfplumber-{pdfplumber.__version__}/pypdf2-{PyPDF2.__version__}/2"
+
+
+def _pypdf2_page_text(reader: PyPDF2.PdfReader, page_index: int) -> str:
+    """Extract one page with PyPDF2, returning an empty string if it fails too."""
+    try:
+        return reader.pages[page_index].extract_text() or ""
+    except Exception:
+        return ""
+
+
+def _extract_pages(pdf_path: str, page_numbers: List[int]) -> List[Dict[str, Any]]:
+    """
+    Extract a run of pages of a PDF in a worker process.
+    
+    Pages are extracted with pdfplumber; only a page that fails falls back to
+    PyPDF2, which is opened lazily the first time it is needed.
+    
+    Returns:
+        A page record (page_number, text, extractor, layout metadata) per page
+    """
+    pages = []
+    reader = None
+    
+    def fallback(page_number: int) -> Dict[str, Any]:
+        nonlocal reader
+        if reader is None:
+            reader = PyPDF2.PdfReader(pdf_path)
+        text = _pypdf2_page_text(reader, page_number - 1)
+        return {"page_number": page_number, "text": text, "extractor": "pypdf2",
+                "metadata": {"char_count": len(text)}}
+    
+    try:
+        pdf = pdfplumber.open(pdf_path)
+    except Exception:
+        return [fallback(page_number) for page_number in page_numbers]
+    
+    with pdf:
+        for page_number in page_numbers:
+            try:
+                page = pdf.pages[page_number - 1]
+                text = page.extract_text() or ""
+                font_sizes = [char["size"] for char in page.chars]
+                pages.append({
+                    "page_number": page_number,
+                    "text": text,
+                    "extractor": "pdfplumber",
+                    "metadata": {
+                        "width": float(page.width),
+                        "height": float(page.height),
+                        "rotation": page.rotation,
+                        "char_count": len(page.chars),
+                        "fonts": sorted({char["fontname"] for char in page.chars}),
+                        "max_font_size": round(max(font_sizes), 2) if font_sizes else None
+                    }
+                })
+                # Parsed layout objects are only needed for this page
+                page.flush_cache()
+            except Exception:
+                pages.append(fallback(page_number))
+    
+    return pages
+
+
+def _page_runs(page_numbers: List[int], max_length: int) -> List[List[int]]:
+    """Split sorted page numbers into contiguous runs of at most max_length pages."""
+    runs = []
+    for page_number in page_numbers:
+        if runs and runs[-1][-1] == page_number - 1 and len(runs[-1]) < max_length:
+            runs[-1].append(page_number)
+        else:
+            runs.append([page_number])
+    return runs
+
+
+def _format_page(page_num: int, text: str) -> str:
+    """Page text wrapped in the page markers used by the em dash pipeline."""
+    return f"\n--- PAGE {page_num} ---\n\n{text}\n\n--- END PAGE {page_num} ---\n\n"
+
 
 class WellspringPDFProcessor:
     """
@@ -24,64 +113,123 @@ class WellspringPDFProcessor:
     def __init__(self):
         self.processor = ComprehensiveEmDashProcessor()
         self.session_id = f"wellspring_book_processing_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.page_cache = PDFPageCache()
     
-    def extract_text_from_pdf(self, pdf_path: str, output_path: str = None) -> str:
-        """Extract text from PDF using pdfplumber for better formatting."""
+    def extract_text_from_pdf(self, pdf_path: str, output_path: str = None, max_workers: Optional[int] = None,
+                              pages_per_range: int = PAGES_PER_RANGE, use_cache: bool = True) -> str:
+        """
+        Extract text from PDF using pdfplumber for better formatting.
+        
+        Pages already in the extraction cache (same file, or an unchanged
+        page of an earlier revision) are served from it. The remaining pages
+        are extracted in parallel worker processes in page ranges; a page
+        that pdfplumber cannot read falls back to PyPDF2 on its own. Pages are
+        written to the output file in page order as soon as they are ready.
+        
+        Args:
+            pdf_path: PDF to extract
+            output_path: Optional text file to stream the extraction into
+            max_workers: Extraction processes (defaults to the CPU count)
+            pages_per_range: Pages handed to a worker at a time
+            use_cache: Read and update the per-page extraction cache
+            
+        Returns:
+            Extracted text with page markers
+        """
         
         print(f"📖 Extracting text from: {pdf_path}")
         
         try:
-            extracted_text = []
-            page_count = 0
+            if use_cache:
+                lookup = self.page_cache.lookup(str(pdf_path), EXTRACTOR_VERSION)
+            else:
+                with pdfplumber.open(pdf_path) as pdf:
+                    total = len(pdf.pages)
+                lookup = {"file_hash": None, "page_count": total, "pages": {}, "page_hashes": None,
+                          "missing_pages": list(range(1, total + 1))}
+        except Exception as e:
+            print(f"❌ Error opening PDF: {e}")
+            # Fallback to PyPDF2 if the document cannot be read page by page
+            return self._extract_with_pypdf2(pdf_path, output_path)
+        
+        total_pages = lookup["page_count"]
+        cached_pages = lookup["pages"]
+        runs = _page_runs(lookup["missing_pages"], pages_per_range)
+        max_workers = max_workers or os.cpu_count() or 1
+        print(f"📄 Total pages: {total_pages} ({len(cached_pages)} cached, "
+              f"{len(lookup['missing_pages'])} to extract in {len(runs)} ranges on {max_workers} workers)")
+        
+        output_file = None
+        if output_path:
+            output_file = Path(output_path)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        extracted_text = []
+        page_count = 0
+        fallback_pages = []
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+                open(output_file, 'w', encoding='utf-8') if output_file else open(os.devnull, 'w') as out:
+            futures = {run[0]: (run, executor.submit(_extract_pages, str(pdf_path), run)) for run in runs}
             
-            with pdfplumber.open(pdf_path) as pdf:
-                total_pages = len(pdf.pages)
-                print(f"📄 Total pages: {total_pages}")
-                
-                for page_num, page in enumerate(pdf.pages, 1):
-                    print(f"   📃 Processing page {page_num}/{total_pages}", end='\r')
+            # Pages are consumed in order, so later ranges finish in the background
+            page_number = 1
+            while page_number <= total_pages:
+                if page_number in cached_pages:
+                    pages = [cached_pages[page_number]]
+                else:
+                    run, future = futures[page_number]
+                    try:
+                        pages = future.result()
+                    except Exception as e:
+                        print(f"\n⚠️  Worker failed on pages {run[0]}-{run[-1]}: {e}; using PyPDF2")
+                        reader = PyPDF2.PdfReader(pdf_path)
+                        pages = [{"page_number": n, "text": _pypdf2_page_text(reader, n - 1),
+                                  "extractor": "pypdf2", "metadata": {}} for n in run]
                     
-                    # Extract text from page
-                    text = page.extract_text()
-                    if text:
-                        # Add page break marker
-                        extracted_text.append(f"\n--- PAGE {page_num} ---\n")
-                        extracted_text.append(text)
-                        extracted_text.append(f"\n--- END PAGE {page_num} ---\n\n")
-                        page_count += 1
+                    if use_cache:
+                        # PyPDF2 fallback pages are not cached, so a later run retries them with pdfplumber
+                        extracted = [page for page in pages if page["extractor"] == "pdfplumber"]
+                        for page in extracted:
+                            page["page_hash"] = lookup["page_hashes"][page["page_number"] - 1]
+                        self.page_cache.store_pages(lookup["file_hash"], EXTRACTOR_VERSION, extracted,
+                                                    page_count=total_pages, source_path=str(pdf_path))
                 
-                print(f"\n✅ Extracted text from {page_count} pages")
-                
-                # Combine all text
-                full_text = '\n'.join(extracted_text)
-                
-                # Save extracted text if output path provided
-                if output_path:
-                    output_file = Path(output_path)
-                    output_file.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write(full_text)
-                    
-                    print(f"💾 Saved extracted text: {output_file}")
-                
-                # Show extraction statistics
-                em_dash_count = full_text.count('—')
-                char_count = len(full_text)
-                line_count = len(full_text.split('\n'))
-                
-                print(f"📊 Extraction Statistics:")
-                print(f"   • Characters: {char_count:,}")
-                print(f"   • Lines: {line_count:,}")
-                print(f"   • Em dashes found: {em_dash_count}")
-                print(f"   • Pages processed: {page_count}")
-                
-                return full_text
+                for page in pages:
+                    if page["extractor"] != "pdfplumber":
+                        fallback_pages.append(page["page_number"])
+                    if page["text"]:
+                        block = _format_page(page["page_number"], page["text"])
+                        # Blocks are newline-separated, matching a '\n'.join of the page parts
+                        if page_count:
+                            block = "\n" + block
+                        out.write(block)
+                        extracted_text.append(block)
+                        page_count += 1
                 
-        except Exception as e:
-            print(f"❌ Error extracting text from PDF: {e}")
-            # Fallback to PyPDF2 if pdfplumber fails
-            return self._extract_with_pypdf2(pdf_path, output_path)
+                page_number += len(pages)
+                print(f"   📃 Processed pages {page_number - 1}/{total_pages}", end='\r')
+        
+        print(f"\n✅ Extracted text from {page_count} pages")
+        if fallback_pages:
+            print(f"🔄 PyPDF2 fallback used for {len(fallback_pages)} pages: {fallback_pages[:20]}")
+        if output_file:
+            print(f"💾 Saved extracted text: {output_file}")
+        
+        full_text = ''.join(extracted_text)
+        
+        # Show extraction statistics
+        em_dash_count = full_text.count('—')
+        char_count = len(full_text)
+        line_count = len(full_text.split('\n'))
+        
+        print(f"📊 Extraction Statistics:")
+        print(f"   • Characters: {char_count:,}")
+        print(f"   • Lines: {line_count:,}")
+        print(f"   • Em dashes found: {em_dash_count}")
+        print(f"   • Pages processed: {page_count}")
+        
+        return full_text
     
     def _extract_with_pypdf2(self, pdf_path: str, output_path: str = None) -> str:
         """Fallback extraction using PyPDF2."""
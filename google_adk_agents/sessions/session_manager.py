@@ -4,10 +4,12 @@ Session Management for Google ADK Em Dash Agents
 Provides session persistence and state management for agent workflows.
 """
 
+import heapq
 import json
 import sqlite3
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 import logging
@@ -61,25 +63,46 @@ class AgentSession:
             configuration=data['configuration']
         )
 
+DEFAULT_SESSION_CACHE_SIZE = 256
+PROGRESS_STATE_PREFIX = 'progress.'
+
+@dataclass
+class SessionIndexEntry:
+    """Lightweight metadata kept for every live session, hydrated or not."""
+    session_id: str
+    agent_name: str
+    session_type: str
+    status: str
+    created_at: datetime
+    expires_at: datetime
+
 class WellspringSessionService:
-    """Custom session service for Wellspring Google ADK agents."""
+    """Custom session service for Wellspring Google ADK agents.
     
-    def __init__(self, db_path: str = None):
+    Startup only indexes live sessions; ``get_session`` hydrates them on
+    demand into an LRU cache bounded by ``max_cached_sessions``. A heap
+    ordered by ``expires_at`` lets expiry pop only the sessions that are due.
+    """
+    
+    def __init__(self, db_path: str = None, max_cached_sessions: int = DEFAULT_SESSION_CACHE_SIZE):
         """Initialize session service."""
         if db_path is None:
             db_path = Path(__file__).parent.parent.parent / "shared_utils" / "data" / "wellspring.db"
         
         self.db_path = Path(db_path)
-        self.active_sessions: Dict[str, AgentSession] = {}
+        self.max_cached_sessions = max(1, max_cached_sessions)
+        self.active_sessions: 'OrderedDict[str, AgentSession]' = OrderedDict()
+        self.session_index: Dict[str, SessionIndexEntry] = {}
+        self._expiry_heap: List[Tuple[datetime, str]] = []
         self.session_timeout = timedelta(hours=2)  # 2 hour timeout
         
         # Initialize database tables if needed
         self._initialize_session_tables()
         
-        # Load active sessions from database
+        # Index active sessions; full sessions are hydrated on first access
         self._load_active_sessions()
         
-        logger.info(f"WellspringSessionService initialized with {len(self.active_sessions)} active sessions")
+        logger.info(f"WellspringSessionService initialized with {len(self.session_index)} active sessions")
     
     def _initialize_session_tables(self):
         """Initialize session tables in database."""
@@ -129,7 +152,11 @@ class WellspringSessionService:
             logger.error(f"Error initializing session tables: {e}")
     
     def _load_active_sessions(self):
-        """Load active sessions from database."""
+        """Index active sessions from database.
+        
+        Only ids, statuses and the metadata needed for filtering and expiry are
+        read here; the JSON blobs are hydrated on demand by ``get_session``.
+        """
         if not self.db_path.exists():
             return
         
@@ -137,36 +164,26 @@ class WellspringSessionService:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            # Load sessions that haven't expired
+            # Index sessions that haven't expired
             cursor.execute("""
-                SELECT session_id, agent_name, session_type, status, created_at, 
-                       last_activity, input_data, output_data, progress_data, configuration
+                SELECT session_id, agent_name, session_type, status, created_at, last_activity
                 FROM agent_sessions
                 WHERE status IN ('active', 'paused') 
                 AND datetime(expires_at) > datetime('now')
             """)
             
-            rows = cursor.fetchall()
-            
-            for row in rows:
-                session_data = {
-                    'session_id': row[0],
-                    'agent_name': row[1],
-                    'session_type': row[2],
-                    'status': row[3],
-                    'created_at': row[4],
-                    'last_activity': row[5],
-                    'input_data': json.loads(row[6]) if row[6] else {},
-                    'output_data': json.loads(row[7]) if row[7] else {},
-                    'progress_data': json.loads(row[8]) if row[8] else {},
-                    'configuration': json.loads(row[9]) if row[9] else {}
-                }
-                
-                session = AgentSession.from_dict(session_data)
-                self.active_sessions[session.session_id] = session
+            for row in cursor.fetchall():
+                self._index_session_fields(
+                    session_id=row[0],
+                    agent_name=row[1],
+                    session_type=row[2],
+                    status=row[3],
+                    created_at=datetime.fromisoformat(row[4]),
+                    last_activity=datetime.fromisoformat(row[5])
+                )
             
             conn.close()
-            logger.info(f"Loaded {len(self.active_sessions)} active sessions from database")
+            logger.info(f"Indexed {len(self.session_index)} active sessions from database")
             
         except Exception as e:
             logger.error(f"Error loading active sessions: {e}")
@@ -197,7 +214,8 @@ class WellspringSessionService:
             )
             
             # Store in memory
-            self.active_sessions[session_id] = session
+            self._index_session(session)
+            self._cache_session(session)
             
             # Persist to database
             self._persist_session(session)
@@ -211,7 +229,7 @@ class WellspringSessionService:
     
     def get_session(self, session_id: str) -> Optional[AgentSession]:
         """Get an existing session."""
-        session = self.active_sessions.get(session_id)
+        session = self._get_live_session(session_id)
         
         if session:
             # Check if session has expired
@@ -221,7 +239,7 @@ class WellspringSessionService:
             
             # Update last activity
             session.last_activity = datetime.now()
-            self._persist_session(session)
+            self._persist_session_fields(session)
         
         return session
     
@@ -234,7 +252,7 @@ class WellspringSessionService:
     ) -> bool:
         """Update an existing session."""
         try:
-            session = self.active_sessions.get(session_id)
+            session = self._get_live_session(session_id)
             if not session:
                 logger.warning(f"Session not found: {session_id}")
                 return False
@@ -251,8 +269,12 @@ class WellspringSessionService:
             
             session.last_activity = datetime.now()
             
-            # Persist changes
-            self._persist_session(session)
+            # Persist only what changed
+            self._persist_session_fields(
+                session,
+                progress_delta=progress_data,
+                output_changed=bool(output_data)
+            )
             
             logger.debug(f"Updated session {session_id}")
             return True
@@ -264,7 +286,7 @@ class WellspringSessionService:
     def complete_session(self, session_id: str, final_output: Dict[str, Any]) -> bool:
         """Mark a session as completed."""
         try:
-            session = self.active_sessions.get(session_id)
+            session = self._get_live_session(session_id)
             if not session:
                 logger.warning(f"Session not found: {session_id}")
                 return False
@@ -277,7 +299,7 @@ class WellspringSessionService:
             self._persist_session(session)
             
             # Remove from active sessions
-            del self.active_sessions[session_id]
+            self._forget_session(session_id)
             
             logger.info(f"Completed session {session_id}")
             return True
@@ -289,7 +311,7 @@ class WellspringSessionService:
     def fail_session(self, session_id: str, error_message: str) -> bool:
         """Mark a session as failed."""
         try:
-            session = self.active_sessions.get(session_id)
+            session = self._get_live_session(session_id)
             if not session:
                 logger.warning(f"Session not found: {session_id}")
                 return False
@@ -302,7 +324,7 @@ class WellspringSessionService:
             self._persist_session(session)
             
             # Remove from active sessions
-            del self.active_sessions[session_id]
+            self._forget_session(session_id)
             
             logger.info(f"Failed session {session_id}: {error_message}")
             return True
@@ -314,7 +336,7 @@ class WellspringSessionService:
     def pause_session(self, session_id: str) -> bool:
         """Pause a session."""
         try:
-            session = self.active_sessions.get(session_id)
+            session = self._get_live_session(session_id)
             if not session:
                 logger.warning(f"Session not found: {session_id}")
                 return False
@@ -322,7 +344,7 @@ class WellspringSessionService:
             session.status = 'paused'
             session.last_activity = datetime.now()
             
-            self._persist_session(session)
+            self._persist_session_fields(session)
             
             logger.info(f"Paused session {session_id}")
             return True
@@ -334,7 +356,7 @@ class WellspringSessionService:
     def resume_session(self, session_id: str) -> bool:
         """Resume a paused session."""
         try:
-            session = self.active_sessions.get(session_id)
+            session = self._get_live_session(session_id)
             if not session:
                 logger.warning(f"Session not found: {session_id}")
                 return False
@@ -346,7 +368,7 @@ class WellspringSessionService:
             session.status = 'active'
             session.last_activity = datetime.now()
             
-            self._persist_session(session)
+            self._persist_session_fields(session)
             
             logger.info(f"Resumed session {session_id}")
             return True
@@ -362,16 +384,23 @@ class WellspringSessionService:
         status: Optional[str] = None
     ) -> List[AgentSession]:
         """List sessions with optional filtering."""
-        sessions = list(self.active_sessions.values())
+        entries = list(self.session_index.values())
         
         if agent_name:
-            sessions = [s for s in sessions if s.agent_name == agent_name]
+            entries = [e for e in entries if e.agent_name == agent_name]
         
         if session_type:
-            sessions = [s for s in sessions if s.session_type == session_type]
+            entries = [e for e in entries if e.session_type == session_type]
         
         if status:
-            sessions = [s for s in sessions if s.status == status]
+            entries = [e for e in entries if e.status == status]
+        
+        # Only the sessions that survived filtering are hydrated
+        sessions = []
+        for entry in entries:
+            session = self._get_live_session(entry.session_id)
+            if session:
+                sessions.append(session)
         
         return sessions
     
@@ -381,12 +410,14 @@ class WellspringSessionService:
             expired_count = 0
             now = datetime.now()
             
-            expired_session_ids = []
-            for session_id, session in self.active_sessions.items():
-                if now - session.last_activity > self.session_timeout:
-                    expired_session_ids.append(session_id)
-            
-            for session_id in expired_session_ids:
+            # Pop only the sessions whose deadline has passed; entries that were
+            # superseded by later activity no longer match the index and are skipped
+            while self._expiry_heap and self._expiry_heap[0][0] < now:
+                expires_at, session_id = heapq.heappop(self._expiry_heap)
+                entry = self.session_index.get(session_id)
+                if entry is None or entry.expires_at != expires_at:
+                    continue
+                
                 self._expire_session(session_id)
                 expired_count += 1
             
@@ -401,7 +432,8 @@ class WellspringSessionService:
         """Get session statistics."""
         try:
             stats = {
-                'active_sessions': len(self.active_sessions),
+                'active_sessions': len(self.session_index),
+                'cached_sessions': len(self.active_sessions),
                 'by_agent': {},
                 'by_type': {},
                 'by_status': {},
@@ -409,27 +441,18 @@ class WellspringSessionService:
                 'newest_session': None
             }
             
-            if self.active_sessions:
-                sessions = list(self.active_sessions.values())
-                
-                # Group by agent
-                for session in sessions:
-                    agent = session.agent_name
-                    stats['by_agent'][agent] = stats['by_agent'].get(agent, 0) + 1
+            if self.session_index:
+                entries = list(self.session_index.values())
                 
-                # Group by type
-                for session in sessions:
-                    session_type = session.session_type
-                    stats['by_type'][session_type] = stats['by_type'].get(session_type, 0) + 1
-                
-                # Group by status
-                for session in sessions:
-                    status = session.status
-                    stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
+                # Group by agent, type and status
+                for entry in entries:
+                    stats['by_agent'][entry.agent_name] = stats['by_agent'].get(entry.agent_name, 0) + 1
+                    stats['by_type'][entry.session_type] = stats['by_type'].get(entry.session_type, 0) + 1
+                    stats['by_status'][entry.status] = stats['by_status'].get(entry.status, 0) + 1
                 
                 # Find oldest and newest
-                oldest = min(sessions, key=lambda s: s.created_at)
-                newest = max(sessions, key=lambda s: s.created_at)
+                oldest = min(entries, key=lambda e: e.created_at)
+                newest = max(entries, key=lambda e: e.created_at)
                 
                 stats['oldest_session'] = {
                     'session_id': oldest.session_id,
@@ -449,8 +472,134 @@ class WellspringSessionService:
             logger.error(f"Error getting session statistics: {e}")
             return {}
     
+    def _get_live_session(self, session_id: str) -> Optional[AgentSession]:
+        """Return a live session from the cache, hydrating it from the database on a miss."""
+        session = self.active_sessions.get(session_id)
+        if session:
+            self.active_sessions.move_to_end(session_id)
+            return session
+        
+        session = self._hydrate_session(session_id)
+        if session:
+            if session_id not in self.session_index:
+                self._index_session(session)
+            self._cache_session(session)
+        
+        return session
+    
+    def _hydrate_session(self, session_id: str) -> Optional[AgentSession]:
+        """Load a single live session row, with its progress state, from the database."""
+        if not self.db_path.exists():
+            return None
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT session_id, agent_name, session_type, status, created_at, 
+                       last_activity, input_data, output_data, progress_data, configuration
+                FROM agent_sessions
+                WHERE session_id = ? AND status IN ('active', 'paused')
+            """, (session_id,))
+            
+            row = cursor.fetchone()
+            session = None
+            if row:
+                progress_state = self._fetch_progress_state(cursor, session_id)
+                session = self._session_from_row(row, progress_state)
+            
+            conn.close()
+            return session
+            
+        except Exception as e:
+            logger.error(f"Error hydrating session {session_id}: {e}")
+            return None
+    
+    def _fetch_progress_state(self, cursor, session_id: str) -> Dict[str, Any]:
+        """Fetch the incremental progress fields stored in session_state for a session."""
+        cursor.execute(
+            "SELECT state_key, state_value FROM session_state WHERE session_id = ? AND state_key LIKE ?",
+            (session_id, PROGRESS_STATE_PREFIX + '%')
+        )
+        
+        return {
+            state_key[len(PROGRESS_STATE_PREFIX):]: json.loads(state_value)
+            for state_key, state_value in cursor.fetchall()
+        }
+    
+    def _session_from_row(self, row: tuple, progress_state: Optional[Dict[str, Any]] = None) -> AgentSession:
+        """Build a session from an agent_sessions row plus any incremental progress fields."""
+        progress_data = json.loads(row[8]) if row[8] else {}
+        if progress_state:
+            progress_data.update(progress_state)
+        
+        return AgentSession.from_dict({
+            'session_id': row[0],
+            'agent_name': row[1],
+            'session_type': row[2],
+            'status': row[3],
+            'created_at': row[4],
+            'last_activity': row[5],
+            'input_data': json.loads(row[6]) if row[6] else {},
+            'output_data': json.loads(row[7]) if row[7] else {},
+            'progress_data': progress_data,
+            'configuration': json.loads(row[9]) if row[9] else {}
+        })
+    
+    def _cache_session(self, session: AgentSession):
+        """Insert a session into the LRU cache, evicting the least recently used ones."""
+        self.active_sessions[session.session_id] = session
+        self.active_sessions.move_to_end(session.session_id)
+        
+        # Every mutation is persisted, so eviction only drops the in-memory copy
+        while len(self.active_sessions) > self.max_cached_sessions:
+            self.active_sessions.popitem(last=False)
+    
+    def _index_session(self, session: AgentSession):
+        """Record session metadata and schedule its expiry."""
+        self._index_session_fields(
+            session_id=session.session_id,
+            agent_name=session.agent_name,
+            session_type=session.session_type,
+            status=session.status,
+            created_at=session.created_at,
+            last_activity=session.last_activity
+        )
+    
+    def _index_session_fields(
+        self,
+        session_id: str,
+        agent_name: str,
+        session_type: str,
+        status: str,
+        created_at: datetime,
+        last_activity: datetime
+    ):
+        """Record session metadata without needing a hydrated session."""
+        expires_at = last_activity + self.session_timeout
+        self.session_index[session_id] = SessionIndexEntry(
+            session_id=session_id,
+            agent_name=agent_name,
+            session_type=session_type,
+            status=status,
+            created_at=created_at,
+            expires_at=expires_at
+        )
+        heapq.heappush(self._expiry_heap, (expires_at, session_id))
+        
+        # Superseded heap entries are skipped lazily; rebuild once they dominate
+        if len(self._expiry_heap) > 2 * len(self.session_index) + 64:
+            self._expiry_heap = [(e.expires_at, e.session_id) for e in self.session_index.values()]
+            heapq.heapify(self._expiry_heap)
+    
+    def _forget_session(self, session_id: str):
+        """Drop a session from the cache and index; its heap entry goes stale."""
+        self.active_sessions.pop(session_id, None)
+        self.session_index.pop(session_id, None)
+    
     def _persist_session(self, session: AgentSession):
-        """Persist session to database."""
+        """Persist the full session row to database."""
         if not self.db_path.exists():
             return
         
@@ -479,53 +628,150 @@ class WellspringSessionService:
                 expires_at.isoformat()
             ))
             
+            # Progress is now folded into the row, so incremental fields are redundant
+            cursor.execute(
+                "DELETE FROM session_state WHERE session_id = ? AND state_key LIKE ?",
+                (session.session_id, PROGRESS_STATE_PREFIX + '%')
+            )
+            
             conn.commit()
             conn.close()
             
         except Exception as e:
             logger.error(f"Error persisting session: {e}")
     
+    def _persist_session_fields(
+        self,
+        session: AgentSession,
+        progress_delta: Optional[Dict[str, Any]] = None,
+        output_changed: bool = False
+    ):
+        """Persist status, activity and only the changed fields of a session.
+        
+        Progress keys go to the ``session_state`` key/value table; the input
+        and configuration blobs are never rewritten here.
+        """
+        entry = self.session_index.get(session.session_id)
+        expires_at = session.last_activity + self.session_timeout
+        if entry:
+            entry.status = session.status
+            if entry.expires_at != expires_at:
+                entry.expires_at = expires_at
+                heapq.heappush(self._expiry_heap, (expires_at, session.session_id))
+        
+        if not self.db_path.exists():
+            return
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            if output_changed:
+                cursor.execute("""
+                    UPDATE agent_sessions
+                    SET status = ?, last_activity = ?, expires_at = ?, output_data = ?
+                    WHERE session_id = ?
+                """, (
+                    session.status,
+                    session.last_activity.isoformat(),
+                    expires_at.isoformat(),
+                    json.dumps(session.output_data),
+                    session.session_id
+                ))
+            else:
+                cursor.execute("""
+                    UPDATE agent_sessions
+                    SET status = ?, last_activity = ?, expires_at = ?
+                    WHERE session_id = ?
+                """, (
+                    session.status,
+                    session.last_activity.isoformat(),
+                    expires_at.isoformat(),
+                    session.session_id
+                ))
+            
+            if progress_delta:
+                updated_at = session.last_activity.isoformat()
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO session_state
+                    (session_id, state_key, state_value, updated_at)
+                    VALUES (?, ?, ?, ?)
+                """, [
+                    (session.session_id, PROGRESS_STATE_PREFIX + key, json.dumps(value), updated_at)
+                    for key, value in progress_delta.items()
+                ])
+            
+            conn.commit()
+            conn.close()
+            
+        except Exception as e:
+            logger.error(f"Error persisting session fields: {e}")
+    
     def _expire_session(self, session_id: str):
         """Expire a session."""
         try:
-            if session_id in self.active_sessions:
-                session = self.active_sessions[session_id]
-                session.status = 'expired'
-                self._persist_session(session)
-                del self.active_sessions[session_id]
+            if session_id in self.session_index:
+                session = self.active_sessions.get(session_id)
+                if session:
+                    session.status = 'expired'
+                
+                # Only the status changes, so the blobs are left untouched
+                if self.db_path.exists():
+                    conn = sqlite3.connect(self.db_path)
+                    conn.execute(
+                        "UPDATE agent_sessions SET status = 'expired' WHERE session_id = ?",
+                        (session_id,)
+                    )
+                    conn.commit()
+                    conn.close()
+                
+                self._forget_session(session_id)
                 
                 logger.info(f"Expired session {session_id}")
         
         except Exception as e:
             logger.error(f"Error expiring session: {e}")
 
-# Global session service instance
-SESSION_SERVICE = WellspringSessionService()
+# Global session service instance, built on first use
+_SESSION_SERVICE: Optional[WellspringSessionService] = None
+
+def get_session_service() -> WellspringSessionService:
+    """Get the shared session service instance."""
+    global _SESSION_SERVICE
+    if _SESSION_SERVICE is None:
+        _SESSION_SERVICE = WellspringSessionService()
+    return _SESSION_SERVICE
+
+def __getattr__(name: str) -> Any:
+    """Resolve ``SESSION_SERVICE`` lazily so importing this module stays cheap."""
+    if name == "SESSION_SERVICE":
+        return get_session_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Convenience functions
 def create_analysis_session(session_id: str, input_data: Dict[str, Any]) -> AgentSession:
     """Create an analysis session."""
-    return SESSION_SERVICE.create_session(session_id, "em_dash_analyzer", "analysis", input_data)
+    return get_session_service().create_session(session_id, "em_dash_analyzer", "analysis", input_data)
 
 def create_processing_session(session_id: str, input_data: Dict[str, Any]) -> AgentSession:
     """Create a processing session."""
-    return SESSION_SERVICE.create_session(session_id, "em_dash_processor", "processing", input_data)
+    return get_session_service().create_session(session_id, "em_dash_processor", "processing", input_data)
 
 def create_workflow_session(session_id: str, input_data: Dict[str, Any]) -> AgentSession:
     """Create a workflow session."""
-    return SESSION_SERVICE.create_session(session_id, "em_dash_coordinator", "workflow", input_data)
+    return get_session_service().create_session(session_id, "em_dash_coordinator", "workflow", input_data)
 
 def get_session_by_id(session_id: str) -> Optional[AgentSession]:
     """Get session by ID."""
-    return SESSION_SERVICE.get_session(session_id)
+    return get_session_service().get_session(session_id)
 
 def update_session_progress(session_id: str, progress_data: Dict[str, Any]) -> bool:
     """Update session progress."""
-    return SESSION_SERVICE.update_session(session_id, progress_data=progress_data)
+    return get_session_service().update_session(session_id, progress_data=progress_data)
 
 def complete_session_with_results(session_id: str, results: Dict[str, Any]) -> bool:
     """Complete session with results."""
-    return SESSION_SERVICE.complete_session(session_id, results)
+    return get_session_service().complete_session(session_id, results)
 
 if __name__ == "__main__":
     # Demo session management
@@ -533,7 +779,7 @@ if __name__ == "__main__":
     print("=" * 50)
     
     # Get statistics
-    stats = SESSION_SERVICE.get_session_statistics()
+    stats = get_session_service().get_session_statistics()
     print(f"\n📊 Session Statistics:")
     print(f"  • Active sessions: {stats['active_sessions']}")
     print(f"  • By agent: {stats['by_agent']}")
@@ -12,7 +12,7 @@ from google.adk.agents import Agent
 
 # Configure Google AI
 from config.agent_config import CONFIG
-genai.configure(api_key=CONFIG.google_api_key)
+genai.configure(api_key=CONFIG.require_google_api_key())
 
 def read_test_file():
     """Read our test em dash file."""
@@ -7,10 +7,11 @@ Provides specialized tools for the em_dash_coordinator agent.
 import json
 import sqlite3
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Union, Callable
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import logging
 
@@ -18,6 +19,16 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Minimum seconds between progress writes to the database for a running workflow
+PROGRESS_DB_MIN_INTERVAL = 5.0
+
+# Upper bound on concurrent workflow tasks when ``max_parallel_tasks`` is not
+# configured; below it the pool gets one slot per input file
+DEFAULT_MAX_PARALLEL_TASKS = 32
+
+# WorkflowTask fields whose changes are reported to the owning workflow's index
+_TRACKED_TASK_FIELDS = frozenset({'status', 'started_at', 'completed_at', 'retry_count'})
+
 class WorkflowStatus(Enum):
     PENDING = "pending"
     RUNNING = "running" 
@@ -49,6 +60,21 @@ class WorkflowTask:
     error_message: Optional[str] = None
     retry_count: int = 0
     max_retries: int = 3
+    _change_listener: Optional[Callable[['WorkflowTask', str, Any, Any], None]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def __setattr__(self, name: str, value: Any):
+        """Report tracked field changes so workflow counters stay current."""
+        listener = self.__dict__.get('_change_listener')
+        if listener is None or name not in _TRACKED_TASK_FIELDS:
+            object.__setattr__(self, name, value)
+            return
+        
+        old_value = self.__dict__.get(name)
+        object.__setattr__(self, name, value)
+        if old_value != value:
+            listener(self, name, old_value, value)
 
 @dataclass
 class QualityGate:
@@ -77,6 +103,116 @@ class EmDashWorkflow:
     completed_at: Optional[datetime] = None
     progress_percentage: float = 0.0
     current_step: Optional[str] = None
+    progress_index: 'WorkflowProgressIndex' = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.progress_index = WorkflowProgressIndex(self.tasks, self.quality_gates)
+
+class WorkflowProgressIndex:
+    """Running task counters and status index for an EmDashWorkflow.
+    
+    Every task status, timing and retry change is applied here in O(1), so
+    progress polling, quality gate checks and metrics never rescan the tasks.
+    """
+    
+    def __init__(self, tasks: List[WorkflowTask], quality_gates: List[QualityGate]):
+        self.tasks_by_id: Dict[str, WorkflowTask] = {}
+        self.tasks_by_status: Dict[TaskStatus, Dict[str, WorkflowTask]] = {status: {} for status in TaskStatus}
+        self.status_counts: Dict[TaskStatus, int] = {status: 0 for status in TaskStatus}
+        self.total_retries = 0
+        self.timed_duration_total = 0.0
+        self.completed_duration_total = 0.0
+        self.completed_timed_count = 0
+        self.gate_remaining: Dict[str, int] = {}
+        self.version = 0
+        
+        # Cached progress snapshot and database throttling state
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.snapshot_key: Optional[tuple] = None
+        self.persisted_key: Optional[tuple] = None
+        self.last_persisted_at: Optional[datetime] = None
+        
+        self._durations: Dict[str, float] = {}
+        self._gates_by_task: Dict[str, List[str]] = {}
+        
+        for gate in quality_gates:
+            required_task_ids = set(gate.required_tasks)
+            self.gate_remaining[gate.gate_id] = len(required_task_ids)
+            for task_id in required_task_ids:
+                self._gates_by_task.setdefault(task_id, []).append(gate.gate_id)
+        
+        for task in tasks:
+            self.add_task(task)
+    
+    @property
+    def timed_task_count(self) -> int:
+        """Number of tasks with both a start and a completion time."""
+        return len(self._durations)
+    
+    def add_task(self, task: WorkflowTask):
+        """Start tracking a task."""
+        self.tasks_by_id[task.task_id] = task
+        self._enter_status(task, task.status)
+        self.total_retries += task.retry_count
+        self._update_duration(task)
+        task._change_listener = self.on_task_change
+        self.version += 1
+    
+    def on_task_change(self, task: WorkflowTask, name: str, old_value: Any, new_value: Any):
+        """Apply a single task field change to the counters."""
+        if name == 'status':
+            self._leave_status(task, old_value)
+            self._enter_status(task, new_value)
+        elif name == 'retry_count':
+            self.total_retries += (new_value or 0) - (old_value or 0)
+        else:
+            self._update_duration(task)
+        
+        self.version += 1
+    
+    def first_task_with_status(self, status: TaskStatus) -> Optional[WorkflowTask]:
+        """Return the task that entered ``status`` earliest, if any."""
+        return next(iter(self.tasks_by_status[status].values()), None)
+    
+    def _enter_status(self, task: WorkflowTask, status: TaskStatus):
+        self.status_counts[status] += 1
+        self.tasks_by_status[status][task.task_id] = task
+        
+        if status == TaskStatus.COMPLETED:
+            duration = self._durations.get(task.task_id)
+            if duration is not None:
+                self.completed_duration_total += duration
+                self.completed_timed_count += 1
+            for gate_id in self._gates_by_task.get(task.task_id, ()):
+                self.gate_remaining[gate_id] -= 1
+    
+    def _leave_status(self, task: WorkflowTask, status: TaskStatus):
+        self.status_counts[status] -= 1
+        self.tasks_by_status[status].pop(task.task_id, None)
+        
+        if status == TaskStatus.COMPLETED:
+            duration = self._durations.get(task.task_id)
+            if duration is not None:
+                self.completed_duration_total -= duration
+                self.completed_timed_count -= 1
+            for gate_id in self._gates_by_task.get(task.task_id, ()):
+                self.gate_remaining[gate_id] += 1
+    
+    def _update_duration(self, task: WorkflowTask):
+        old_duration = self._durations.pop(task.task_id, None)
+        if old_duration is not None:
+            self.timed_duration_total -= old_duration
+            if task.status == TaskStatus.COMPLETED:
+                self.completed_duration_total -= old_duration
+                self.completed_timed_count -= 1
+        
+        if task.started_at and task.completed_at:
+            duration = (task.completed_at - task.started_at).total_seconds()
+            self._durations[task.task_id] = duration
+            self.timed_duration_total += duration
+            if task.status == TaskStatus.COMPLETED:
+                self.completed_duration_total += duration
+                self.completed_timed_count += 1
 
 class WorkflowCoordinationTools:
     """Tool implementations for workflow coordination."""
@@ -114,6 +250,7 @@ def create_workflow(
             'dry_run_first': True,
             'backup_enabled': True,
             'parallel_processing': True,
+            'max_parallel_tasks': None,
             'quality_gates_enabled': True,
             'manual_approval_required': False
         }
@@ -125,7 +262,7 @@ def create_workflow(
         tasks = _create_workflow_tasks(workflow_id, input_files, output_directory, default_config)
         
         # Create quality gates
-        quality_gates = _create_quality_gates(workflow_id, default_config)
+        quality_gates = _create_quality_gates(workflow_id, len(input_files), default_config)
         
         workflow = EmDashWorkflow(
             workflow_id=workflow_id,
@@ -146,16 +283,31 @@ def create_workflow(
         logger.error(f"Error creating workflow: {e}")
         raise
 
-def coordinate_agents(
+async def coordinate_agents(
     workflow: EmDashWorkflow,
-    agent_communications: Optional[Dict[str, Any]] = None
+    agent_communications: Optional[Dict[str, Any]] = None,
+    dispatch: bool = False,
+    task_executor: Optional[Callable[[WorkflowTask], Any]] = None
 ) -> Dict[str, Any]:
     """
     Coordinate communication between agents in the workflow.
     
+    With ``dispatch`` set, independent per-file task chains (analysis, dry
+    run, processing) are executed concurrently before reporting status. The
+    pool has ``max_parallel_tasks`` slots, defaulting to one per input file
+    (capped at DEFAULT_MAX_PARALLEL_TASKS), so wall time is roughly
+    ceil(files / slots) times the slowest file; with ``parallel_processing``
+    off files run one at a time. Each completed task is checked against the
+    quality gates that list it, and a failing gate stops the rest of that
+    file's chain.
+    
     Args:
         workflow: Workflow to coordinate
         agent_communications: Optional agent communication data
+        dispatch: Whether to execute runnable tasks (this writes output files
+            via apply_replacements) before reporting status; off by default
+        task_executor: Optional callable (sync or async) that runs a single task
+            and returns its result dict; defaults to the em dash tool functions
         
     Returns:
         Dict containing coordination results
@@ -169,6 +321,11 @@ def coordinate_agents(
             'coordination_actions': []
         }
         
+        if dispatch and workflow.status in (WorkflowStatus.PENDING, WorkflowStatus.RUNNING):
+            coordination_result['dispatch'] = await _dispatch_workflow_tasks(
+                workflow, task_executor or _execute_workflow_task
+            )
+        
         # Check status of each agent's tasks
         for task in workflow.tasks:
             agent_name = task.agent_name
@@ -183,7 +340,7 @@ def coordinate_agents(
             task_info = {
                 'task_id': task.task_id,
                 'status': task.status.value,
-                'dependencies_met': _check_dependencies_met(task, workflow.tasks)
+                'dependencies_met': _check_dependencies_met(task, workflow)
             }
             
             coordination_result['agent_status'][agent_name]['assigned_tasks'].append(task_info)
@@ -225,21 +382,35 @@ def track_progress(
         Dict containing progress information
     """
     try:
-        # Calculate overall progress
+        index = workflow.progress_index
+        snapshot_key = (index.version, workflow.status)
+        
+        # Nothing changed since the last poll, so only the time-dependent fields are recomputed
+        if index.snapshot is not None and index.snapshot_key == snapshot_key:
+            progress_info = {
+                **index.snapshot,
+                'estimated_completion': _calculate_estimated_completion(workflow),
+                'last_updated': datetime.now().isoformat()
+            }
+            if update_database:
+                _maybe_update_workflow_progress_in_db(workflow, progress_info, snapshot_key)
+            logger.debug(f"Progress unchanged for workflow {workflow.workflow_id}")
+            return progress_info
+        
+        # Calculate overall progress from running counters
         total_tasks = len(workflow.tasks)
-        completed_tasks = sum(1 for task in workflow.tasks if task.status == TaskStatus.COMPLETED)
-        failed_tasks = sum(1 for task in workflow.tasks if task.status == TaskStatus.FAILED)
-        running_tasks = sum(1 for task in workflow.tasks if task.status == TaskStatus.RUNNING)
+        completed_tasks = index.status_counts[TaskStatus.COMPLETED]
+        failed_tasks = index.status_counts[TaskStatus.FAILED]
+        running_tasks = index.status_counts[TaskStatus.RUNNING]
         
         progress_percentage = (completed_tasks / max(total_tasks, 1)) * 100
         workflow.progress_percentage = progress_percentage
         
         # Determine current step
         current_step = None
-        for task in workflow.tasks:
-            if task.status == TaskStatus.RUNNING:
-                current_step = task.task_name
-                break
+        running_task = index.first_task_with_status(TaskStatus.RUNNING)
+        if running_task:
+            current_step = running_task.task_name
         
         if not current_step and running_tasks == 0:
             if completed_tasks == total_tasks:
@@ -268,12 +439,16 @@ def track_progress(
             },
             'estimated_completion': estimated_completion,
             'quality_gates_status': _check_quality_gates_status(workflow),
+            'snapshot_version': index.version,
             'last_updated': datetime.now().isoformat()
         }
         
+        index.snapshot = progress_info
+        index.snapshot_key = snapshot_key
+        
         # Update database if requested
         if update_database:
-            _update_workflow_progress_in_db(workflow, progress_info)
+            _maybe_update_workflow_progress_in_db(workflow, progress_info, snapshot_key)
         
         logger.info(f"Progress tracked for workflow {workflow.workflow_id}: {progress_percentage:.1f}%")
         return progress_info
@@ -372,7 +547,7 @@ def generate_workflow_report(
         if workflow.started_at and workflow.completed_at:
             total_duration = (workflow.completed_at - workflow.started_at).total_seconds()
         
-        task_metrics = _calculate_task_metrics(workflow.tasks)
+        task_metrics = _calculate_task_metrics(workflow)
         quality_metrics = _calculate_quality_metrics(workflow)
         
         report = {
@@ -495,6 +670,47 @@ def manage_approvals(
         logger.error(f"Error managing approvals: {e}")
         raise
 
+def update_task_status(
+    workflow: EmDashWorkflow,
+    task_id: str,
+    status: TaskStatus,
+    result: Optional[Dict[str, Any]] = None,
+    error_message: Optional[str] = None
+) -> WorkflowTask:
+    """
+    Transition a workflow task to a new status.
+    
+    Args:
+        workflow: Workflow that owns the task
+        task_id: Task to update
+        status: New task status
+        result: Optional task result (for completed tasks)
+        error_message: Optional error message (for failed tasks)
+        
+    Returns:
+        WorkflowTask: The updated task
+    """
+    task = workflow.progress_index.tasks_by_id.get(task_id)
+    if task is None:
+        raise ValueError(f"Unknown task: {task_id}")
+    
+    now = datetime.now()
+    if status == TaskStatus.RUNNING:
+        if task.status == TaskStatus.FAILED:
+            task.retry_count += 1
+        task.completed_at = None
+        task.started_at = now
+    elif status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+        task.completed_at = now
+    
+    if result is not None:
+        task.result = result
+    if error_message is not None:
+        task.error_message = error_message
+    
+    task.status = status
+    return task
+
 # Helper functions
 def _create_workflow_tasks(
     workflow_id: str,
@@ -558,7 +774,11 @@ def _create_workflow_tasks(
     
     return tasks
 
-def _create_quality_gates(workflow_id: str, configuration: Dict[str, Any]) -> List[QualityGate]:
+def _create_quality_gates(
+    workflow_id: str,
+    file_count: int,
+    configuration: Dict[str, Any]
+) -> List[QualityGate]:
     """Create quality gates for the workflow."""
     gates = []
     
@@ -572,7 +792,7 @@ def _create_quality_gates(workflow_id: str, configuration: Dict[str, Any]) -> Li
                 'max_manual_review_ratio': 0.3,
                 'min_pattern_coverage': 0.8
             },
-            required_tasks=[task_id for task_id in [f"{workflow_id}_analyze_{i}" for i in range(10)] if task_id],
+            required_tasks=[f"{workflow_id}_analyze_{i}" for i in range(file_count)],
             approval_required=configuration.get('manual_approval_required', False),
             auto_approve_threshold=0.85
         ))
@@ -586,32 +806,197 @@ def _create_quality_gates(workflow_id: str, configuration: Dict[str, Any]) -> Li
                 'max_error_rate': 0.05,
                 'processing_time_limit': 300
             },
-            required_tasks=[task_id for task_id in [f"{workflow_id}_process_{i}" for i in range(10)] if task_id],
+            required_tasks=[f"{workflow_id}_process_{i}" for i in range(file_count)],
             approval_required=False,
             auto_approve_threshold=0.9
         ))
     
     return gates
 
-def _check_dependencies_met(task: WorkflowTask, all_tasks: List[WorkflowTask]) -> bool:
+def _check_dependencies_met(task: WorkflowTask, workflow: EmDashWorkflow) -> bool:
     """Check if task dependencies are met."""
     if not task.dependencies:
         return True
     
-    task_status_map = {t.task_id: t.status for t in all_tasks}
+    tasks_by_id = workflow.progress_index.tasks_by_id
     
     for dep_id in task.dependencies:
-        if dep_id not in task_status_map or task_status_map[dep_id] != TaskStatus.COMPLETED:
+        dep_task = tasks_by_id.get(dep_id)
+        if dep_task is None or dep_task.status != TaskStatus.COMPLETED:
             return False
     
     return True
 
+async def _dispatch_workflow_tasks(
+    workflow: EmDashWorkflow,
+    task_executor: Callable[[WorkflowTask], Any]
+) -> Dict[str, Any]:
+    """Run each input file's task chain concurrently under a bounded semaphore."""
+    # Tasks for the same file depend on each other; different files do not
+    chains: Dict[str, List[WorkflowTask]] = {}
+    for task in workflow.tasks:
+        file_key = task.input_data.get('file_path') or task.input_data.get('input_file') or task.task_id
+        chains.setdefault(file_key, []).append(task)
+    
+    configuration = workflow.configuration
+    if not configuration.get('parallel_processing', True):
+        max_parallel = 1
+    elif configuration.get('max_parallel_tasks'):
+        max_parallel = max(1, int(configuration['max_parallel_tasks']))
+    else:
+        max_parallel = max(1, min(len(chains), DEFAULT_MAX_PARALLEL_TASKS))
+    
+    semaphore = asyncio.Semaphore(max_parallel)
+    # Sync executors get their own pool so the default one (sized by CPU count)
+    # does not cap concurrency below max_parallel
+    thread_pool = ThreadPoolExecutor(max_workers=max_parallel)
+    gates_by_task: Dict[str, List[QualityGate]] = {}
+    for gate in workflow.quality_gates:
+        for task_id in gate.required_tasks:
+            gates_by_task.setdefault(task_id, []).append(gate)
+    validated_gates: Dict[str, Dict[str, Any]] = {}
+    file_results: Dict[str, Dict[str, Any]] = {}
+    
+    if workflow.status == WorkflowStatus.PENDING:
+        workflow.status = WorkflowStatus.RUNNING
+        workflow.started_at = datetime.now()
+    
+    async def run_chain(file_key: str, chain: List[WorkflowTask]):
+        gate_failures = []
+        for task in chain:
+            if task.status in (TaskStatus.COMPLETED, TaskStatus.SKIPPED):
+                continue
+            if gate_failures or not _check_dependencies_met(task, workflow):
+                task.status = TaskStatus.SKIPPED
+                continue
+            
+            async with semaphore:
+                await _run_task_with_retries(workflow, task, task_executor, thread_pool)
+            
+            # Gate this file on the task's own results before moving on
+            if task.status == TaskStatus.COMPLETED:
+                for gate in gates_by_task.get(task.task_id, []):
+                    gate_result = _validate_single_quality_gate(gate, workflow, [task])
+                    if not gate_result['passed']:
+                        logger.warning(f"{gate.gate_name} failed for {file_key}; stopping its remaining tasks")
+                        gate_failures.append({
+                            'gate_id': gate.gate_id,
+                            'task_id': task.task_id,
+                            'score': gate_result['score'],
+                            'issues': gate_result['issues']
+                        })
+        
+        file_results[file_key] = {
+            'tasks': {task.task_id: task.status.value for task in chain},
+            'completed_at': datetime.now().isoformat()
+        }
+        if gate_failures:
+            file_results[file_key]['gate_failures'] = gate_failures
+        
+        # Validate any gate whose required tasks are now all complete
+        for gate_id, gate_state in _check_quality_gates_status(workflow).items():
+            if gate_state == "ready_for_validation" and gate_id not in validated_gates:
+                validated_gates[gate_id] = validate_quality_gates(workflow, gate_id)
+                file_results[file_key].setdefault('gates_validated', []).append(gate_id)
+    
+    started = datetime.now()
+    try:
+        await asyncio.gather(*(run_chain(file_key, chain) for file_key, chain in chains.items()))
+    finally:
+        thread_pool.shutdown(wait=False)
+    
+    index = workflow.progress_index
+    gate_stopped = any('gate_failures' in result for result in file_results.values())
+    if index.status_counts[TaskStatus.FAILED] or gate_stopped:
+        workflow.status = WorkflowStatus.FAILED
+    elif index.status_counts[TaskStatus.WAITING] == 0 and index.status_counts[TaskStatus.RUNNING] == 0:
+        workflow.status = WorkflowStatus.COMPLETED
+    if workflow.status in (WorkflowStatus.COMPLETED, WorkflowStatus.FAILED):
+        workflow.completed_at = datetime.now()
+    
+    return {
+        'max_parallel_tasks': max_parallel,
+        'files_dispatched': len(chains),
+        'elapsed_seconds': (datetime.now() - started).total_seconds(),
+        'file_results': file_results,
+        'quality_gate_results': validated_gates
+    }
+
+async def _run_task_with_retries(
+    workflow: EmDashWorkflow,
+    task: WorkflowTask,
+    task_executor: Callable[[WorkflowTask], Any],
+    thread_pool: Optional[ThreadPoolExecutor] = None
+):
+    """Execute one task, retrying failures up to the task's retry budget."""
+    loop = asyncio.get_running_loop()
+    while True:
+        update_task_status(workflow, task.task_id, TaskStatus.RUNNING)
+        try:
+            if asyncio.iscoroutinefunction(task_executor):
+                result = await task_executor(task)
+            else:
+                result = await loop.run_in_executor(thread_pool, task_executor, task)
+            update_task_status(workflow, task.task_id, TaskStatus.COMPLETED, result=result)
+            return
+        except Exception as e:
+            logger.warning(f"Task {task.task_id} failed (attempt {task.retry_count + 1}): {e}")
+            update_task_status(workflow, task.task_id, TaskStatus.FAILED, error_message=str(e))
+            if task.retry_count >= task.max_retries:
+                return
+
+def _execute_workflow_task(task: WorkflowTask) -> Dict[str, Any]:
+    """Run a workflow task with the matching em dash tool function."""
+    from .em_dash_analysis_tools import analyze_em_dash_patterns
+    from .em_dash_processing_tools import ProcessingSession, perform_dry_run, apply_replacements
+    
+    data = task.input_data
+    
+    if task.task_type == "analyze_em_dash_patterns":
+        analysis = analyze_em_dash_patterns(
+            data['file_path'],
+            context_length=data.get('context_length', 50),
+            min_confidence=data.get('min_confidence', 0.5)
+        )
+        return {
+            'total_em_dashes': analysis.total_em_dashes,
+            'replacement_summary': analysis.replacement_summary,
+            'confidence_distribution': analysis.confidence_distribution,
+            'average_confidence': sum(p.confidence_score for p in analysis.patterns) / max(len(analysis.patterns), 1),
+            'processing_recommendation': analysis.processing_recommendation
+        }
+    
+    if task.task_type in ("perform_dry_run", "apply_replacements"):
+        input_file = Path(data['input_file'])
+        dry_run = task.task_type == "perform_dry_run"
+        session = ProcessingSession(
+            session_id=task.task_id,
+            session_name=task.task_name,
+            input_file=input_file,
+            output_file=Path(data['output_directory']) / input_file.name,
+            dry_run=dry_run,
+            confidence_threshold=data.get('confidence_threshold', 0.8),
+            backup_enabled=data.get('create_backup', True),
+            rules_source='database'
+        )
+        
+        if dry_run:
+            result = perform_dry_run(session)
+        else:
+            result = apply_replacements(session, create_backup=session.backup_enabled)
+        
+        if not result.success:
+            raise RuntimeError(result.error_message or f"{task.task_type} failed")
+        return asdict(result)
+    
+    raise ValueError(f"Unsupported task type: {task.task_type}")
+
 def _generate_coordination_actions(workflow: EmDashWorkflow) -> List[Dict[str, Any]]:
     """Generate coordination actions for the workflow."""
     actions = []
     
     for task in workflow.tasks:
-        if task.status == TaskStatus.WAITING and _check_dependencies_met(task, workflow.tasks):
+        if task.status == TaskStatus.WAITING and _check_dependencies_met(task, workflow):
             actions.append({
                 'action_type': 'start_task',
                 'task_id': task.task_id,
@@ -658,16 +1043,14 @@ def _calculate_estimated_completion(workflow: EmDashWorkflow) -> Optional[str]:
     if workflow.status == WorkflowStatus.COMPLETED:
         return None
     
-    running_tasks = [task for task in workflow.tasks if task.status == TaskStatus.RUNNING]
-    if not running_tasks:
+    index = workflow.progress_index
+    if index.status_counts[TaskStatus.RUNNING] == 0:
         return "Ready to start"
     
     # Simple estimation based on average task duration
-    completed_tasks = [task for task in workflow.tasks if task.status == TaskStatus.COMPLETED and task.started_at and task.completed_at]
-    
-    if completed_tasks:
-        avg_duration = sum((task.completed_at - task.started_at).total_seconds() for task in completed_tasks) / len(completed_tasks)
-        remaining_tasks = len([task for task in workflow.tasks if task.status in [TaskStatus.WAITING, TaskStatus.RUNNING]])
+    if index.completed_timed_count:
+        avg_duration = index.completed_duration_total / index.completed_timed_count
+        remaining_tasks = index.status_counts[TaskStatus.WAITING] + index.status_counts[TaskStatus.RUNNING]
         estimated_seconds = remaining_tasks * avg_duration
         
         estimated_completion = datetime.now() + timedelta(seconds=estimated_seconds)
@@ -678,21 +1061,50 @@ def _calculate_estimated_completion(workflow: EmDashWorkflow) -> Optional[str]:
 def _check_quality_gates_status(workflow: EmDashWorkflow) -> Dict[str, str]:
     """Check status of all quality gates."""
     gate_status = {}
+    gate_remaining = workflow.progress_index.gate_remaining
     
     for gate in workflow.quality_gates:
-        # Check if required tasks are completed
-        required_task_ids = set(gate.required_tasks)
-        completed_task_ids = {task.task_id for task in workflow.tasks if task.status == TaskStatus.COMPLETED}
-        
-        if required_task_ids.issubset(completed_task_ids):
+        # Required tasks still outstanding are counted down as tasks complete
+        if gate_remaining.get(gate.gate_id, 0) == 0:
             gate_status[gate.gate_id] = "ready_for_validation"
         else:
             gate_status[gate.gate_id] = "waiting_for_tasks"
     
     return gate_status
 
-def _validate_single_quality_gate(gate: QualityGate, workflow: EmDashWorkflow) -> Dict[str, Any]:
-    """Validate a single quality gate."""
+def _gate_measurements(tasks: List[WorkflowTask]) -> Dict[str, float]:
+    """Derive gate criterion values from the results of the given tasks."""
+    measured = {}
+    results = [task.result for task in tasks if task.result]
+    
+    analyses = [r for r in results if 'confidence_distribution' in r]
+    if analyses:
+        total = sum(r.get('total_em_dashes', 0) for r in analyses)
+        low = sum(r['confidence_distribution'].get('low', 0) for r in analyses)
+        measured['min_confidence_average'] = (
+            sum(r.get('average_confidence', 0.0) * r.get('total_em_dashes', 0) for r in analyses) / total
+            if total else 1.0
+        )
+        measured['max_manual_review_ratio'] = low / total if total else 0.0
+        measured['min_pattern_coverage'] = (total - low) / total if total else 1.0
+    
+    processed = [r for r in results if 'replacements_made' in r]
+    if processed:
+        eligible = sum(r['total_em_dashes'] - r.get('skipped_low_confidence', 0) for r in processed)
+        measured['min_replacement_rate'] = (
+            sum(r['replacements_made'] for r in processed) / eligible if eligible else 1.0
+        )
+        measured['max_error_rate'] = sum(1 for r in processed if not r.get('success', True)) / len(processed)
+        measured['processing_time_limit'] = max(r.get('processing_time', 0.0) for r in processed)
+    
+    return measured
+
+def _validate_single_quality_gate(
+    gate: QualityGate,
+    workflow: EmDashWorkflow,
+    tasks: Optional[List[WorkflowTask]] = None
+) -> Dict[str, Any]:
+    """Validate a single quality gate, optionally against a subset of its tasks."""
     result = {
         'passed': False,
         'score': 0.0,
@@ -701,30 +1113,31 @@ def _validate_single_quality_gate(gate: QualityGate, workflow: EmDashWorkflow) -
         'recommendations': []
     }
     
-    # Check criteria (simplified implementation)
+    if tasks is None:
+        tasks_by_id = workflow.progress_index.tasks_by_id
+        tasks = [tasks_by_id[task_id] for task_id in gate.required_tasks if task_id in tasks_by_id]
+    measured = _gate_measurements(tasks)
+    
     criteria_met = 0
     total_criteria = len(gate.criteria)
     
     for criterion, threshold in gate.criteria.items():
-        # This would contain actual validation logic based on task results
-        # For now, using placeholder logic
-        if criterion == 'min_confidence_average':
-            # Would calculate from actual task results
-            actual_confidence = 0.85  # Placeholder
-            if actual_confidence >= threshold:
-                criteria_met += 1
-            else:
-                result['issues'].append(f"Average confidence {actual_confidence:.2f} below threshold {threshold}")
+        actual = measured.get(criterion)
+        if actual is None:
+            # Nothing in the task results measures this criterion
+            criteria_met += 1
+            continue
         
-        elif criterion == 'max_manual_review_ratio':
-            # Would calculate from actual task results  
-            actual_ratio = 0.15  # Placeholder
-            if actual_ratio <= threshold:
+        result['details'][criterion] = actual
+        if criterion.startswith('min_'):
+            if actual >= threshold:
                 criteria_met += 1
             else:
-                result['issues'].append(f"Manual review ratio {actual_ratio:.2f} above threshold {threshold}")
-        
-        # Add more criteria validation as needed
+                result['issues'].append(f"{criterion} {actual:.2f} below threshold {threshold}")
+        elif actual <= threshold:
+            criteria_met += 1
+        else:
+            result['issues'].append(f"{criterion} {actual:.2f} above threshold {threshold}")
     
     result['score'] = criteria_met / max(total_criteria, 1)
     result['passed'] = result['score'] >= 0.8  # 80% of criteria must pass
@@ -735,20 +1148,15 @@ def _validate_single_quality_gate(gate: QualityGate, workflow: EmDashWorkflow) -
     
     return result
 
-def _calculate_task_metrics(tasks: List[WorkflowTask]) -> Dict[str, Any]:
+def _calculate_task_metrics(workflow: EmDashWorkflow) -> Dict[str, Any]:
     """Calculate metrics for workflow tasks."""
-    total_tasks = len(tasks)
-    completed_tasks = sum(1 for task in tasks if task.status == TaskStatus.COMPLETED)
-    failed_tasks = sum(1 for task in tasks if task.status == TaskStatus.FAILED)
+    index = workflow.progress_index
+    total_tasks = len(workflow.tasks)
+    completed_tasks = index.status_counts[TaskStatus.COMPLETED]
+    failed_tasks = index.status_counts[TaskStatus.FAILED]
     
-    # Calculate durations for completed tasks
-    task_durations = []
-    for task in tasks:
-        if task.started_at and task.completed_at:
-            duration = (task.completed_at - task.started_at).total_seconds()
-            task_durations.append(duration)
-    
-    avg_duration = sum(task_durations) / len(task_durations) if task_durations else 0
+    # Average duration across tasks that have both timestamps
+    avg_duration = index.timed_duration_total / index.timed_task_count if index.timed_task_count else 0
     
     return {
         'total_tasks': total_tasks,
@@ -756,7 +1164,7 @@ def _calculate_task_metrics(tasks: List[WorkflowTask]) -> Dict[str, Any]:
         'failed_tasks': failed_tasks,
         'success_rate': completed_tasks / max(total_tasks, 1),
         'average_task_duration_seconds': avg_duration,
-        'total_retries': sum(task.retry_count for task in tasks)
+        'total_retries': index.total_retries
     }
 
 def _calculate_quality_metrics(workflow: EmDashWorkflow) -> Dict[str, Any]:
@@ -775,12 +1183,11 @@ def _generate_workflow_recommendations(workflow: EmDashWorkflow) -> List[str]:
     recommendations = []
     
     # Analyze workflow performance and generate recommendations
-    failed_tasks = [task for task in workflow.tasks if task.status == TaskStatus.FAILED]
-    if failed_tasks:
-        recommendations.append(f"Review and resolve {len(failed_tasks)} failed task(s)")
+    failed_count = workflow.progress_index.status_counts[TaskStatus.FAILED]
+    if failed_count:
+        recommendations.append(f"Review and resolve {failed_count} failed task(s)")
     
-    retried_tasks = [task for task in workflow.tasks if task.retry_count > 0]
-    if retried_tasks:
+    if workflow.progress_index.total_retries > 0:
         recommendations.append("Investigate causes of task failures to improve reliability")
     
     if workflow.status == WorkflowStatus.COMPLETED:
@@ -810,6 +1217,33 @@ def _summarize_task_result(result: Dict[str, Any]) -> Dict[str, Any]:
     
     return summary
 
+def _maybe_update_workflow_progress_in_db(
+    workflow: EmDashWorkflow,
+    progress_info: Dict[str, Any],
+    snapshot_key: tuple
+):
+    """Write a progress snapshot unless it is already stored or a write happened too recently."""
+    index = workflow.progress_index
+    if index.persisted_key == snapshot_key:
+        return
+    
+    now = datetime.now()
+    outstanding = index.status_counts[TaskStatus.WAITING] + index.status_counts[TaskStatus.RUNNING]
+    is_final = outstanding == 0 or workflow.status in (
+        WorkflowStatus.COMPLETED, WorkflowStatus.FAILED, WorkflowStatus.CANCELLED
+    )
+    
+    if (
+        not is_final
+        and index.last_persisted_at is not None
+        and (now - index.last_persisted_at).total_seconds() < PROGRESS_DB_MIN_INTERVAL
+    ):
+        return
+    
+    _update_workflow_progress_in_db(workflow, progress_info)
+    index.persisted_key = snapshot_key
+    index.last_persisted_at = now
+
 def _update_workflow_progress_in_db(workflow: EmDashWorkflow, progress_info: Dict[str, Any]):
     """Update workflow progress in database."""
     tools = WorkflowCoordinationTools()
@@ -13,12 +13,21 @@ Brian's Requirements:
 - Right-hand chapter starts
 - Architectural corner elements
 - Professional typography
+
+Each chapter is rendered to its own PDF in a worker process, then the parts
+are merged in order with a running page count, inserting a blank page
+wherever a chapter would otherwise start on a left-hand page.
 """
 
 import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from xml.sax.saxutils import escape
+import PyPDF2
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, cm
 from reportlab.lib.colors import Color
@@ -26,6 +35,89 @@ from reportlab.platypus.tableofcontents import TableOfContents
 from reportlab.platypus.flowables import Flowable
 from datetime import datetime
 
+# "Chapter 7: Title" heading on the first line of a chapter file
+CHAPTER_HEADING = re.compile(r'^chapter\s+\d+\s*:\s*', re.IGNORECASE)
+
+# Bare "Chapter 7" label that ends the processing header of TTS-prepared chapters
+CHAPTER_LABEL = re.compile(r'^chapter\s+\d+$', re.IGNORECASE)
+
+SAMPLE_CHAPTER_TITLES = [
+    "Strategic Planning Foundation",
+    "Project Development Lifecycle", 
+    "Regulatory Compliance Framework",
+    "Financial Management Systems",
+    "Team Coordination Protocols"
+]
+
+
+def sample_chapters():
+    """Placeholder chapters demonstrating the formatting"""
+    chapters = []
+    for chapter_title in SAMPLE_CHAPTER_TITLES:
+        paragraphs = [
+            f"""
+            This chapter covers the essential elements of {chapter_title.lower()} in behavioral health facility development. 
+            The content has been formatted with Brian's requested specifications:
+            """,
+            """
+            • Margins increased by +3 points on all sides<br/>
+            • Chapter starts positioned on right-hand pages<br/>
+            • Architectural corner elements for visual appeal<br/>
+            • Professional typography hierarchy maintained
+            """
+        ]
+        # Additional content for realistic page count
+        for j in range(3):
+            paragraphs.append(f"""
+                Section {j+1}: This section demonstrates the professional formatting applied throughout 
+                the document. The margins provide optimal readability while maintaining the sophisticated 
+                aesthetic that befits a publication of this caliber. Each element has been carefully 
+                positioned to create visual harmony and guide the reader's attention effectively.
+                """)
+        chapters.append({'title': chapter_title, 'paragraphs': paragraphs})
+    return chapters
+
+
+def load_chapter_texts(chapters_dir):
+    """
+    Load edited chapters from Chapter_NN_*.txt files
+    
+    Paragraphs are separated by blank lines. TTS-prepared chapters open with
+    a processing header; when a bare "Chapter N" label follows it, the header
+    is dropped and the line after the label becomes the title.
+    
+    Args:
+        chapters_dir: Directory of chapter text files
+        
+    Returns:
+        List of {'title', 'paragraphs'} dicts in chapter order, with
+        paragraphs escaped for reportlab markup
+    """
+    chapters = []
+    for chapter_file in sorted(Path(chapters_dir).glob("Chapter_*.txt")):
+        text = chapter_file.read_text(encoding='utf-8')
+        blocks = [block.strip() for block in re.split(r'\n\s*\n', text) if block.strip()]
+        if not blocks:
+            continue
+        
+        title = CHAPTER_HEADING.sub('', blocks[0].splitlines()[0])
+        body = blocks[1:]
+        for index, block in enumerate(body):
+            if CHAPTER_LABEL.match(block):
+                body = body[index + 1:]
+                if body:
+                    title_line, _, rest = body[0].partition('\n')
+                    title = title_line.strip()
+                    body = ([rest] if rest.strip() else []) + body[1:]
+                break
+        
+        chapters.append({
+            'title': title,
+            'paragraphs': [escape(block).replace('\n', '<br/>') for block in body]
+        })
+    return chapters
+
+
 class ArchitecturalCorner(Flowable):
     """Custom flowable for architectural corner elements"""
     
@@ -104,91 +196,134 @@ class WellspringPDFFormatter:
             'subtitle': subtitle_style
         }
     
-    def generate_formatted_pdf(self):
-        """Generate PDF with Brian's formatting specifications"""
-        
-        # Create PDF with correct margins
-        pdf_file = self.output_dir / f"wellspring_formatted_{self.timestamp}.pdf"
-        
-        doc = SimpleDocTemplate(
+    def _document(self, pdf_file, title="The Wellspring - Formatted for InDesign Import"):
+        """Letter-size document template with Brian's margins"""
+        return SimpleDocTemplate(
             str(pdf_file),
             pagesize=letter,
             topMargin=self.margins['top'],
             bottomMargin=self.margins['bottom'],
             leftMargin=self.margins['left'],
             rightMargin=self.margins['right'],
-            title="The Wellspring - Formatted for InDesign Import"
+            title=title
         )
+    
+    def build_title_story(self, styles):
+        """Title page flowables"""
+        return [
+            ArchitecturalCorner(18),
+            Spacer(1, 12),
+            Paragraph("THE WELLSPRING", styles['chapter']),
+            Spacer(1, 20),
+            Paragraph("Best Practices for Strategic Execution & Rapid Delivery of Behavioral Health Facility Development", styles['subtitle']),
+            Spacer(1, 30),
+            Paragraph("Brian B. Jones", styles['body'])
+        ]
+    
+    def build_chapter_story(self, number, chapter, styles):
+        """Flowables for one chapter, starting with its corner element and title"""
+        story = [
+            ArchitecturalCorner(18),
+            Spacer(1, 12),
+            Paragraph(f"Chapter {number}: {escape(chapter['title'])}", styles['chapter']),
+            Spacer(1, 20)
+        ]
+        for paragraph in chapter['paragraphs']:
+            story.append(Paragraph(paragraph, styles['body']))
+            story.append(Spacer(1, 15))
+        return story
+    
+    def render_part(self, part, part_file):
+        """
+        Render the title page or one chapter to its own PDF
+        
+        Runs in a worker process, so only this part's flowables are ever in memory.
         
-        # Create story (document content)
-        story = []
+        Args:
+            part: {'kind': 'title'} or {'kind': 'chapter', 'number', 'chapter'}
+            part_file: PDF path to write
+            
+        Returns:
+            part_file
+        """
         styles = self.create_styles()
+        if part['kind'] == 'title':
+            story = self.build_title_story(styles)
+        else:
+            story = self.build_chapter_story(part['number'], part['chapter'], styles)
+        self._document(part_file).build(story)
+        return part_file
+    
+    def merge_parts(self, part_files, pdf_file):
+        """
+        Merge rendered parts in order, starting every chapter on a right-hand page
         
-        # Add architectural corner element
-        corner = ArchitecturalCorner(18)
-        story.append(corner)
-        story.append(Spacer(1, 12))
+        A running page count replaces rescanning the document: when the pages
+        merged so far are odd in number, the next chapter would land on a
+        left-hand page, so a blank page is inserted first.
         
-        # Title page content
-        story.append(Paragraph("THE WELLSPRING", styles['chapter']))
-        story.append(Spacer(1, 20))
-        story.append(Paragraph("Best Practices for Strategic Execution & Rapid Delivery of Behavioral Health Facility Development", styles['subtitle']))
-        story.append(Spacer(1, 30))
-        story.append(Paragraph("Brian B. Jones", styles['body']))
-        story.append(PageBreak())
+        Args:
+            part_files: Title page PDF followed by one PDF per chapter
+            pdf_file: Merged PDF path
+            
+        Returns:
+            Total page count
+        """
+        writer = PyPDF2.PdfWriter()
+        page_count = 0
+        blank_pages = 0
         
-        # Sample chapter content with proper formatting
-        chapters = [
-            "Strategic Planning Foundation",
-            "Project Development Lifecycle", 
-            "Regulatory Compliance Framework",
-            "Financial Management Systems",
-            "Team Coordination Protocols"
-        ]
+        for index, part_file in enumerate(part_files):
+            reader = PyPDF2.PdfReader(str(part_file))
+            if index > 0 and page_count % 2 == 1:
+                writer.add_blank_page(width=letter[0], height=letter[1])
+                page_count += 1
+                blank_pages += 1
+            for page in reader.pages:
+                writer.add_page(page)
+            page_count += len(reader.pages)
         
-        for i, chapter_title in enumerate(chapters, 1):
-            # Ensure chapters start on right-hand pages (odd page numbers)
-            if i > 1:  # Not for first chapter
-                story.append(PageBreak())
-                # Add blank page if needed for right-hand start
-                if (len([item for item in story if isinstance(item, PageBreak)]) % 2) == 0:
-                    story.append(PageBreak())
-            
-            # Add corner element to each chapter
-            story.append(corner)
-            story.append(Spacer(1, 12))
-            
-            # Chapter title
-            story.append(Paragraph(f"Chapter {i}: {chapter_title}", styles['chapter']))
-            story.append(Spacer(1, 20))
-            
-            # Sample chapter content
-            story.append(Paragraph(f"""
-            This chapter covers the essential elements of {chapter_title.lower()} in behavioral health facility development. 
-            The content has been formatted with Brian's requested specifications:
-            """, styles['body']))
-            
-            story.append(Paragraph("""
-            • Margins increased by +3 points on all sides<br/>
-            • Chapter starts positioned on right-hand pages<br/>
-            • Architectural corner elements for visual appeal<br/>
-            • Professional typography hierarchy maintained
-            """, styles['body']))
-            
-            story.append(Spacer(1, 30))
+        writer.add_metadata({'/Title': "The Wellspring - Formatted for InDesign Import"})
+        partial_file = pdf_file.with_name(pdf_file.name + ".partial")
+        with open(partial_file, 'wb') as f:
+            writer.write(f)
+        os.replace(partial_file, pdf_file)
+        
+        print(f"   📄 {page_count} pages ({blank_pages} blank pages for right-hand chapter starts)")
+        return page_count
+    
+    def generate_formatted_pdf(self, chapters=None, max_workers=None):
+        """
+        Generate PDF with Brian's formatting specifications
+        
+        Args:
+            chapters: List of {'title', 'paragraphs'} dicts (see load_chapter_texts);
+                defaults to sample chapters
+            max_workers: Worker processes rendering chapters (default: CPU count)
             
-            # Additional content for realistic page count
-            for j in range(3):
-                story.append(Paragraph(f"""
-                Section {j+1}: This section demonstrates the professional formatting applied throughout 
-                the document. The margins provide optimal readability while maintaining the sophisticated 
-                aesthetic that befits a publication of this caliber. Each element has been carefully 
-                positioned to create visual harmony and guide the reader's attention effectively.
-                """, styles['body']))
-                story.append(Spacer(1, 15))
+        Returns:
+            Path of the merged PDF
+        """
+        if chapters is None:
+            chapters = sample_chapters()
         
-        # Build PDF
-        doc.build(story)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        pdf_file = self.output_dir / f"wellspring_formatted_{self.timestamp}.pdf"
+        
+        parts = [{'kind': 'title'}] + [
+            {'kind': 'chapter', 'number': number, 'chapter': chapter}
+            for number, chapter in enumerate(chapters, 1)
+        ]
+        
+        with tempfile.TemporaryDirectory(dir=self.output_dir, prefix=".wellspring_parts_") as parts_dir:
+            part_files = [Path(parts_dir) / f"part_{index:03d}.pdf" for index in range(len(parts))]
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self.render_part, part, part_file)
+                           for part, part_file in zip(parts, part_files)]
+                for future in futures:
+                    future.result()
+            
+            self.merge_parts(part_files, pdf_file)
         
         return pdf_file
     
@@ -277,15 +412,29 @@ class WellspringPDFFormatter:
 
 def main():
     """Generate formatted PDF and import instructions"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Wellspring PDF-first formatting workflow")
+    parser.add_argument("--chapters-dir", default=str(Path(__file__).parent.parent / "tts_prepared_chapters"),
+                        help="Directory of edited Chapter_NN_*.txt files (sample content if missing)")
+    parser.add_argument("--workers", type=int, help="Worker processes rendering chapters")
+    parser.add_argument("--output", default="output", help="Output directory")
+    args = parser.parse_args()
+    
     print("🌊 WELLSPRING PDF-FIRST FORMATTING WORKFLOW")
     print("=" * 50)
     
-    formatter = WellspringPDFFormatter()
+    formatter = WellspringPDFFormatter(args.output)
     
     try:
+        chapters = None
+        if Path(args.chapters_dir).is_dir():
+            chapters = load_chapter_texts(args.chapters_dir) or None
+        print(f"📚 Chapters: {len(chapters) if chapters else 'sample content'}")
+        
         # Generate formatted PDF
         print("📄 Generating formatted PDF with Brian's specifications...")
-        pdf_file = formatter.generate_formatted_pdf()
+        pdf_file = formatter.generate_formatted_pdf(chapters, max_workers=args.workers)
         print(f"✅ PDF created: {pdf_file}")
         
         # Create import instructions
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Batch Registry for Wellspring OpenAI Batch Jobs
+Single cached view of every batch job's state, stored in wellspring.db.
+
+Status checks read the registry instead of calling the API. A row is only
+re-fetched once its status-specific TTL has expired; terminal jobs are never
+re-fetched. A background refresher keeps active jobs warm so reads stay
+instant, and anything that already retrieves batches (the monitor, the
+processor's polling loop) records what it sees here.
+
+Usage:
+    registry = BatchRegistry(client)
+    status = registry.get("batch_abc123")          # cached unless stale
+    dashboard = registry.dashboard()               # counts, progress, ETAs
+
+    refresher = BatchRegistryRefresher(registry)
+    refresher.start()
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent / "data" / "wellspring.db"
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Seconds a cached row stays fresh, by status; terminal jobs never go stale
+DEFAULT_STATUS_TTLS = {
+    "validating": 30,
+    "in_progress": 60,
+    "finalizing": 30,
+    "cancelling": 30
+}
+DEFAULT_TTL = 60
+DEFAULT_LISTING_TTL = 300
+
+# Batch fields copied as-is into registry columns of the same name
+BATCH_FIELDS = (
+    "status", "endpoint", "input_file_id", "output_file_id", "error_file_id",
+    "created_at", "in_progress_at", "finalizing_at", "completed_at", "failed_at", "expired_at",
+    "cancelled_at", "expires_at"
+)
+BATCH_COLUMNS = ("batch_id", *BATCH_FIELDS, "request_total", "request_completed", "request_failed",
+                 "errors", "metadata")
+
+
+def _field(obj: Any, name: str) -> Any:
+    """Read a field from an SDK object or a plain dict"""
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _to_jsonable(value: Any) -> Any:
+    """Convert SDK models to plain data for JSON storage"""
+    if value is None or isinstance(value, (str, int, float, bool, list, dict)):
+        return value
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return getattr(value, "__dict__", str(value))
+
+
+def batch_row(batch: Any) -> Dict[str, Any]:
+    """Flatten a batch object into registry columns"""
+    counts = _field(batch, "request_counts")
+    errors = _to_jsonable(_field(batch, "errors"))
+    metadata = _field(batch, "metadata")
+
+    row = {column: _field(batch, column) for column in BATCH_FIELDS}
+    row.update(
+        batch_id=_field(batch, "id"),
+        request_total=_field(counts, "total") if counts else None,
+        request_completed=_field(counts, "completed") if counts else None,
+        request_failed=_field(counts, "failed") if counts else None,
+        errors=json.dumps(errors) if errors else None,
+        metadata=json.dumps(_to_jsonable(metadata)) if metadata else None
+    )
+    return row
+
+
+class BatchRegistry:
+    """Cached batch job states in wellspring.db with per-status TTLs"""
+
+    def __init__(self, client: Any = None, db_path: Optional[str] = None,
+                 status_ttls: Optional[Dict[str, float]] = None,
+                 listing_ttl: float = DEFAULT_LISTING_TTL):
+        """
+        Initialize the registry
+
+        Args:
+            client: Synchronous OpenAI client used to refresh stale entries (None for cache-only reads)
+            db_path: SQLite database holding the registry table
+            status_ttls: Seconds a row stays fresh, by status
+            listing_ttl: Seconds between full batch listings
+        """
+        self.client = client
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.status_ttls = {**DEFAULT_STATUS_TTLS, **(status_ttls or {})}
+        self.listing_ttl = listing_ttl
+        self.api_calls = 0
+        self._initialize_tables()
+
+    def _initialize_tables(self):
+        """Create the registry tables if needed"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS batch_registry (
+                batch_id TEXT PRIMARY KEY,
+                status TEXT,
+                endpoint TEXT,
+                input_file_id TEXT,
+                output_file_id TEXT,
+                error_file_id TEXT,
+                created_at INTEGER,
+                in_progress_at INTEGER,
+                finalizing_at INTEGER,
+                completed_at INTEGER,
+                failed_at INTEGER,
+                expired_at INTEGER,
+                cancelled_at INTEGER,
+                expires_at INTEGER,
+                request_total INTEGER,
+                request_completed INTEGER,
+                request_failed INTEGER,
+                errors TEXT,
+                metadata TEXT,
+                fetched_at REAL,
+                status_changed_at REAL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_batch_registry_status ON batch_registry (status)")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS batch_registry_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    # Recording
+
+    def record(self, batch: Any) -> Dict[str, Any]:
+        """Store a freshly retrieved batch and return its registry entry"""
+        self.record_many([batch])
+        return self.get(_field(batch, "id"), refresh=False)
+
+    def record_many(self, batches: Iterable[Any]) -> int:
+        """Store many freshly retrieved batches in one transaction"""
+        rows = [batch_row(batch) for batch in batches if batch is not None]
+        if not rows:
+            return 0
+
+        now = time.time()
+        columns = ", ".join(BATCH_COLUMNS)
+        placeholders = ", ".join("?" for _ in BATCH_COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in BATCH_COLUMNS if column != "batch_id")
+
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany(f"""
+            INSERT INTO batch_registry ({columns}, fetched_at, status_changed_at)
+            VALUES ({placeholders}, ?, ?)
+            ON CONFLICT (batch_id) DO UPDATE SET {updates},
+                fetched_at = excluded.fetched_at,
+                status_changed_at = CASE WHEN batch_registry.status IS excluded.status
+                                         THEN batch_registry.status_changed_at ELSE excluded.status_changed_at END
+        """, [(*(row[column] for column in BATCH_COLUMNS), now, now) for row in rows])
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    # Reads
+
+    def get(self, batch_id: str, refresh: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Get a batch job's status, re-fetching only if missing or stale
+
+        Args:
+            batch_id: OpenAI batch job ID
+            refresh: Allow an API call when the entry is missing or stale
+
+        Returns:
+            Registry entry with progress and ETA, or None if unknown
+        """
+        rows = self._query("SELECT * FROM batch_registry WHERE batch_id = ?", (batch_id,))
+        row = rows[0] if rows else None
+
+        if refresh and self.client is not None and (row is None or self.is_stale(row)):
+            return self.refresh(batch_id)
+        return self._entry(row) if row else None
+
+    def list_batches(self, status: Optional[str] = None, limit: Optional[int] = None,
+                     refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        List batch jobs from the registry, newest first
+
+        Args:
+            status: Only return jobs in this status
+            limit: Maximum number of jobs to return
+            refresh: Re-list from the API first if the last listing has expired
+
+        Returns:
+            Registry entries with progress and ETA
+        """
+        if refresh:
+            self.refresh_listing()
+
+        query = "SELECT * FROM batch_registry"
+        params: List[Any] = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        return [self._entry(row) for row in self._query(query, tuple(params))]
+
+    def counts(self) -> Dict[str, Any]:
+        """Job counts by status and request totals across active jobs"""
+        conn = sqlite3.connect(self.db_path)
+        by_status = dict(conn.execute("SELECT status, COUNT(*) FROM batch_registry GROUP BY status").fetchall())
+        placeholders = ", ".join("?" for _ in TERMINAL_STATUSES)
+        total, completed, failed = conn.execute(f"""
+            SELECT COALESCE(SUM(request_total), 0), COALESCE(SUM(request_completed), 0),
+                   COALESCE(SUM(request_failed), 0)
+            FROM batch_registry WHERE status NOT IN ({placeholders})
+        """, tuple(TERMINAL_STATUSES)).fetchone()
+        conn.close()
+
+        return {
+            "total_jobs": sum(by_status.values()),
+            "active_jobs": sum(count for status, count in by_status.items() if status not in TERMINAL_STATUSES),
+            "by_status": by_status,
+            "active_requests": {"total": total, "completed": completed, "failed": failed}
+        }
+
+    def dashboard(self) -> Dict[str, Any]:
+        """Counts plus every active job with progress and ETA, served entirely from cache"""
+        placeholders = ", ".join("?" for _ in TERMINAL_STATUSES)
+        active = self._query(
+            f"SELECT * FROM batch_registry WHERE status NOT IN ({placeholders}) ORDER BY created_at",
+            tuple(TERMINAL_STATUSES)
+        )
+        return {
+            **self.counts(),
+            "active": [self._entry(row) for row in active],
+            "last_listed_at": self._get_meta("last_listed_at"),
+            "api_calls": self.api_calls
+        }
+
+    # Refreshing
+
+    def ttl_for(self, status: Optional[str]) -> Optional[float]:
+        """Freshness window for a status; None means never stale"""
+        if status in TERMINAL_STATUSES:
+            return None
+        return self.status_ttls.get(status, DEFAULT_TTL)
+
+    def is_stale(self, row: Dict[str, Any], now: Optional[float] = None) -> bool:
+        ttl = self.ttl_for(row.get("status"))
+        if ttl is None:
+            return False
+        return (now or time.time()) - (row.get("fetched_at") or 0) >= ttl
+
+    def stale_ids(self) -> List[str]:
+        """IDs of active jobs whose cached state has expired"""
+        placeholders = ", ".join("?" for _ in TERMINAL_STATUSES)
+        rows = self._query(
+            f"SELECT batch_id, status, fetched_at FROM batch_registry WHERE status NOT IN ({placeholders})",
+            tuple(TERMINAL_STATUSES)
+        )
+        now = time.time()
+        return [row["batch_id"] for row in rows if self.is_stale(row, now)]
+
+    def refresh(self, batch_id: str) -> Dict[str, Any]:
+        """Fetch one batch from the API and record it"""
+        self.api_calls += 1
+        return self.record(self.client.batches.retrieve(batch_id))
+
+    def refresh_stale(self, max_workers: int = 4) -> int:
+        """Re-fetch every stale active job; returns the number refreshed"""
+        if self.client is None:
+            return 0
+
+        stale = self.stale_ids()
+        if not stale:
+            return 0
+
+        def retrieve(batch_id: str):
+            try:
+                return self.client.batches.retrieve(batch_id)
+            except Exception as e:
+                logger.error(f"Error refreshing batch {batch_id}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            batches = list(executor.map(retrieve, stale))
+        self.api_calls += len(stale)
+        return self.record_many(batches)
+
+    def refresh_listing(self, limit: int = 100, force: bool = False) -> int:
+        """Re-list recent batches from the API if the last listing has expired"""
+        if self.client is None:
+            return 0
+
+        last_listed_at = float(self._get_meta("last_listed_at") or 0)
+        if not force and time.time() - last_listed_at < self.listing_ttl:
+            return 0
+
+        self.api_calls += 1
+        recorded = self.record_many(self.client.batches.list(limit=limit).data)
+        self._set_meta("last_listed_at", str(time.time()))
+        return recorded
+
+    # Helpers
+
+    def _entry(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Registry row in the batch status shape, with progress and ETA"""
+        total = row.get("request_total") or 0
+        completed = row.get("request_completed") or 0
+        failed = row.get("request_failed") or 0
+        status = row.get("status")
+
+        eta_seconds = None
+        if status in TERMINAL_STATUSES:
+            eta_seconds = 0
+        elif status == "in_progress" and completed and row.get("in_progress_at"):
+            elapsed = max(1.0, (row.get("fetched_at") or time.time()) - row["in_progress_at"])
+            remaining = max(0, total - completed - failed)
+            eta_seconds = round(remaining / (completed / elapsed))
+
+        return {
+            "id": row["batch_id"],
+            "status": status,
+            "endpoint": row.get("endpoint"),
+            "created_at": row.get("created_at"),
+            "in_progress_at": row.get("in_progress_at"),
+            "completed_at": row.get("completed_at"),
+            "failed_at": row.get("failed_at"),
+            "expires_at": row.get("expires_at"),
+            "input_file_id": row.get("input_file_id"),
+            "output_file_id": row.get("output_file_id"),
+            "error_file_id": row.get("error_file_id"),
+            "request_counts": {"total": total, "completed": completed, "failed": failed}
+                              if row.get("request_total") is not None else None,
+            "errors": json.loads(row["errors"]) if row.get("errors") else None,
+            "metadata": json.loads(row["metadata"]) if row.get("metadata") else None,
+            "progress": round(completed / total * 100, 1) if total else None,
+            "eta_seconds": eta_seconds,
+            "fetched_at": row.get("fetched_at"),
+            "cache_age_seconds": round(time.time() - row["fetched_at"], 1) if row.get("fetched_at") else None
+        }
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        rows = self._query("SELECT value FROM batch_registry_meta WHERE key = ?", (key,))
+        return rows[0]["value"] if rows else None
+
+    def _set_meta(self, key: str, value: str):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT OR REPLACE INTO batch_registry_meta (key, value) VALUES (?, ?)", (key, value))
+        conn.commit()
+        conn.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+        conn.close()
+        return rows
+
+
+class BatchRegistryRefresher:
+    """Background thread that keeps the registry's active jobs fresh"""
+
+    def __init__(self, registry: BatchRegistry, interval: float = 15.0):
+        """
+        Args:
+            registry: Registry to refresh
+            interval: Seconds between refresh rounds; each round only fetches stale jobs
+        """
+        self.registry = registry
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="batch-registry-refresher", daemon=True)
+        self._thread.start()
+        logger.info("Batch registry refresher started")
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def refresh_once(self) -> int:
+        """One refresh round: the periodic listing if due, then stale active jobs"""
+        refreshed = 0
+        try:
+            refreshed += self.registry.refresh_listing()
+            refreshed += self.registry.refresh_stale()
+        except Exception as e:
+            logger.error(f"Batch registry refresh failed: {e}")
+        return refreshed
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh_once()
+            self._stop.wait(self.interval)
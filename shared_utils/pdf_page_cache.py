@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+PDF Page Extraction Cache for Wellspring Book Processing
+Per-page text and layout metadata stored in wellspring.db.
+
+Pages are keyed by (file hash, page number, extractor version), so an
+unchanged PDF is never re-parsed. When a new revision of the book arrives,
+each page's content stream is hashed and any page whose content stream
+already has an extraction (from an earlier revision) is reused, so only
+changed pages are extracted again. The page hash also covers the page's
+resolved resources (fonts, ToUnicode maps, form XObjects), since those change
+the extracted text without touching the content stream.
+
+Usage:
+    cache = PDFPageCache()
+    lookup = cache.lookup(pdf_path, EXTRACTOR_VERSION)
+    missing = lookup["missing_pages"]
+    ...
+    cache.store_pages(lookup["file_hash"], EXTRACTOR_VERSION, extracted_pages,
+                      page_count=lookup["page_count"], source_path=pdf_path)
+"""
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent / "data" / "wellspring.db"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """Streaming SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _object_digest(obj: Any, memo: Dict[Any, str], visiting: set) -> str:
+    """
+    Digest of a PDF object with indirect references resolved
+
+    Indirect objects are memoized by reference, so resources shared across
+    pages (fonts, images) are only decoded and hashed once per file.
+    """
+    from PyPDF2.generic import ArrayObject, DictionaryObject, FloatObject, IndirectObject, NumberObject, StreamObject
+
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key in memo:
+            return memo[key]
+        if key in visiting:
+            # Reference cycle; the object is already being hashed further up
+            return f"ref:{obj.idnum}:{obj.generation}"
+        visiting.add(key)
+        try:
+            memo[key] = _object_digest(obj.get_object(), memo, visiting)
+        finally:
+            visiting.discard(key)
+        return memo[key]
+
+    digest = hashlib.sha256()
+    if isinstance(obj, DictionaryObject):
+        for name in sorted(obj.keys()):
+            if name == "/Parent":
+                continue
+            digest.update(str(name).encode())
+            digest.update(_object_digest(obj.raw_get(name), memo, visiting).encode())
+        if isinstance(obj, StreamObject):
+            try:
+                digest.update(obj.get_data())
+            except Exception:
+                digest.update(obj._data or b"")
+    elif isinstance(obj, ArrayObject):
+        digest.update(b"[")
+        for item in obj:
+            digest.update(_object_digest(item, memo, visiting).encode())
+        digest.update(b"]")
+    elif isinstance(obj, (FloatObject, NumberObject)):
+        # Writers differ on 1 vs 1.0
+        digest.update(f"number:{float(obj)!r}".encode())
+    else:
+        digest.update(f"{type(obj).__name__}:{obj!r}".encode())
+    return digest.hexdigest()
+
+
+def pdf_page_hashes(pdf_path: str) -> List[str]:
+    """
+    Hash every page's decoded content stream, resolved resources and page box
+
+    This is far cheaper than text extraction and identifies pages whose
+    content is unchanged between revisions of a PDF.
+
+    Args:
+        pdf_path: PDF to hash
+
+    Returns:
+        One hex digest per page, in page order
+    """
+    import PyPDF2
+
+    hashes = []
+    memo: Dict[Any, str] = {}
+    reader = PyPDF2.PdfReader(pdf_path)
+    for page in reader.pages:
+        digest = hashlib.sha256()
+        contents = page.get_contents()
+        if contents is not None:
+            digest.update(contents.get_data())
+        resources = page.raw_get("/Resources") if "/Resources" in page else None
+        if resources is not None:
+            digest.update(_object_digest(resources, memo, set()).encode())
+        digest.update(repr([float(value) for value in page.mediabox]).encode())
+        digest.update(str(page.get("/Rotate", 0)).encode())
+        hashes.append(digest.hexdigest())
+    return hashes
+
+
+class PDFPageCache:
+    """Per-page PDF extraction cache in wellspring.db"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self._initialize_tables()
+
+    def _initialize_tables(self):
+        """Create the cache tables if needed"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS pdf_page_cache (
+                file_hash TEXT,
+                page_number INTEGER,
+                extractor_version TEXT,
+                page_hash TEXT,
+                extractor TEXT,
+                text TEXT,
+                metadata TEXT,
+                extracted_at TEXT,
+                PRIMARY KEY (file_hash, page_number, extractor_version)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pdf_page_cache_page
+            ON pdf_page_cache (page_hash, extractor_version)
+        """)
+
+        # Files whose every page is cached, so a repeat run needs no PDF parsing at all
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS pdf_page_cache_files (
+                file_hash TEXT,
+                extractor_version TEXT,
+                page_count INTEGER,
+                source_path TEXT,
+                completed_at TEXT,
+                PRIMARY KEY (file_hash, extractor_version)
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> Dict[str, Any]:
+        """Cache row as a page record"""
+        return {
+            "page_number": row["page_number"],
+            "page_hash": row["page_hash"],
+            "extractor": row["extractor"],
+            "text": row["text"],
+            "metadata": json.loads(row["metadata"]) if row["metadata"] else {}
+        }
+
+    def get_pages(self, file_hash: str, extractor_version: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Cached pages of one exact file
+
+        Args:
+            file_hash: SHA-256 of the PDF
+            extractor_version: Extractor version the pages must come from
+
+        Returns:
+            Page records keyed by 1-based page number
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute("""
+                SELECT * FROM pdf_page_cache WHERE file_hash = ? AND extractor_version = ?
+            """, (file_hash, extractor_version)).fetchall()
+        finally:
+            conn.close()
+        return {row["page_number"]: self._record(row) for row in rows}
+
+    def match_pages(self, page_hashes: List[str], extractor_version: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Cached extractions of pages with identical content, from any revision
+
+        Args:
+            page_hashes: Content hash of each page, in page order
+            extractor_version: Extractor version the pages must come from
+
+        Returns:
+            Page records keyed by 1-based page number of the new file
+        """
+        matched = {}
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            for page_number, page_hash in enumerate(page_hashes, 1):
+                row = conn.execute("""
+                    SELECT * FROM pdf_page_cache WHERE page_hash = ? AND extractor_version = ?
+                    ORDER BY extracted_at DESC LIMIT 1
+                """, (page_hash, extractor_version)).fetchone()
+                if row:
+                    record = self._record(row)
+                    record["page_number"] = page_number
+                    matched[page_number] = record
+        finally:
+            conn.close()
+        return matched
+
+    def store_pages(self, file_hash: str, extractor_version: str, pages: Iterable[Dict[str, Any]],
+                    page_count: Optional[int] = None, source_path: Optional[str] = None) -> int:
+        """
+        Store page records for a file
+
+        Args:
+            file_hash: SHA-256 of the PDF
+            extractor_version: Extractor version that produced the pages
+            pages: Records with page_number, page_hash, extractor, text and metadata
+            page_count: Total pages in the file; marks the file complete once all are stored
+            source_path: Path the file was read from, for reference
+
+        Returns:
+            Number of pages stored
+        """
+        now = datetime.now().isoformat()
+        rows = [
+            (file_hash, page["page_number"], extractor_version, page.get("page_hash"), page.get("extractor"),
+             page.get("text", ""), json.dumps(page.get("metadata") or {}), now)
+            for page in pages
+        ]
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executemany("""
+                INSERT OR REPLACE INTO pdf_page_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+            if page_count is not None:
+                stored = conn.execute("""
+                    SELECT COUNT(*) FROM pdf_page_cache WHERE file_hash = ? AND extractor_version = ?
+                """, (file_hash, extractor_version)).fetchone()[0]
+                if stored >= page_count:
+                    conn.execute("""
+                        INSERT OR REPLACE INTO pdf_page_cache_files VALUES (?, ?, ?, ?, ?)
+                    """, (file_hash, extractor_version, page_count, str(source_path) if source_path else None, now))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return len(rows)
+
+    def completed_page_count(self, file_hash: str, extractor_version: str) -> Optional[int]:
+        """Page count of a fully cached file, or None if any page is missing"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute("""
+                SELECT page_count FROM pdf_page_cache_files WHERE file_hash = ? AND extractor_version = ?
+            """, (file_hash, extractor_version)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def lookup(self, pdf_path: str, extractor_version: str) -> Dict[str, Any]:
+        """
+        Find every cached page of a PDF and the pages still to extract
+
+        An exact file hit needs no PDF parsing. Otherwise page content
+        hashes are computed and pages unchanged since an earlier revision
+        are reused and recorded under the new file hash.
+
+        Args:
+            pdf_path: PDF to look up
+            extractor_version: Extractor version the pages must come from
+
+        Returns:
+            file_hash, page_count, cached page records keyed by page number,
+            page_hashes (None on an exact hit) and the missing page numbers
+        """
+        file_hash = file_sha256(pdf_path)
+        page_count = self.completed_page_count(file_hash, extractor_version)
+        if page_count is not None:
+            cached = self.get_pages(file_hash, extractor_version)
+            if len(cached) >= page_count:
+                logger.info(f"PDF page cache hit: all {page_count} pages of {pdf_path}")
+                return {"file_hash": file_hash, "page_count": page_count, "pages": cached,
+                        "page_hashes": None, "missing_pages": []}
+
+        page_hashes = pdf_page_hashes(pdf_path)
+        cached = self.get_pages(file_hash, extractor_version)
+        unmatched = [page_hash if page_number not in cached else None
+                     for page_number, page_hash in enumerate(page_hashes, 1)]
+        reused = {number: record for number, record in self.match_pages(unmatched, extractor_version).items()
+                  if unmatched[number - 1] is not None}
+        if reused:
+            self.store_pages(file_hash, extractor_version, reused.values(),
+                             page_count=len(page_hashes), source_path=pdf_path)
+            cached.update(reused)
+
+        missing = [number for number in range(1, len(page_hashes) + 1) if number not in cached]
+        logger.info(f"PDF page cache: {len(cached)} of {len(page_hashes)} pages cached "
+                    f"({len(reused)} reused from earlier revisions), {len(missing)} to extract")
+        return {"file_hash": file_hash, "page_count": len(page_hashes), "pages": cached,
+                "page_hashes": page_hashes, "missing_pages": missing}
+
+    def clear(self, file_hash: Optional[str] = None):
+        """Drop cached pages for one file, or the whole cache"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if file_hash:
+                conn.execute("DELETE FROM pdf_page_cache WHERE file_hash = ?", (file_hash,))
+                conn.execute("DELETE FROM pdf_page_cache_files WHERE file_hash = ?", (file_hash,))
+            else:
+                conn.execute("DELETE FROM pdf_page_cache")
+                conn.execute("DELETE FROM pdf_page_cache_files")
+            conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Prompt Cache for Wellspring Batch Submissions
+Content-hash cache of answered OpenAI requests stored in wellspring.db.
+
+Requests are keyed by (model, params, normalized prompt), so re-running a
+prompt generator never pays twice for an identical prompt: cache hits are
+served locally as batch-output lines and only misses are submitted.
+
+Usage:
+    cache = PromptCache()
+    to_submit, cached_lines = cache.prepare_tasks(tasks)
+    ...
+    cache.store_results(result_lines)
+    extra_lines = cache.resolve_pending()
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent / "data" / "wellspring.db"
+
+# Request body fields that carry the prompt rather than generation parameters
+PROMPT_FIELDS = ("messages", "prompt", "input")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: Any) -> Any:
+    """
+    Normalize prompt text so formatting-only differences share a cache entry
+
+    Strings have their whitespace collapsed; chat message lists are
+    normalized message by message.
+    """
+    if isinstance(prompt, str):
+        return _WHITESPACE.sub(" ", prompt).strip()
+    if isinstance(prompt, list):
+        return [normalize_prompt(item) for item in prompt]
+    if isinstance(prompt, dict):
+        return {key: normalize_prompt(value) for key, value in prompt.items()}
+    return prompt
+
+
+def split_request_body(body: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Any]:
+    """Split a request body into (model, params, normalized prompt)"""
+    model = body.get("model", "")
+    prompt = normalize_prompt(next((body[field] for field in PROMPT_FIELDS if field in body), ""))
+    params = {key: value for key, value in body.items() if key != "model" and key not in PROMPT_FIELDS}
+    return model, params, prompt
+
+
+def request_hash(body: Dict[str, Any], endpoint: str = "") -> str:
+    """Content hash of a request keyed by (endpoint, model, params, normalized prompt)"""
+    model, params, prompt = split_request_body(body)
+    payload = json.dumps(
+        {"endpoint": endpoint, "model": model, "params": params, "prompt": prompt},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def prompt_text_hash(prompt: Any) -> str:
+    """
+    Hash of the normalized user prompt text alone, independent of model and params
+
+    For chat message lists only the user messages are hashed, so a bare
+    research prompt matches the chat request that carried it.
+    """
+    if isinstance(prompt, list):
+        prompt = "\n".join(
+            message.get("content", "") for message in prompt
+            if isinstance(message, dict) and message.get("role") == "user"
+        )
+    payload = json.dumps(normalize_prompt(prompt), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PromptCache:
+    """Content-hash cache of answered requests in wellspring.db"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self._initialize_tables()
+
+    def _initialize_tables(self):
+        """Create the cache tables if needed"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS prompt_cache (
+                request_hash TEXT PRIMARY KEY,
+                prompt_hash TEXT,
+                endpoint TEXT,
+                model TEXT,
+                params TEXT,
+                prompt TEXT,
+                response TEXT,
+                created_at TEXT,
+                hit_count INTEGER DEFAULT 0,
+                last_hit_at TEXT
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_prompt_cache_prompt ON prompt_cache (prompt_hash)")
+
+        # Submitted requests awaiting results, including in-batch duplicates
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS prompt_cache_pending (
+                custom_id TEXT PRIMARY KEY,
+                request_hash TEXT,
+                endpoint TEXT,
+                body TEXT,
+                submitted INTEGER DEFAULT 1,
+                created_at TEXT
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_prompt_cache_pending_hash ON prompt_cache_pending (request_hash)")
+
+        conn.commit()
+        conn.close()
+
+    def get(self, body: Dict[str, Any], endpoint: str = "") -> Optional[Dict[str, Any]]:
+        """Get the cached response body for a request, if any"""
+        key = request_hash(body, endpoint)
+        return self.get_many([key]).get(key)
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get cached response bodies for many request hashes, recording hits"""
+        hashes = list(dict.fromkeys(hashes))
+        if not hashes:
+            return {}
+
+        conn = sqlite3.connect(self.db_path)
+        found = {}
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for key, response in conn.execute(
+                f"SELECT request_hash, response FROM prompt_cache WHERE request_hash IN ({placeholders})", chunk
+            ):
+                found[key] = json.loads(response)
+
+        if found:
+            conn.executemany(
+                "UPDATE prompt_cache SET hit_count = hit_count + 1, last_hit_at = ? WHERE request_hash = ?",
+                [(datetime.now().isoformat(), key) for key in found]
+            )
+            conn.commit()
+        conn.close()
+        return found
+
+    def put(self, body: Dict[str, Any], response: Dict[str, Any], endpoint: str = ""):
+        """Cache the response body for a request"""
+        self.put_many([(body, response, endpoint)])
+
+    def put_many(self, entries: Iterable[Tuple[Dict[str, Any], Dict[str, Any], str]]):
+        """Cache many (request body, response body, endpoint) entries"""
+        now = datetime.now().isoformat()
+        rows = []
+        for body, response, endpoint in entries:
+            model, params, prompt = split_request_body(body)
+            rows.append((
+                request_hash(body, endpoint), prompt_text_hash(prompt), endpoint, model,
+                json.dumps(params, sort_keys=True), json.dumps(prompt, ensure_ascii=False),
+                json.dumps(response, ensure_ascii=False), now
+            ))
+
+        if not rows:
+            return
+
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("""
+            INSERT OR REPLACE INTO prompt_cache
+            (request_hash, prompt_hash, endpoint, model, params, prompt, response, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+        conn.close()
+
+    def invalidate(self, body: Dict[str, Any], endpoint: str = ""):
+        """Drop the cached response for a request"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM prompt_cache WHERE request_hash = ?", (request_hash(body, endpoint),))
+        conn.commit()
+        conn.close()
+
+    def is_prompt_answered(self, prompt: Any) -> bool:
+        """Check whether a prompt has been answered under any model or params"""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute("SELECT 1 FROM prompt_cache WHERE prompt_hash = ? LIMIT 1",
+                           (prompt_text_hash(prompt),)).fetchone()
+        conn.close()
+        return row is not None
+
+    def prepare_tasks(self, tasks: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split Batch API tasks into cache misses to submit and locally served hits
+
+        Misses are deduplicated by request hash; duplicates are recorded as
+        pending and answered from the cache once the submitted copy returns.
+
+        Args:
+            tasks: Batch API tasks with custom_id, url and body
+
+        Returns:
+            Tuple of (tasks to submit, cached results as batch output lines)
+        """
+        hashes = [request_hash(task["body"], task.get("url", "")) for task in tasks]
+        cached = self.get_many(hashes)
+
+        to_submit = []
+        cached_lines = []
+        pending_rows = []
+        submitted_hashes = set()
+        now = datetime.now().isoformat()
+
+        for task, key in zip(tasks, hashes):
+            if key in cached:
+                cached_lines.append(self._result_line(task["custom_id"], cached[key]))
+                continue
+
+            submitted = key not in submitted_hashes
+            if submitted:
+                submitted_hashes.add(key)
+                to_submit.append(task)
+            pending_rows.append((task["custom_id"], key, task.get("url", ""),
+                                 json.dumps(task["body"], ensure_ascii=False), int(submitted), now))
+
+        if pending_rows:
+            conn = sqlite3.connect(self.db_path)
+            conn.executemany("INSERT OR REPLACE INTO prompt_cache_pending VALUES (?, ?, ?, ?, ?, ?)", pending_rows)
+            conn.commit()
+            conn.close()
+
+        logger.info(f"Prompt cache: {len(cached_lines)} hit(s), {len(to_submit)} to submit, "
+                    f"{len(pending_rows) - len(to_submit)} duplicate(s) deferred")
+        return to_submit, cached_lines
+
+    def store_results(self, results: Iterable[Dict[str, Any]]) -> int:
+        """
+        Cache successful batch output lines that answer pending requests
+
+        Args:
+            results: Batch output lines (custom_id, response, error)
+
+        Returns:
+            Number of responses cached
+        """
+        responses = {}
+        for result in results:
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200 or result.get("cached"):
+                continue
+            responses[result.get("custom_id")] = response.get("body", {})
+
+        if not responses:
+            return 0
+
+        conn = sqlite3.connect(self.db_path)
+        custom_ids = list(responses)
+        placeholders = ",".join("?" * len(custom_ids))
+        pending = conn.execute(
+            f"SELECT custom_id, endpoint, body FROM prompt_cache_pending WHERE custom_id IN ({placeholders})",
+            custom_ids
+        ).fetchall()
+        conn.execute(f"DELETE FROM prompt_cache_pending WHERE custom_id IN ({placeholders})", custom_ids)
+        conn.commit()
+        conn.close()
+
+        self.put_many((json.loads(body), responses[custom_id], endpoint) for custom_id, endpoint, body in pending)
+        return len(pending)
+
+    def resolve_pending(self) -> List[Dict[str, Any]]:
+        """
+        Answer deferred duplicate requests whose submitted copy is now cached
+
+        Returns:
+            Cached results as batch output lines
+        """
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("""
+            SELECT p.custom_id, c.response
+            FROM prompt_cache_pending p
+            JOIN prompt_cache c ON c.request_hash = p.request_hash
+            WHERE p.submitted = 0
+        """).fetchall()
+
+        if rows:
+            conn.executemany("DELETE FROM prompt_cache_pending WHERE custom_id = ?",
+                             [(custom_id,) for custom_id, _ in rows])
+            conn.commit()
+        conn.close()
+
+        return [self._result_line(custom_id, json.loads(response)) for custom_id, response in rows]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache size and hit statistics"""
+        conn = sqlite3.connect(self.db_path)
+        entries, hits = conn.execute("SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM prompt_cache").fetchone()
+        pending = conn.execute("SELECT COUNT(*) FROM prompt_cache_pending").fetchone()[0]
+        conn.close()
+        return {"entries": entries, "total_hits": hits, "pending": pending}
+
+    @staticmethod
+    def _result_line(custom_id: str, response_body: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a batch output line for a locally served response"""
+        return {
+            "id": f"cached_{custom_id}",
+            "custom_id": custom_id,
+            "response": {"status_code": 200, "body": response_body},
+            "error": None,
+            "cached": True
+        }
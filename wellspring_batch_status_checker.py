@@ -11,6 +11,8 @@ import json
 from datetime import datetime
 from pathlib import Path
 
+from shared_utils.batch_registry import BatchRegistry
+
 def load_env_vars():
     """Load environment variables from .env file"""
     env_file = Path('.env')
@@ -42,14 +44,18 @@ def check_all_batches():
     print(f"✅ API Key loaded: {api_key[:20]}...{api_key[-8:]}")
     print()
     
-    # Initialize OpenAI client
+    # Initialize OpenAI client; statuses are served from the shared batch registry cache
     client = openai.OpenAI(api_key=api_key)
+    registry = BatchRegistry(client)
     
     try:
         print("🔍 Fetching recent batch jobs...")
-        batches = client.batches.list(limit=20)
+        registry.refresh_listing(limit=20)
+        registry.refresh_stale()
+        batches = registry.list_batches(limit=20, refresh=False)
+        print(f"💾 Registry cache used ({registry.api_calls} API call(s) this check)")
         
-        if not batches.data:
+        if not batches:
             print("📭 No batch jobs found!")
             print("⚠️  This means either:")
             print("   - No Wellspring TOC batch was submitted")
@@ -57,42 +63,46 @@ def check_all_batches():
             print("   - There was an error during submission")
             return
         
-        print(f"📊 Found {len(batches.data)} recent batch job(s)")
+        print(f"📊 Found {len(batches)} recent batch job(s)")
         print("=" * 60)
         
         wellspring_batches = []
         
-        for i, batch in enumerate(batches.data):
-            created = datetime.fromtimestamp(batch.created_at)
+        for i, batch in enumerate(batches):
+            created = datetime.fromtimestamp(batch['created_at'])
             
             # Check if this might be a Wellspring batch
             description = ""
-            if hasattr(batch, 'metadata') and batch.metadata:
-                description = batch.metadata.get('description', 'No description')
+            if batch['metadata']:
+                description = batch['metadata'].get('description', 'No description')
             
             is_wellspring = any(keyword in description.lower() for keyword in 
                               ['wellspring', 'toc', 'table', 'contents', 'icon'])
             
+            counts = batch['request_counts']
+            
             print(f"📋 Batch #{i+1}:")
-            print(f"   🆔 ID: {batch.id}")
+            print(f"   🆔 ID: {batch['id']}")
             print(f"   📅 Created: {created.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"   📊 Status: {batch.status.upper()}")
+            print(f"   📊 Status: {batch['status'].upper()}")
             print(f"   📝 Description: {description}")
             
-            if batch.status == 'completed':
-                print(f"   ✅ Completed at: {datetime.fromtimestamp(batch.completed_at).strftime('%Y-%m-%d %H:%M:%S')}")
-                if hasattr(batch, 'request_counts'):
-                    print(f"   📈 Requests: {batch.request_counts.total} total, {batch.request_counts.completed} completed")
-                if hasattr(batch, 'output_file_id'):
-                    print(f"   📁 Output file: {batch.output_file_id}")
-            elif batch.status == 'failed':
-                print(f"   ❌ Failed at: {datetime.fromtimestamp(batch.failed_at).strftime('%Y-%m-%d %H:%M:%S')}")
-                if hasattr(batch, 'errors'):
-                    print(f"   🚨 Errors: {batch.errors}")
-            elif batch.status == 'in_progress':
+            if batch['status'] == 'completed':
+                print(f"   ✅ Completed at: {datetime.fromtimestamp(batch['completed_at']).strftime('%Y-%m-%d %H:%M:%S')}")
+                if counts:
+                    print(f"   📈 Requests: {counts['total']} total, {counts['completed']} completed")
+                if batch['output_file_id']:
+                    print(f"   📁 Output file: {batch['output_file_id']}")
+            elif batch['status'] == 'failed':
+                print(f"   ❌ Failed at: {datetime.fromtimestamp(batch['failed_at']).strftime('%Y-%m-%d %H:%M:%S')}")
+                if batch['errors']:
+                    print(f"   🚨 Errors: {batch['errors']}")
+            elif batch['status'] == 'in_progress':
                 print(f"   ⏳ In progress...")
-                if hasattr(batch, 'request_counts'):
-                    print(f"   📈 Progress: {batch.request_counts.completed}/{batch.request_counts.total}")
+                if counts:
+                    print(f"   📈 Progress: {counts['completed']}/{counts['total']}")
+                if batch['eta_seconds']:
+                    print(f"   🕒 ETA: ~{batch['eta_seconds'] // 60} min")
             
             if is_wellspring:
                 wellspring_batches.append(batch)
@@ -106,20 +116,20 @@ def check_all_batches():
             print("=" * 60)
             
             for batch in wellspring_batches:
-                print(f"🎨 Wellspring Batch: {batch.id}")
-                print(f"   Status: {batch.status.upper()}")
+                print(f"🎨 Wellspring Batch: {batch['id']}")
+                print(f"   Status: {batch['status'].upper()}")
                 
-                if batch.status == 'completed':
+                if batch['status'] == 'completed':
                     print("   ✅ BATCH COMPLETED! Ready to download results.")
-                    if hasattr(batch, 'output_file_id'):
-                        print(f"   📁 Output file ID: {batch.output_file_id}")
+                    if batch['output_file_id']:
+                        print(f"   📁 Output file ID: {batch['output_file_id']}")
                         download_results(client, batch)
-                elif batch.status == 'failed':
+                elif batch['status'] == 'failed':
                     print("   ❌ BATCH FAILED! Check error details above.")
-                elif batch.status == 'in_progress':
+                elif batch['status'] == 'in_progress':
                     print("   ⏳ BATCH RUNNING! Check back in a few minutes.")
                 else:
-                    print(f"   📋 Current status: {batch.status}")
+                    print(f"   📋 Current status: {batch['status']}")
         else:
             print("🤔 NO WELLSPRING TOC BATCHES FOUND")
             print("This suggests the batch may not have been submitted successfully.")
@@ -132,19 +142,19 @@ def check_all_batches():
         print("   - OpenAI API service issues")
 
 def download_results(client, batch):
-    """Download and save batch results"""
+    """Download and save batch results for a batch registry entry"""
     try:
-        print(f"📥 Downloading results for batch {batch.id}...")
+        print(f"📥 Downloading results for batch {batch['id']}...")
         
         # Create results directory
         results_dir = Path("wellspring_toc_batch_results")
         results_dir.mkdir(exist_ok=True)
         
         # Download output file
-        if hasattr(batch, 'output_file_id') and batch.output_file_id:
-            output_content = client.files.content(batch.output_file_id)
+        if batch['output_file_id']:
+            output_content = client.files.content(batch['output_file_id'])
             
-            output_file = results_dir / f"batch_{batch.id}_results.jsonl"
+            output_file = results_dir / f"batch_{batch['id']}_results.jsonl"
             with open(output_file, 'wb') as f:
                 f.write(output_content.content)
             
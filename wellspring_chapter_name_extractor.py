@@ -13,13 +13,63 @@ Approaches:
 4. Create organized list for icon generation
 """
 
-import zipfile
-import xml.etree.ElementTree as ET
 from pathlib import Path
 import re
 import json
 from datetime import datetime
 
+from wellspring_idml_model import load_idml_document
+
+# One pass per line finds chapter, part and numbered headings anywhere in the line
+CHAPTER_MATCHER = re.compile(
+    r'(?:(?:chapter|part)\s+(?P<number>\d+)[:\s]*|(?P<list_number>\d+)\.\s*)(?P<title>.+?)$',
+    re.IGNORECASE
+)
+
+# Numbered subsections, "Section ..." lines and heading-like lines, in that order of preference
+SECTION_MATCHER = re.compile(
+    r'^(?:[0-9]+\.[0-9]+\s+(?P<numbered>.+?)|Section\s+(?P<section>.+?)|(?P<heading>[A-Z][^.!?]*[.!?]?))\s*$'
+)
+
+YEAR_PATTERN = re.compile(r'\d{4}')
+
+
+def scan_paragraphs(paragraphs):
+    """
+    Find chapter and section names in a story's paragraphs
+    
+    Returns:
+        (chapters, sections) - sets of names
+    """
+    chapters = set()
+    sections = set()
+    
+    for paragraph in paragraphs:
+        for line in paragraph.splitlines():
+            # Look for chapter titles
+            for match in CHAPTER_MATCHER.finditer(line):
+                chapter_title = match.group('title').strip()
+                chapter_num = match.group('number') or match.group('list_number')
+                if chapter_title and len(chapter_title) > 3:
+                    chapters.add(f"Chapter {chapter_num}: {chapter_title}")
+            
+            # Look for section headings, skipping very short or very long lines
+            line = line.strip()
+            if len(line) < 5 or len(line) > 100:
+                continue
+            
+            match = SECTION_MATCHER.match(line)
+            if match:
+                section_title = (match.group('numbered') or match.group('section')
+                                 or match.group('heading')).strip()
+                if (section_title and
+                    not YEAR_PATTERN.search(section_title) and  # Skip years/dates
+                    not section_title.lower().startswith('page') and
+                    len(section_title.split()) <= 8):  # Reasonable length
+                    sections.add(section_title)
+    
+    return chapters, sections
+
 class WellspringChapterNameExtractor:
     """Extract chapter and section names from the manuscript"""
     
@@ -41,81 +91,31 @@ class WellspringChapterNameExtractor:
             return False
             
         try:
-            with zipfile.ZipFile(self.manuscript_path, 'r') as idml_zip:
-                # Get all story files
-                story_files = [f for f in idml_zip.namelist() if f.startswith('Stories/')]
-                
-                print(f"📄 Found {len(story_files)} story files to scan")
-                print("")
-                
-                chapter_patterns = [
-                    r'Chapter\s+(\d+)[:\s]*(.+?)(?:\n|$)',
-                    r'CHAPTER\s+(\d+)[:\s]*(.+?)(?:\n|$)', 
-                    r'(\d+)\.\s*(.+?)(?:\n|$)',
-                    r'Part\s+(\d+)[:\s]*(.+?)(?:\n|$)',
-                ]
-                
-                section_patterns = [
-                    r'^([A-Z][^.!?]*[.!?]?)\s*$',  # Lines that look like headings
-                    r'Section\s+(.+?)(?:\n|$)',
-                    r'[0-9]+\.[0-9]+\s+(.+?)(?:\n|$)',  # Numbered subsections
-                ]
-                
-                found_chapters = set()
-                found_sections = set()
-                
-                for story_file in story_files:
-                    try:
-                        # Read and decode story content
-                        content = idml_zip.read(story_file).decode('utf-8', errors='ignore')
-                        
-                        # Look for chapter titles
-                        for pattern in chapter_patterns:
-                            matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-                            for match in matches:
-                                if len(match.groups()) == 2:
-                                    chapter_num = match.group(1)
-                                    chapter_title = match.group(2).strip()
-                                else:
-                                    chapter_title = match.group(1).strip()
-                                    chapter_num = len(found_chapters) + 1
-                                
-                                if chapter_title and len(chapter_title) > 3:
-                                    chapter_name = f"Chapter {chapter_num}: {chapter_title}"
-                                    found_chapters.add(chapter_name)
-                        
-                        # Look for section headings
-                        lines = content.split('\n')
-                        for line in lines:
-                            line = line.strip()
-                            
-                            # Skip very short or very long lines
-                            if len(line) < 5 or len(line) > 100:
-                                continue
-                                
-                            # Look for section-like content
-                            for pattern in section_patterns:
-                                match = re.match(pattern, line)
-                                if match:
-                                    section_title = match.group(1).strip()
-                                    if (section_title and 
-                                        not re.search(r'\d{4}', section_title) and  # Skip years/dates
-                                        not section_title.lower().startswith('page') and
-                                        len(section_title.split()) <= 8):  # Reasonable length
-                                        found_sections.add(section_title)
-                        
-                    except Exception as e:
-                        print(f"⚠️  Error processing {story_file}: {e}")
-                        continue
-                
-                # Convert to sorted lists
-                self.chapters = sorted(list(found_chapters))
-                self.sections = sorted(list(found_sections))
-                
-                print(f"✅ Found {len(self.chapters)} chapters")
-                print(f"✅ Found {len(self.sections)} sections")
-                
-                return True
+            # The shared model streams stories once (in parallel) and is reused by the formatters
+            document = load_idml_document(self.manuscript_path)
+            
+            print(f"📄 Found {len(document.stories)} story files to scan")
+            print("")
+            
+            found_chapters = set()
+            found_sections = set()
+            
+            for story_file, paragraphs in document.story_text.items():
+                chapters, sections = scan_paragraphs(paragraphs)
+                found_chapters.update(chapters)
+                found_sections.update(sections)
+            
+            for story_file, error in document.story_errors.items():
+                print(f"⚠️  Error processing {story_file}: {error}")
+            
+            # Convert to sorted lists
+            self.chapters = sorted(list(found_chapters))
+            self.sections = sorted(list(found_sections))
+            
+            print(f"✅ Found {len(self.chapters)} chapters")
+            print(f"✅ Found {len(self.sections)} sections")
+            
+            return True
                 
         except Exception as e:
             print(f"❌ Error extracting from IDML: {e}")
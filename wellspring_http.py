@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Wellspring HTTP Utilities
+=========================
+
+Shared connection-pooled HTTP session and streaming download helpers for
+image fetching.
+
+- One keep-alive `requests.Session` per process, so repeated fetches reuse
+  TCP/TLS connections
+- Downloads stream to a temp file in chunks, are checked against
+  Content-Length and an optional SHA-256, then moved into place
+- Base64 `b64_json` payloads are decoded chunk by chunk straight into the
+  file, without a full-size decoded copy in memory
+"""
+
+import base64
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Base64 chunks must be a multiple of 4 characters to decode independently
+B64_CHUNK_CHARS = 4 * 64 * 1024
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+class ChecksumError(IOError):
+    """Downloaded content did not match its expected size or checksum"""
+
+
+def get_http_session(pool_size: int = 16) -> requests.Session:
+    """Get the shared keep-alive session, creating it on first use"""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                retry = Retry(total=3, backoff_factor=1.0, status_forcelist=(429, 500, 502, 503, 504),
+                              allowed_methods=("GET", "HEAD"))
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _SESSION = session
+    return _SESSION
+
+
+def file_sha256(filepath: Path) -> str:
+    """SHA-256 of a file on disk, read in chunks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_file(filepath: Path, expected_sha256: Optional[str]) -> bool:
+    """True if the file exists and, when a checksum is given, matches it"""
+    filepath = Path(filepath)
+    if not filepath.is_file():
+        return False
+    return expected_sha256 is None or file_sha256(filepath) == expected_sha256
+
+
+def _finalize(partial_path: Path, filepath: Path, digest, size: int,
+              expected_size: Optional[int], expected_sha256: Optional[str]) -> Dict[str, Any]:
+    """Check size and checksum of a written temp file, then move it into place"""
+    sha256 = digest.hexdigest()
+    if expected_size is not None and size != expected_size:
+        partial_path.unlink(missing_ok=True)
+        raise ChecksumError(f"Expected {expected_size} bytes, received {size}")
+    if expected_sha256 and sha256 != expected_sha256:
+        partial_path.unlink(missing_ok=True)
+        raise ChecksumError(f"Checksum mismatch for {filepath.name}")
+
+    partial_path.replace(filepath)
+    return {"filepath": str(filepath), "bytes": size, "sha256": sha256}
+
+
+def download_to_file(url: str, filepath: Path, expected_sha256: Optional[str] = None,
+                     session: Optional[requests.Session] = None, timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Stream a URL to disk through the shared session
+
+    Args:
+        url: URL to download
+        filepath: Destination path
+        expected_sha256: Optional checksum the content must match
+        session: Session to use instead of the shared one
+        timeout: Connect/read timeout in seconds
+
+    Returns:
+        Dict with filepath, bytes and sha256
+    """
+    filepath = Path(filepath)
+    partial_path = filepath.with_suffix(filepath.suffix + ".part")
+    digest = hashlib.sha256()
+    size = 0
+
+    with (session or get_http_session()).get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        content_length = response.headers.get("Content-Length")
+        expected_size = int(content_length) if content_length and "Content-Encoding" not in response.headers else None
+
+        with open(partial_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+
+    return _finalize(partial_path, filepath, digest, size, expected_size, expected_sha256)
+
+
+async def async_download_to_file(http: Any, url: str, filepath: Path,
+                                 expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Stream a URL to disk with a pooled httpx.AsyncClient
+
+    Args:
+        http: httpx.AsyncClient to download with
+        url: URL to download
+        filepath: Destination path
+        expected_sha256: Optional checksum the content must match
+
+    Returns:
+        Dict with filepath, bytes and sha256
+    """
+    filepath = Path(filepath)
+    partial_path = filepath.with_suffix(filepath.suffix + ".part")
+    digest = hashlib.sha256()
+    size = 0
+
+    async with http.stream("GET", url) as response:
+        response.raise_for_status()
+        content_length = response.headers.get("Content-Length")
+        expected_size = int(content_length) if content_length and "Content-Encoding" not in response.headers else None
+
+        with open(partial_path, 'wb') as f:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+
+    return _finalize(partial_path, filepath, digest, size, expected_size, expected_sha256)
+
+
+def decode_b64_to_file(b64_data: str, filepath: Path, expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Decode a base64 payload straight into a file, one chunk at a time
+
+    Args:
+        b64_data: Base64-encoded content (e.g. an images API `b64_json` field)
+        filepath: Destination path
+        expected_sha256: Optional checksum the decoded content must match
+
+    Returns:
+        Dict with filepath, bytes and sha256
+    """
+    filepath = Path(filepath)
+    partial_path = filepath.with_suffix(filepath.suffix + ".part")
+    digest = hashlib.sha256()
+    size = 0
+
+    with open(partial_path, 'wb') as f:
+        for start in range(0, len(b64_data), B64_CHUNK_CHARS):
+            chunk = base64.b64decode(b64_data[start:start + B64_CHUNK_CHARS])
+            f.write(chunk)
+            digest.update(chunk)
+            size += len(chunk)
+
+    return _finalize(partial_path, filepath, digest, size, None, expected_sha256)
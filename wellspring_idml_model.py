@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Wellspring IDML Document Model
+==============================
+
+One parsed view of an IDML package shared by the formatters and the chapter
+name extractor, so a full-book structure analysis reads the package once.
+
+The model lists spreads and stories, and lazily builds the paragraph style
+catalogue and a story -> paragraph text index (stories are streamed with
+iterparse in parallel worker processes, keeping only <Content> runs).
+
+Documents are memoized per path by modification time and size, and by
+content hash: a touched but unchanged file is reused in-process, and the
+built indexes are saved under output/idml_model_cache so other scripts
+reading the same package revision skip parsing entirely.
+
+Usage:
+    document = load_idml_document("docs/The-Wellspring-Book.idml")
+    print(document.structure())
+    for story_file, paragraphs in document.story_text.items():
+        ...
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from threading import Lock
+
+# Bump when the cached index format or paragraph splitting changes
+MODEL_VERSION = 1
+
+CACHE_DIR = Path(__file__).parent / "output" / "idml_model_cache"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_documents = {}
+_documents_lock = Lock()
+
+
+def _local_name(tag):
+    """Element tag without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_story_paragraphs(story_stream):
+    """
+    Stream the paragraphs of an IDML story
+
+    Only <Content> text runs are kept; a paragraph ends at each <Br/> and at
+    the end of each ParagraphStyleRange. Elements are cleared as soon as they
+    are read, so the story markup is never held in memory.
+
+    Args:
+        story_stream: Binary file-like object with the story XML
+
+    Yields:
+        Paragraph text
+    """
+    runs = []
+    for _, element in ET.iterparse(story_stream, events=('end',)):
+        name = _local_name(element.tag)
+        if name == 'Content':
+            if element.text:
+                runs.append(element.text)
+        elif name == 'Br' or name == 'ParagraphStyleRange':
+            if runs:
+                yield ''.join(runs)
+                runs = []
+            element.clear()
+    if runs:
+        yield ''.join(runs)
+
+
+def read_story(idml_path, story_file):
+    """
+    Paragraphs of one story
+
+    Runs in a worker process, so it opens the IDML package itself.
+
+    Returns:
+        (paragraphs, error) - the paragraphs read, and an error message or None
+    """
+    paragraphs = []
+    try:
+        with zipfile.ZipFile(idml_path, 'r') as idml_zip, idml_zip.open(story_file) as story_stream:
+            for paragraph in iter_story_paragraphs(story_stream):
+                paragraphs.append(paragraph)
+    except Exception as e:
+        return paragraphs, str(e)
+    return paragraphs, None
+
+
+def file_sha256(path):
+    """Streaming SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IDMLDocument:
+    """Parsed IDML package: file lists up front, styles and story text on first use"""
+
+    def __init__(self, path, sha256=None):
+        self.path = Path(path)
+        stat = self.path.stat()
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.sha256 = sha256 or file_sha256(self.path)
+
+        with zipfile.ZipFile(self.path, 'r') as idml_zip:
+            self.file_list = idml_zip.namelist()
+
+        self.spreads = [f for f in self.file_list if f.startswith('Spreads/')]
+        self.stories = [f for f in self.file_list if f.startswith('Stories/')]
+        self.story_errors = {}
+        self._styles = None
+        self._story_text = None
+        self._lock = Lock()
+        self._load_cached_indexes()
+
+    @property
+    def cache_path(self):
+        """On-disk index cache for this package revision"""
+        return CACHE_DIR / f"{self.sha256}.json"
+
+    def _load_cached_indexes(self):
+        """Reuse indexes built by an earlier run for the same content hash"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cached.get('model_version') == MODEL_VERSION:
+            self._styles = cached.get('styles')
+            self._story_text = cached.get('story_text')
+
+    def _save_cached_indexes(self):
+        """Persist the built indexes for other scripts and later runs"""
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            partial_path = self.cache_path.with_suffix('.json.partial')
+            with open(partial_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'model_version': MODEL_VERSION,
+                    'source': str(self.path),
+                    'styles': self._styles,
+                    # Partially read stories would be reused as if complete, so only clean reads are cached
+                    'story_text': None if self.story_errors else self._story_text
+                }, f, ensure_ascii=False)
+            os.replace(partial_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️  Could not cache IDML model: {e}")
+
+    @property
+    def has_styles(self):
+        return 'Resources/Styles.xml' in self.file_list
+
+    @property
+    def has_fonts(self):
+        return 'Resources/Fonts.xml' in self.file_list
+
+    @property
+    def styles(self):
+        """Paragraph and character style names from Resources/Styles.xml"""
+        with self._lock:
+            if self._styles is None:
+                self._styles = {'paragraph': [], 'character': []}
+                if self.has_styles:
+                    with zipfile.ZipFile(self.path, 'r') as idml_zip, \
+                            idml_zip.open('Resources/Styles.xml') as styles_stream:
+                        for _, element in ET.iterparse(styles_stream, events=('end',)):
+                            name = _local_name(element.tag)
+                            if name in ('ParagraphStyle', 'CharacterStyle'):
+                                kind = 'paragraph' if name == 'ParagraphStyle' else 'character'
+                                self._styles[kind].append(element.get('Name') or element.get('Self'))
+                                element.clear()
+                self._save_cached_indexes()
+            return self._styles
+
+    @property
+    def story_text(self):
+        """Story file -> paragraph texts, built once with stories read in parallel"""
+        with self._lock:
+            if self._story_text is None:
+                self._story_text = {}
+                if self.stories:
+                    workers = max(1, min(os.cpu_count() or 1, len(self.stories)))
+                    chunksize = max(1, len(self.stories) // (workers * 4))
+                    with ProcessPoolExecutor(max_workers=workers) as executor:
+                        reads = executor.map(read_story, [str(self.path)] * len(self.stories),
+                                             self.stories, chunksize=chunksize)
+                        for story_file, (paragraphs, error) in zip(self.stories, reads):
+                            self._story_text[story_file] = paragraphs
+                            if error:
+                                self.story_errors[story_file] = error
+                self._save_cached_indexes()
+            return self._story_text
+
+    def iter_paragraphs(self):
+        """(story file, paragraph) pairs across the whole package"""
+        for story_file, paragraphs in self.story_text.items():
+            for paragraph in paragraphs:
+                yield story_file, paragraph
+
+    def stories_matching(self, pattern):
+        """Story files with at least one paragraph matching a compiled regex"""
+        return [story_file for story_file, paragraphs in self.story_text.items()
+                if any(pattern.search(paragraph) for paragraph in paragraphs)]
+
+    def structure(self):
+        """File, spread and story counts plus resource availability"""
+        return {
+            'files': len(self.file_list),
+            'spreads': len(self.spreads),
+            'stories': len(self.stories),
+            'styles': self.has_styles,
+            'fonts': self.has_fonts
+        }
+
+
+def load_idml_document(path):
+    """
+    Shared IDML model for a package, parsed at most once per revision
+
+    A cached document is reused while the file's modification time and size
+    are unchanged; otherwise the file is hashed and the cached document is
+    still reused if the content is identical.
+
+    Args:
+        path: IDML package path
+
+    Returns:
+        IDMLDocument
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+
+    with _documents_lock:
+        document = _documents.get(path)
+        if document and (document.mtime_ns, document.size) == (stat.st_mtime_ns, stat.st_size):
+            return document
+
+        sha256 = file_sha256(path)
+        if document and document.sha256 == sha256:
+            document.mtime_ns, document.size = stat.st_mtime_ns, stat.st_size
+            return document
+
+        document = IDMLDocument(path, sha256=sha256)
+        _documents[path] = document
+        return document
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Wellspring Image Generation Scheduler
+=====================================
+
+Async worker pool for generating DALL-E images concurrently while staying
+inside the account's requests-per-minute limit.
+
+- Token-bucket rate limiter shared by all workers
+- Retry with exponential backoff (honoring Retry-After) on 429 and 5xx
+- Downloads run in parallel with generation, streamed to disk over a
+  pooled client and checked against Content-Length; `b64_json` payloads are
+  decoded into the file
+- Each result is appended to a JSONL progress log with the file's SHA-256 as
+  it completes. Freshly generated images have no known checksum to check
+  against, so the recorded one is verified when a resumed run reuses a file,
+  and files that no longer match are generated again
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import openai
+
+from wellspring_http import async_download_to_file, decode_b64_to_file, verify_file
+
+# DALL-E 3 limits are per minute; tier 1 accounts get 5 images/minute
+DEFAULT_REQUESTS_PER_MINUTE = 5
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_DOWNLOADS = 8
+DEFAULT_MAX_RETRIES = 5
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError,
+                    openai.InternalServerError)
+
+
+class TokenBucket:
+    """Async token bucket: refills at `rate_per_minute`, holds up to `capacity` tokens"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate_per_second)
+
+    def penalize(self, seconds: float):
+        """Drain the bucket so no request starts for roughly `seconds` (after a 429)"""
+        self.tokens = min(self.tokens, 1 - seconds * self.rate_per_second)
+        self.updated_at = time.monotonic()
+
+
+@dataclass
+class ImageJob:
+    """One image to generate"""
+    job_id: str
+    prompt: str
+    filepath: Path
+    params: Dict[str, Any] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class ImageGenerationScheduler:
+    """Generate many images concurrently under a requests-per-minute budget"""
+
+    def __init__(self, api_key: Optional[str] = None,
+                 requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_downloads: int = DEFAULT_MAX_DOWNLOADS,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_backoff: float = 2.0,
+                 progress_file: Optional[Path] = None):
+        self.api_key = api_key
+        self.rate_limiter = TokenBucket(requests_per_minute)
+        self.max_workers = max_workers
+        self.max_downloads = max_downloads
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.progress_file = Path(progress_file) if progress_file else None
+
+    def completed_job_ids(self) -> set:
+        """Job ids recorded as successful in the progress log whose files still match their checksum"""
+        completed = set()
+        if not self.progress_file or not self.progress_file.exists():
+            return completed
+
+        with open(self.progress_file, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get("status") == "success" and verify_file(record.get("filepath", ""), record.get("sha256")):
+                    completed.add(record["job_id"])
+        return completed
+
+    async def run(self, jobs: List[ImageJob],
+                  on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Generate and download all jobs, skipping ones already finished
+
+        Args:
+            jobs: Images to generate
+            on_result: Called with each result record as soon as it completes
+
+        Returns:
+            Result records for the jobs processed in this run
+        """
+        completed = self.completed_job_ids()
+        pending = [job for job in jobs if job.job_id not in completed]
+
+        # A file without a matching success record is truncated, corrupted or unrecorded
+        for job in pending:
+            Path(job.filepath).unlink(missing_ok=True)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for job in pending:
+            queue.put_nowait(job)
+
+        results = []
+        download_slots = asyncio.Semaphore(self.max_downloads)
+
+        def record(result: Dict[str, Any]):
+            result["timestamp"] = datetime.now().isoformat()
+            results.append(result)
+            if self.progress_file:
+                with open(self.progress_file, 'a') as f:
+                    f.write(json.dumps(result) + '\n')
+            if on_result:
+                on_result(result)
+
+        limits = httpx.Limits(max_connections=self.max_downloads, max_keepalive_connections=self.max_downloads)
+        async with openai.AsyncOpenAI(api_key=self.api_key) as client, \
+                httpx.AsyncClient(timeout=60.0, follow_redirects=True, limits=limits) as http:
+
+            async def worker():
+                while True:
+                    try:
+                        job = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    record(await self._process_job(client, http, download_slots, job))
+
+            await asyncio.gather(*(worker() for _ in range(min(self.max_workers, len(pending)) or 1)))
+
+        return results
+
+    async def _process_job(self, client: openai.AsyncOpenAI, http: httpx.AsyncClient,
+                           download_slots: asyncio.Semaphore, job: ImageJob) -> Dict[str, Any]:
+        """Generate one image with retries, then download it"""
+        base_result = {"job_id": job.job_id, "filepath": str(job.filepath), **job.metadata}
+
+        try:
+            response = await self._generate_with_retries(client, job)
+        except Exception as e:
+            return {**base_result, "status": "generation_failed", "error": str(e)}
+
+        image = response.data[0]
+        image_url = getattr(image, "url", None)
+        try:
+            if getattr(image, "b64_json", None):
+                file_info = await asyncio.to_thread(decode_b64_to_file, image.b64_json, job.filepath)
+            else:
+                async with download_slots:
+                    file_info = await async_download_to_file(http, image_url, job.filepath)
+        except Exception as e:
+            return {**base_result, "status": "download_failed", "url": image_url, "error": str(e)}
+
+        return {**base_result, "status": "success", "url": image_url, "prompt": job.prompt,
+                "bytes": file_info["bytes"], "sha256": file_info["sha256"]}
+
+    async def _generate_with_retries(self, client: openai.AsyncOpenAI, job: ImageJob):
+        """Call images.generate, retrying 429/5xx/connection errors with backoff"""
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            try:
+                return await client.images.generate(prompt=job.prompt, **job.params)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+
+                delay = self._retry_delay(e, attempt)
+                if isinstance(e, openai.RateLimitError):
+                    self.rate_limiter.penalize(delay)
+                print(f"   ⏳ {job.job_id}: {type(e).__name__}, retrying in {delay:.1f}s "
+                      f"({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Retry-After when the server sends one, otherwise exponential backoff with jitter"""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.base_backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
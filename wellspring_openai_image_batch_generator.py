@@ -16,7 +16,11 @@ from pathlib import Path
 import time
 from datetime import datetime
 import base64
-import requests
+import shutil
+
+from shared_utils.batch_registry import BatchRegistry
+from shared_utils.prompt_cache import PromptCache
+from wellspring_http import decode_b64_to_file, download_to_file, verify_file
 
 class WellspringOpenAIBatchGenerator:
     """Generate professional chapter images using OpenAI 4o batch processing"""
@@ -35,6 +39,12 @@ class WellspringOpenAIBatchGenerator:
         # OpenAI setup
         self.client = openai.OpenAI()
         
+        # Previously generated images are served from the prompt cache
+        self.prompt_cache = PromptCache()
+        
+        # Batch statuses are cached in the shared registry
+        self.batch_registry = BatchRegistry(self.client)
+        
         # Style guide based on actual "Setting the Vision" reference
         self.style_prompt_base = """
         Create a professional chapter cover image in the exact style of vintage leather-bound manuscripts with ornate gold details.
@@ -189,6 +199,9 @@ class WellspringOpenAIBatchGenerator:
                         "prompt_length": len(prompt)
                     })
         
+        # Serve already-generated images locally; only misses are submitted
+        batch_requests, cached_count = self.apply_prompt_cache(batch_requests)
+        
         # Save batch file
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         batch_file = self.prompts_dir / f"wellspring_batch_{timestamp}.jsonl"
@@ -203,17 +216,51 @@ class WellspringOpenAIBatchGenerator:
             json.dump({
                 "created_at": timestamp,
                 "total_requests": len(batch_requests),
+                "cached_images": cached_count,
                 "chapters": len([r for r in batch_requests if r["custom_id"].startswith("chapter_")]),
                 "sections": len([r for r in batch_requests if r["custom_id"].startswith("section_")]),
                 "requests": prompt_summary
             }, f, indent=2)
         
         print(f"✅ Created {len(batch_requests)} batch requests")
+        print(f"♻️  Served from cache: {cached_count}")
         print(f"📁 Batch file: {batch_file}")
         print(f"📋 Summary: {summary_file}")
         
+        if not batch_requests:
+            print(f"✅ All images already generated: {self.output_dir}")
+            return None, summary_file
+        
         return batch_file, summary_file
     
+    def apply_prompt_cache(self, batch_requests):
+        """Copy cached images into place and return (requests to submit, cached count)"""
+        to_submit, cached_lines = self.prompt_cache.prepare_tasks(batch_requests)
+        requests_by_id = {request["custom_id"]: request for request in batch_requests}
+        
+        stale_requests = []
+        for line in cached_lines:
+            custom_id = line["custom_id"]
+            body = line["response"]["body"]
+            local_path = Path(body.get("local_path", ""))
+            
+            if not verify_file(local_path, body.get("sha256")):
+                stale_requests.append(requests_by_id[custom_id])
+                continue
+            
+            image_file = self.output_dir / f"{custom_id}.png"
+            if local_path.resolve() != image_file.resolve():
+                shutil.copyfile(local_path, image_file)
+        
+        # Cached entries whose image file is gone or corrupted are regenerated
+        if stale_requests:
+            for request in stale_requests:
+                self.prompt_cache.invalidate(request["body"], request["url"])
+            resubmit, _ = self.prompt_cache.prepare_tasks(stale_requests)
+            to_submit.extend(resubmit)
+        
+        return to_submit, len(cached_lines) - len(stale_requests)
+    
     def clean_chapter_name(self, raw_name):
         """Clean chapter name for processing"""
         import re
@@ -272,6 +319,8 @@ class WellspringOpenAIBatchGenerator:
                 }
             )
             
+            self.batch_registry.record(batch)
+            
             print(f"✅ Batch created: {batch.id}")
             print(f"📊 Status: {batch.status}")
             print(f"⏱️  Completion window: 24 hours")
@@ -316,22 +365,25 @@ class WellspringOpenAIBatchGenerator:
         print("=" * 50)
         
         try:
-            batch = self.client.batches.retrieve(batch_id)
+            # Cached in the batch registry; only re-fetched once its TTL expires
+            batch = self.batch_registry.get(batch_id)
             
-            print(f"📊 Status: {batch.status}")
-            print(f"📝 Request counts: {batch.request_counts}")
+            print(f"📊 Status: {batch['status']}")
+            print(f"📝 Request counts: {batch['request_counts']}")
             
-            if batch.status == "completed":
+            if batch["status"] == "completed":
                 print("🎉 BATCH COMPLETED!")
-                return self.download_batch_results(batch)
-            elif batch.status == "failed":
+                return self.download_batch_results(self.client.batches.retrieve(batch_id))
+            elif batch["status"] == "failed":
                 print("❌ BATCH FAILED")
-                if batch.errors:
-                    print(f"Errors: {batch.errors}")
-            elif batch.status in ["validating", "in_progress"]:
+                if batch["errors"]:
+                    print(f"Errors: {batch['errors']}")
+            elif batch["status"] in ["validating", "in_progress"]:
                 print("⏳ Batch is still processing...")
+                if batch["eta_seconds"]:
+                    print(f"🕒 ETA: ~{batch['eta_seconds'] // 60} min")
             
-            return batch.status
+            return batch["status"]
             
         except Exception as e:
             print(f"❌ Error checking batch: {e}")
@@ -346,17 +398,18 @@ class WellspringOpenAIBatchGenerator:
         try:
             # Download output file
             output_file_id = batch.output_file_id
-            output_file = self.client.files.content(output_file_id)
             
-            # Save raw results
+            # Stream raw results to disk
             results_file = self.batch_dir / f"results_{batch.id}.jsonl"
-            results_file.write_bytes(output_file.content)
+            with self.client.files.with_streaming_response.content(output_file_id) as response:
+                response.stream_to_file(results_file)
             
             print(f"✅ Results saved: {results_file}")
             
             # Process and download images
             successful = 0
             failed = 0
+            cache_lines = []
             
             with open(results_file, 'r') as f:
                 for line in f:
@@ -369,25 +422,40 @@ class WellspringOpenAIBatchGenerator:
                     
                     try:
                         custom_id = result["custom_id"]
-                        image_url = result["response"]["body"]["data"][0]["url"]
+                        image = result["response"]["body"]["data"][0]
+                        image_file = self.output_dir / f"{custom_id}.png"
                         
-                        # Download image
-                        response = requests.get(image_url)
-                        if response.status_code == 200:
-                            image_file = self.output_dir / f"{custom_id}.png"
-                            with open(image_file, 'wb') as img_f:
-                                img_f.write(response.content)
-                            
-                            print(f"✅ Downloaded: {custom_id}.png")
-                            successful += 1
+                        # Decode inline base64 straight to disk, otherwise stream the URL over the shared session
+                        if image.get("b64_json"):
+                            file_info = decode_b64_to_file(image["b64_json"], image_file)
                         else:
-                            print(f"❌ Failed to download: {custom_id}")
-                            failed += 1
+                            file_info = download_to_file(image["url"], image_file)
+                        
+                        # Cache the local image; the returned URL expires
+                        cache_lines.append({
+                            "custom_id": custom_id,
+                            "response": {"status_code": 200, "body": {
+                                "local_path": str(image_file.resolve()),
+                                "sha256": file_info["sha256"]
+                            }}
+                        })
+                        
+                        print(f"✅ Downloaded: {custom_id}.png")
+                        successful += 1
                             
                     except Exception as e:
                         print(f"❌ Error processing result: {e}")
                         failed += 1
             
+            # Record downloads in the prompt cache and fill in deferred duplicates
+            self.prompt_cache.store_results(cache_lines)
+            for line in self.prompt_cache.resolve_pending():
+                body = line["response"]["body"]
+                local_path = Path(body.get("local_path", ""))
+                if verify_file(local_path, body.get("sha256")):
+                    shutil.copyfile(local_path, self.output_dir / f"{line['custom_id']}.png")
+                    successful += 1
+            
             print(f"\n🎉 DOWNLOAD COMPLETE!")
             print(f"✅ Successful: {successful}")
             print(f"❌ Failed: {failed}")
@@ -433,6 +501,8 @@ def main():
     
     # Create batch prompts
     batch_file, summary_file = generator.create_batch_prompts(data)
+    if not batch_file:
+        return True
     
     print("")
     confirm = input("🚀 Ready to submit batch to OpenAI? (y/N): ")
@@ -3,26 +3,30 @@
 Wellspring OpenAI Individual Image Generator
 ===========================================
 
-Generates high-quality chapter images one by one using OpenAI DALL-E 3
-since batch processing doesn't support image generation.
+Generates high-quality chapter images using OpenAI DALL-E 3 through a
+rate-limited concurrent worker pool, since batch processing doesn't
+support image generation.
 
 Creates professional chapter artwork matching the "Setting the Vision" aesthetic.
 """
 
+import asyncio
 import json
 import openai
 import os
 from pathlib import Path
-import time
 from datetime import datetime
-import requests
 from PIL import Image
 import io
 
+from wellspring_image_scheduler import ImageGenerationScheduler, ImageJob
+
 class WellspringIndividualImageGenerator:
     """Generate professional chapter images using OpenAI DALL-E 3"""
     
-    def __init__(self):
+    def __init__(self, requests_per_minute=5, max_workers=4):
+        self.requests_per_minute = requests_per_minute
+        self.max_workers = max_workers
         self.project_dir = Path("icons/wellspring_goldflake_batch_tool")
         self.output_dir = self.project_dir / "openai_individual_images"
         self.progress_dir = self.project_dir / "generation_progress"
@@ -133,55 +137,35 @@ class WellspringIndividualImageGenerator:
         
         return clean_name[:100]  # Reasonable length
     
-    def save_progress(self, progress_data):
+    def save_progress(self, progress_data, progress_file=None):
         """Save generation progress"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        progress_file = self.progress_dir / f"progress_{timestamp}.json"
+        if progress_file is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            progress_file = self.progress_dir / f"progress_{timestamp}.json"
         
         with open(progress_file, 'w') as f:
             json.dump(progress_data, f, indent=2)
     
-    def generate_image(self, chapter_title, custom_id, subject_keywords):
-        """Generate a single image"""
-        
+    def build_job(self, custom_id, chapter_title, subject_keywords):
+        """Build the scheduler job for a single chapter image"""
         prompt = self.style_prompt_base.format(
             chapter_title=chapter_title,
             subject_keywords=subject_keywords
         )
         
-        try:
-            print(f"🎨 Generating: {custom_id} - {chapter_title[:50]}...")
-            
-            response = self.client.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                size="1024x1792",  # Portrait orientation
-                quality="hd",
-                style="vivid",
-                n=1
-            )
-            
-            # Download image
-            image_url = response.data[0].url
-            img_response = requests.get(image_url)
-            
-            if img_response.status_code == 200:
-                # Save image
-                image_file = self.output_dir / f"{custom_id}.png"
-                with open(image_file, 'wb') as f:
-                    f.write(img_response.content)
-                
-                print(f"✅ Saved: {custom_id}.png")
-                return True, None
-            else:
-                error_msg = f"Failed to download image: HTTP {img_response.status_code}"
-                print(f"❌ {error_msg}")
-                return False, error_msg
-                
-        except Exception as e:
-            error_msg = f"Error generating image: {str(e)}"
-            print(f"❌ {error_msg}")
-            return False, error_msg
+        return ImageJob(
+            job_id=custom_id,
+            prompt=prompt,
+            filepath=self.output_dir / f"{custom_id}.png",
+            params={
+                "model": "dall-e-3",
+                "size": "1024x1792",  # Portrait orientation
+                "quality": "hd",
+                "style": "vivid",
+                "n": 1
+            },
+            metadata={"title": chapter_title, "keywords": subject_keywords}
+        )
     
     def generate_all_images(self, max_images=25):
         """Generate all chapter images"""
@@ -214,92 +198,60 @@ class WellspringIndividualImageGenerator:
             "failed": 0
         }
         
-        # Process chapters
-        image_count = 0
+        # Collect every image still missing, up to max_images
+        jobs = []
         for i, chapter in enumerate(chapters, 1):
-            if image_count >= max_images:
-                break
-                
             clean_title = self.clean_chapter_name(chapter)
             if clean_title and len(clean_title) > 3:
-                subject_keywords = self.categorize_subject(clean_title)
-                custom_id = f"chapter_{i:03d}"
-                
-                # Check if already exists
-                image_file = self.output_dir / f"{custom_id}.png"
-                if image_file.exists():
-                    print(f"⏭️  Skipping existing: {custom_id}")
-                    continue
-                
-                success, error = self.generate_image(clean_title, custom_id, subject_keywords)
-                
-                result = {
-                    "id": custom_id,
-                    "title": clean_title,
-                    "keywords": subject_keywords,
-                    "success": success,
-                    "error": error,
-                    "timestamp": datetime.now().isoformat()
-                }
-                
-                generation_log["results"].append(result)
-                
-                if success:
-                    generation_log["successful"] += 1
-                else:
-                    generation_log["failed"] += 1
-                
-                image_count += 1
-                
-                # Rate limiting
-                if image_count % 5 == 0:
-                    print("⏸️  Pausing 10 seconds to respect rate limits...")
-                    time.sleep(10)
-                else:
-                    time.sleep(2)  # Small delay between requests
+                jobs.append(self.build_job(f"chapter_{i:03d}", clean_title, self.categorize_subject(clean_title)))
         
-        # Process key sections
         key_sections = ["Setting the Vision", "Table of Contents", "Introduction", "Conclusion"]
         for section in sections:
-            if image_count >= max_images:
-                break
-                
             if any(key in section for key in key_sections):
                 clean_title = self.clean_chapter_name(section)
                 if clean_title:
-                    custom_id = f"section_{clean_title.lower().replace(' ', '_')}"
-                    subject_keywords = "manuscript elements, book organization, literary symbols, classical typography"
-                    
-                    # Check if already exists
-                    image_file = self.output_dir / f"{custom_id}.png"
-                    if image_file.exists():
-                        print(f"⏭️  Skipping existing: {custom_id}")
-                        continue
-                    
-                    success, error = self.generate_image(clean_title, custom_id, subject_keywords)
-                    
-                    result = {
-                        "id": custom_id,
-                        "title": clean_title,
-                        "keywords": subject_keywords,
-                        "success": success,
-                        "error": error,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                    generation_log["results"].append(result)
-                    
-                    if success:
-                        generation_log["successful"] += 1
-                    else:
-                        generation_log["failed"] += 1
-                    
-                    image_count += 1
-                    time.sleep(2)
+                    jobs.append(self.build_job(
+                        f"section_{clean_title.lower().replace(' ', '_')}",
+                        clean_title,
+                        "manuscript elements, book organization, literary symbols, classical typography"
+                    ))
+        
+        pending_jobs = []
+        for job in jobs:
+            if job.filepath.exists():
+                print(f"⏭️  Skipping existing: {job.job_id}")
+            elif len(pending_jobs) < max_images:
+                pending_jobs.append(job)
+        
+        progress_file = self.progress_dir / f"progress_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        
+        def record(result):
+            """Record each result as soon as it completes"""
+            success = result["status"] == "success"
+            print(f"{'✅ Saved' if success else '❌ Failed'}: {result['job_id']}"
+                  + ("" if success else f" - {result.get('error', result['status'])}"))
+            
+            generation_log["results"].append({
+                "id": result["job_id"],
+                "title": result["title"],
+                "keywords": result["keywords"],
+                "success": success,
+                "error": None if success else result.get("error", result["status"]),
+                "timestamp": result["timestamp"]
+            })
+            generation_log["successful" if success else "failed"] += 1
+            self.save_progress(generation_log, progress_file)
+        
+        # Images already on disk are skipped, so an interrupted run resumes where it stopped
+        scheduler = ImageGenerationScheduler(
+            requests_per_minute=self.requests_per_minute,
+            max_workers=self.max_workers
+        )
+        asyncio.run(scheduler.run(pending_jobs, on_result=record))
         
         # Save final log
         generation_log["completed_at"] = datetime.now().isoformat()
-        self.save_progress(generation_log)
+        self.save_progress(generation_log, progress_file)
         
         print("")
         print("🎉 GENERATION COMPLETE!")
@@ -319,7 +271,7 @@ def main():
     print("🎨 WELLSPRING OPENAI INDIVIDUAL IMAGE GENERATOR")
     print("=" * 55)
     print("🎯 Creating professional chapter images with DALL-E 3")
-    print("✨ Individual generation (batch API doesn't support images)")
+    print("✨ Concurrent generation (batch API doesn't support images)")
     print("")
     
     # Check for existing images
@@ -331,7 +283,7 @@ def main():
     
     print("💰 COST ESTIMATE:")
     print("📊 25 images × $0.080 each = $2.00")
-    print("⏱️  Generation time: ~15-20 minutes")
+    print(f"⏱️  Generation time: ~{25 / generator.requests_per_minute:.0f}+ minutes at {generator.requests_per_minute} images/minute")
     print("")
     
     confirm = input("🚀 Ready to start image generation? (y/N): ")
@@ -20,10 +20,11 @@ import json
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from datetime import datetime
-import zipfile
 import tempfile
 import shutil
 
+from wellspring_idml_model import load_idml_document
+
 class WellspringProfessionalFormatter:
     """Professional formatter for the real Wellspring manuscript"""
     
@@ -87,20 +88,14 @@ class WellspringProfessionalFormatter:
         structure = {}
         
         try:
-            with zipfile.ZipFile(self.manuscript_path, 'r') as idml_zip:
-                file_list = idml_zip.namelist()
-                
-                structure['files'] = len(file_list)
-                structure['spreads'] = len([f for f in file_list if f.startswith('Spreads/')])
-                structure['stories'] = len([f for f in file_list if f.startswith('Stories/')])
-                structure['styles'] = 'Resources/Styles.xml' in file_list
-                structure['fonts'] = 'Resources/Fonts.xml' in file_list
-                
-                print(f"   📑 Total files in IDML: {structure['files']}")
-                print(f"   📄 Spreads: {structure['spreads']}")
-                print(f"   📝 Stories: {structure['stories']}")
-                print(f"   🎨 Styles available: {structure['styles']}")
-                print(f"   🔤 Fonts available: {structure['fonts']}")
+            # Shared with the sectional formatter and chapter extractor, so the package is read once
+            structure = load_idml_document(self.manuscript_path).structure()
+            
+            print(f"   📑 Total files in IDML: {structure['files']}")
+            print(f"   📄 Spreads: {structure['spreads']}")
+            print(f"   📝 Stories: {structure['stories']}")
+            print(f"   🎨 Styles available: {structure['styles']}")
+            print(f"   🔤 Fonts available: {structure['fonts']}")
                 
         except Exception as e:
             print(f"   ❌ Error analyzing IDML: {e}")
@@ -17,9 +17,13 @@ import json
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from datetime import datetime
-import zipfile
 import re
 
+from wellspring_idml_model import load_idml_document
+
+CHAPTER_PATTERN = re.compile(r'Chapter\s+\d+', re.IGNORECASE)
+TOC_PATTERN = re.compile(r'Table\s+of\s+Contents|Contents', re.IGNORECASE)
+
 class WellspringSectionalFormatter:
     """Break manuscript into sections and format incrementally"""
     
@@ -71,43 +75,27 @@ class WellspringSectionalFormatter:
         }
         
         try:
-            with zipfile.ZipFile(self.manuscript_path, 'r') as idml_zip:
-                file_list = idml_zip.namelist()
-                
-                # Count spreads and stories
-                spreads = [f for f in file_list if f.startswith('Spreads/')]
-                stories = [f for f in file_list if f.startswith('Stories/')]
-                
-                structure['total_spreads'] = len(spreads)
-                structure['total_stories'] = len(stories)
-                
-                print(f"📄 Total spreads: {structure['total_spreads']}")
-                print(f"📝 Total stories: {structure['total_stories']}")
-                
-                # Analyze story content for chapter identification
-                chapter_count = 0
-                toc_found = False
-                
-                for story_file in stories[:10]:  # Sample first 10 stories
-                    try:
-                        story_content = idml_zip.read(story_file).decode('utf-8')
-                        
-                        # Look for chapter indicators
-                        if re.search(r'Chapter\s+\d+', story_content, re.IGNORECASE):
-                            chapter_count += 1
-                        
-                        # Look for TOC indicators  
-                        if re.search(r'Table\s+of\s+Contents|Contents', story_content, re.IGNORECASE):
-                            toc_found = True
-                            
-                    except Exception as e:
-                        continue
-                
-                structure['estimated_chapters'] = chapter_count
-                structure['has_toc'] = toc_found
-                
-                print(f"📚 Estimated chapters: {chapter_count}")
-                print(f"📋 TOC detected: {'✅' if toc_found else '❌'}")
+            # Shared with the professional formatter and chapter extractor, so the package is read once
+            document = load_idml_document(self.manuscript_path)
+            
+            # Count spreads and stories
+            structure['total_spreads'] = len(document.spreads)
+            structure['total_stories'] = len(document.stories)
+            
+            print(f"📄 Total spreads: {structure['total_spreads']}")
+            print(f"📝 Total stories: {structure['total_stories']}")
+            
+            # Every story is checked now that its text comes from the shared index
+            chapter_stories = document.stories_matching(CHAPTER_PATTERN)
+            toc_stories = document.stories_matching(TOC_PATTERN)
+            
+            structure['estimated_chapters'] = len(chapter_stories)
+            structure['has_toc'] = bool(toc_stories)
+            structure['chapter_stories'] = chapter_stories
+            structure['toc_stories'] = toc_stories
+            
+            print(f"📚 Estimated chapters: {structure['estimated_chapters']}")
+            print(f"📋 TOC detected: {'✅' if structure['has_toc'] else '❌'}")
                 
         except Exception as e:
             print(f"❌ Error analyzing structure: {e}")
@@ -303,12 +291,17 @@ function applyMarginsOnly() {{
             right: currentMargins.right
         }};
         
-        // Apply ONLY Brian's margin specifications
-        currentMargins.top = "{self.brian_specs['margins']['top']}pt";
-        currentMargins.bottom = "{self.brian_specs['margins']['bottom']}pt";
-        currentMargins.left = "{self.brian_specs['margins']['left']}pt";
-        currentMargins.right = "{self.brian_specs['margins']['right']}pt";
-        
+        // Apply ONLY Brian's margin specifications, as one undo step with redraw off
+        var enableRedraw = app.scriptPreferences.enableRedraw;
+        app.scriptPreferences.enableRedraw = false;
+        try {{
+            app.doScript(function () {{
+                applyMarginsToMasters(doc);
+            }}, ScriptLanguage.JAVASCRIPT, undefined, UndoModes.ENTIRE_SCRIPT, "Wellspring margins only");
+        }} finally {{
+            app.scriptPreferences.enableRedraw = enableRedraw;
+        }}
+
         // Success message
         alert("✅ MARGINS UPDATED SUCCESSFULLY!\\n\\n" +
               "Changes applied:\\n" +
@@ -330,6 +323,27 @@ function applyMarginsOnly() {{
     }}
 }}
 
+function applyMarginsToMasters(doc) {{
+    // The document defaults and the master pages carry the margins, so every
+    // document page picks them up without being visited
+    setMargins(doc.marginPreferences);
+
+    var masters = doc.masterSpreads;
+    for (var i = 0; i < masters.length; i++) {{
+        var masterPages = masters[i].pages;
+        for (var j = 0; j < masterPages.length; j++) {{
+            setMargins(masterPages[j].marginPreferences);
+        }}
+    }}
+}}
+
+function setMargins(marginPrefs) {{
+    marginPrefs.top = "{self.brian_specs['margins']['top']}pt";
+    marginPrefs.bottom = "{self.brian_specs['margins']['bottom']}pt";
+    marginPrefs.left = "{self.brian_specs['margins']['left']}pt";
+    marginPrefs.right = "{self.brian_specs['margins']['right']}pt";
+}}
+
 // Execute the margins-only update
 applyMarginsOnly();
         """
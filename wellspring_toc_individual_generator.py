@@ -5,13 +5,14 @@
 Generate all 27 Wellspring-style icons individually (since batch API doesn't support images)
 """
 
-import openai
+import asyncio
 import os
 import json
-import requests
+import sys
 from datetime import datetime
 from pathlib import Path
-import time
+
+from wellspring_image_scheduler import ImageGenerationScheduler, ImageJob
 
 def load_env_vars():
     """Load environment variables from .env file"""
@@ -93,28 +94,37 @@ QUALITY: Ultra-high detail, print-ready quality, classical book illustration sty
     
     return prompt.strip()
 
-def download_image(url, filepath):
-    """Download image from URL to filepath"""
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
-        
-        return True
-    except Exception as e:
-        print(f"   ❌ Download failed: {str(e)}")
-        return False
+def find_resumable_session(output_dir):
+    """Latest session directory, if it did not finish every image"""
+    sessions = sorted(output_dir.glob("session_*"), reverse=True)
+    if not sessions:
+        return None
+    
+    # Only the newest session counts; older failures may already have been replaced
+    session_dir = sessions[0]
+    results_file = session_dir / "generation_results.json"
+    if not results_file.exists():
+        return session_dir
+    with open(results_file, 'r') as f:
+        if json.load(f).get("failed", 0) > 0:
+            return session_dir
+    return None
 
-def generate_wellspring_toc_images():
-    """Generate all 27 Wellspring TOC images individually"""
+def generate_wellspring_toc_images(resume=True, requests_per_minute=5, max_workers=4):
+    """
+    Generate all 27 Wellspring TOC images concurrently
+    
+    Args:
+        resume: Continue the latest unfinished session instead of starting a new one
+        requests_per_minute: Image generation rate limit for the account
+        max_workers: Concurrent generation workers
+    """
     
     print("🚀 WELLSPRING TOC INDIVIDUAL IMAGE GENERATOR")
     print("=" * 60)
     print("🎨 Generating 27 professional Wellspring-style icons")
     print("✨ Gold flake + Classical design for complete TOC")
-    print("⚡ Individual generation (batch API doesn't support images)")
+    print("⚡ Concurrent generation under a rate-limited worker pool")
     print("")
     
     # Load API key
@@ -125,9 +135,6 @@ def generate_wellspring_toc_images():
     
     print(f"✅ API Key loaded: {api_key[:20]}...{api_key[-8:]}")
     
-    # Initialize OpenAI client
-    client = openai.OpenAI(api_key=api_key)
-    
     # Complete Wellspring TOC Structure
     toc_items = [
         # BOOK PARTS
@@ -168,88 +175,63 @@ def generate_wellspring_toc_images():
     output_dir = Path("wellspring_toc_generated_images")
     output_dir.mkdir(exist_ok=True)
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    session_dir = output_dir / f"session_{timestamp}"
-    session_dir.mkdir(exist_ok=True)
+    session_dir = find_resumable_session(output_dir) if resume else None
+    if session_dir:
+        timestamp = session_dir.name.replace("session_", "")
+        print(f"♻️  Resuming session: {session_dir}")
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        session_dir = output_dir / f"session_{timestamp}"
+        session_dir.mkdir(exist_ok=True)
     
     print(f"📁 Output directory: {session_dir}")
     print(f"🎯 Total images to generate: {len(toc_items)}")
     print("")
     
-    results = []
-    successful = 0
-    failed = 0
-    
+    jobs = []
     for i, (title, description) in enumerate(toc_items):
-        print(f"🎨 {i+1:2d}/{len(toc_items)}: {title}")
-        
-        try:
-            # Create prompt
-            prompt = create_wellspring_style_prompt(title, description)
-            
-            # Generate image
-            print(f"   ⚡ Generating...")
-            response = client.images.generate(
-                model="dall-e-3",
-                prompt=prompt,
-                size="1024x1024",
-                quality="hd",
-                style="vivid",
-                n=1
-            )
-            
-            # Download image
-            image_url = response.data[0].url
-            safe_title = title.replace(':', '').replace(',', '').replace('/', '_')
-            filename = f"{i+1:02d}_{safe_title.replace(' ', '_')}.png"
-            filepath = session_dir / filename
-            
-            print(f"   📥 Downloading...")
-            if download_image(image_url, filepath):
-                print(f"   ✅ Saved: {filename}")
-                successful += 1
-                
-                # Save result info
-                result = {
-                    "index": i + 1,
-                    "title": title,
-                    "description": description,
-                    "filename": filename,
-                    "filepath": str(filepath),
-                    "url": image_url,
-                    "prompt": prompt,
-                    "status": "success"
-                }
-                results.append(result)
-            else:
-                failed += 1
-                result = {
-                    "index": i + 1,
-                    "title": title,
-                    "status": "download_failed",
-                    "url": image_url
-                }
-                results.append(result)
-            
-            # Small delay to be respectful to API
-            if i < len(toc_items) - 1:  # Don't delay after last item
-                time.sleep(2)
-                
-        except Exception as e:
-            print(f"   ❌ Generation failed: {str(e)}")
-            failed += 1
-            result = {
-                "index": i + 1,
-                "title": title,
-                "status": "generation_failed",
-                "error": str(e)
-            }
-            results.append(result)
-            
-            # Longer delay on error
-            time.sleep(5)
-        
-        print("")
+        safe_title = title.replace(':', '').replace(',', '').replace('/', '_')
+        filename = f"{i+1:02d}_{safe_title.replace(' ', '_')}.png"
+        jobs.append(ImageJob(
+            job_id=filename,
+            prompt=create_wellspring_style_prompt(title, description),
+            filepath=session_dir / filename,
+            params={"model": "dall-e-3", "size": "1024x1024", "quality": "hd", "style": "vivid", "n": 1},
+            metadata={"index": i + 1, "title": title, "description": description, "filename": filename}
+        ))
+    
+    def report(result):
+        """Print each result as soon as it completes"""
+        if result["status"] == "success":
+            print(f"   ✅ {result['index']:2d}/{len(toc_items)}: Saved {result['filename']}")
+        else:
+            print(f"   ❌ {result['index']:2d}/{len(toc_items)}: {result['title']} - {result['status']}: {result.get('error', '')}")
+    
+    # Results are appended to progress.jsonl as they complete, so reruns skip finished images
+    scheduler = ImageGenerationScheduler(
+        api_key=api_key,
+        requests_per_minute=requests_per_minute,
+        max_workers=max_workers,
+        progress_file=session_dir / "progress.jsonl"
+    )
+    asyncio.run(scheduler.run(jobs, on_result=report))
+    print("")
+    
+    # Latest record per image, across this and any earlier runs of the session
+    latest = {}
+    with open(session_dir / "progress.jsonl", 'r') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                latest[record["job_id"]] = record
+    
+    results = sorted(
+        (record for record in latest.values()
+         if record["status"] != "success" or Path(record["filepath"]).exists()),
+        key=lambda record: record["index"]
+    )
+    successful = sum(1 for record in results if record["status"] == "success")
+    failed = len(results) - successful
     
     # Save session results
     results_file = session_dir / "generation_results.json"
@@ -283,7 +265,7 @@ def generate_wellspring_toc_images():
     return successful > 0
 
 if __name__ == "__main__":
-    success = generate_wellspring_toc_images()
+    success = generate_wellspring_toc_images(resume="--new-session" not in sys.argv)
     
     if success:
         print("🎯 NEXT STEPS:")